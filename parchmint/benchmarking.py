@@ -1,136 +1,304 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, List
+import csv
+import gc
+import logging
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+)
 
 import numpy as np
-import numpy.typing as npt
-from tabulate import tabulate
+
+from parchmint import jsonbackend
 
 if TYPE_CHECKING:
     from parchmint.device import Device
 
+logger = logging.getLogger(__name__)
 
-def characterize_devices(devices: List[Device]) -> npt.NDArray[Any]:
-    """Characterizes the devices in the list"""
+# Columns of the characterization table, areas are in mm^2 and spans in mm
+CHARACTERIZATION_COLUMNS = [
+    "name",
+    "components",
+    "connections",
+    "valves",
+    "layers",
+    "control",
+    "max_connectivity",
+    "area_std",
+    "area_mean",
+    "largest_xspan",
+    "largest_yspan",
+    "smallest_xspan",
+    "smallest_yspan",
+]
 
-    # Create 2d numpy array for storing the file info
-    file_info = np.empty((len(devices), 11), dtype=object)
 
-    index = 0
-    for device in devices:
-        # Save device name
-        file_info[index, 0] = device.name
+class DeviceCharacteristics(NamedTuple):
+    """Size and shape statistics of a device, one row of the characterization
+    table. The area and span fields are None for devices without components."""
 
-        # Save number of components in the device
-        file_info[index, 1] = len(device.components)
-        # Save number of connections in the device
-        file_info[index, 2] = len(device.connections)
+    name: str
+    components: int
+    connections: int
+    valves: int
+    layers: int
+    control: bool
+    """True if the device has a CONTROL layer"""
+    max_connectivity: int
+    """Largest number of components joined by a single connection"""
+    area_std: Optional[float]
+    area_mean: Optional[float]
+    largest_xspan: Optional[float]
+    largest_yspan: Optional[float]
+    smallest_xspan: Optional[float]
+    smallest_yspan: Optional[float]
 
-        # Save number of valves in the device
-        file_info[index, 3] = len(device.valves)
 
-        # Save the number of layers in the device
-        file_info[index, 4] = len(device.layers)
+def characterize_device(device: Device) -> DeviceCharacteristics:
+    """Computes the characteristics of a device from a single pass over its
+    components and connections
 
-        # Save yes if the device has a layer of type CONTROL
-        file_info[index, 5] = (
-            "YES"
-            if "CONTROL" in [layer.layer_type for layer in device.layers]
-            else "NO"
-        )
+    Args:
+        device (Device): device to characterize
 
-        # Save the max connectiveity of the connection in the device
-        file_info[index, 6] = max(
-            [len(connection.sinks) + 1 for connection in device.connections]
-        )
+    Returns:
+        DeviceCharacteristics: statistics of the device
+    """
+    spans = np.array(
+        [(component.xspan, component.yspan) for component in device.components],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    area_std = area_mean = None
+    largest: Tuple[Optional[float], ...] = (None, None)
+    smallest: Tuple[Optional[float], ...] = (None, None)
+    if len(spans) > 0:
+        areas = spans[:, 0] * spans[:, 1]
+        area_std = float(areas.std()) / 1e6
+        area_mean = float(areas.mean()) / 1e6
+        largest = tuple((spans[areas.argmax()] / 1000).tolist())
+        smallest = tuple((spans[areas.argmin()] / 1000).tolist())
 
-        # Save the standard deviation of the component areas in the device
-        file_info[index, 7] = (
-            np.std(
-                [component.xspan * component.yspan for component in device.components]
-            )
-            / 10e6
-        )
+    return DeviceCharacteristics(
+        name=device.name,
+        components=len(device.components),
+        connections=len(device.connections),
+        valves=len(device.valves),
+        layers=len(device.layers),
+        control=any(layer.layer_type == "CONTROL" for layer in device.layers),
+        max_connectivity=max(
+            (len(connection.sinks) + 1 for connection in device.connections),
+            default=0,
+        ),
+        area_std=area_std,
+        area_mean=area_mean,
+        largest_xspan=largest[0],
+        largest_yspan=largest[1],
+        smallest_xspan=smallest[0],
+        smallest_yspan=smallest[1],
+    )
+
+
+def characterize_devices(devices: Iterable[Device]) -> List[DeviceCharacteristics]:
+    """Characterizes the devices in the list
+
+    Args:
+        devices (Iterable[Device]): devices to characterize
+
+    Returns:
+        List[DeviceCharacteristics]: one row per device, in order
+    """
+    return [characterize_device(device) for device in devices]
+
+
+def characterize_file(file_path: str) -> DeviceCharacteristics:
+    """Loads a ParchMint file and characterizes its device
+
+    Args:
+        file_path (str): path of the file
+
+    Returns:
+        DeviceCharacteristics: statistics of the device
+    """
+    # pylint: disable=import-outside-toplevel
+    from parchmint.device import Device
+
+    return characterize_device(Device.from_file(file_path))
+
+
+def _try_characterize_file(
+    file_path: str,
+) -> Tuple[str, Optional[DeviceCharacteristics], Optional[str]]:
+    """Characterizes a file in a worker, the error is sent back instead of the
+    row when the file cannot be loaded"""
+    try:
+        return file_path, characterize_file(file_path), None
+    except Exception as error:  # pylint: disable=broad-except
+        return file_path, None, f"{type(error).__name__}: {error}"
+
+
+def characterize_files(
+    file_paths: List[str], jobs: int = 1, chunksize: int = 4
+) -> Iterator[DeviceCharacteristics]:
+    """Characterizes the devices of a corpus of files over a pool of worker
+    processes, each worker loads and characterizes whole files so only the
+    rows are sent back. Files that cannot be loaded are skipped with a warning.
+
+    Args:
+        file_paths (List[str]): paths of the files
+        jobs (int, optional): number of worker processes, the files are handled in this process when 1. Defaults to 1.
+        chunksize (int, optional): number of files handed to a worker at a time. Defaults to 4.
+
+    Yields:
+        DeviceCharacteristics: row of each file, in the order of file_paths
+    """
+    if jobs <= 1 or len(file_paths) <= 1:
+        results = map(_try_characterize_file, file_paths)
+        yield from _skip_errors(results)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_try_characterize_file, file_paths, chunksize=chunksize)
+        yield from _skip_errors(results)
 
-        # Save the mean of the component areas in the device
-        file_info[index, 8] = (
-            np.mean(
-                [component.xspan * component.yspan for component in device.components]
+
+def _skip_errors(
+    results: Iterable[Tuple[str, Optional[DeviceCharacteristics], Optional[str]]]
+) -> Iterator[DeviceCharacteristics]:
+    for file_path, row, error in results:
+        if row is None:
+            logger.warning(
+                "Skipping %s, it could not be characterized: %s", file_path, error
             )
-            / 10e6
-        )
-
-        # Save the xspan and yspan of the component with the largest area in the device
-        file_info[index, 9] = (
-            device.components[
-                np.argmax(
-                    [
-                        component.xspan * component.yspan
-                        for component in device.components
-                    ]
-                )
-            ].xspan
-            / 1000,
-            device.components[
-                np.argmax(
-                    [
-                        component.xspan * component.yspan
-                        for component in device.components
-                    ]
-                )
-            ].yspan
-            / 1000,
-        )
-
-        # Save the xspan and yspan of the component with the smallest area in the device
-        file_info[index, 10] = (
-            device.components[
-                np.argmin(
-                    [
-                        component.xspan * component.yspan
-                        for component in device.components
-                    ]
-                )
-            ].xspan
-            / 1000,
-            device.components[
-                np.argmin(
-                    [
-                        component.xspan * component.yspan
-                        for component in device.components
-                    ]
-                )
-            ].yspan
-            / 1000,
-        )
-
-    index += 1
-
-    # Save the numpy array to a tsv file with the corresponding headers
-    np.savetxt(
-        "characterize.tsv",
-        file_info,
-        delimiter="\t",
-        fmt="%s",
-        header="Name\tComponents\tConnections\tValves\tLayers\tControl\tMaxConnectivity"
-        + "\tStdDevArea\tMeanArea\tMax(Xspan,Yspan)\tMin(Xspan,Yspan)",
+            continue
+        yield row
+
+
+def write_characteristics(
+    rows: Iterable[DeviceCharacteristics], output: TextIO, output_format: str = "tsv"
+) -> int:
+    """Writes the characterization table
+
+    Args:
+        rows (Iterable[DeviceCharacteristics]): rows of the table
+        output (TextIO): stream to write to
+        output_format (str, optional): "tsv", "csv" or "json" (a list of objects). Defaults to "tsv".
+
+    Raises:
+        ValueError: if the format is not supported
+
+    Returns:
+        int: number of rows written
+    """
+    count = 0
+    if output_format == "json":
+        output.write("[")
+        for row in rows:
+            output.write(("," if count else "") + jsonbackend.dumps(row._asdict()))
+            count += 1
+        output.write("]\n")
+        return count
+    if output_format not in ("tsv", "csv"):
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    writer = csv.writer(
+        output, delimiter="\t" if output_format == "tsv" else ",", lineterminator="\n"
     )
+    writer.writerow(CHARACTERIZATION_COLUMNS)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+        count += 1
+    return count
+
+
+def memory_benchmark(
+    component_count: int = 20000, ports_per_component: int = 4
+) -> Dict[str, float]:
+    """Measures the memory held by the object model of a synthetic device with
+    tracemalloc
+
+    Args:
+        component_count (int, optional): number of components in the device. Defaults to 20000.
+        ports_per_component (int, optional): number of ports on each component. Defaults to 4.
+
+    Returns:
+        Dict[str, float]: retained and peak bytes of the device, and retained bytes per component
+    """
+    # pylint: disable=import-outside-toplevel
+    from parchmint.generator import generate_device
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        device = generate_device(component_count, ports_per_component)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    retained = current - baseline
+    del device
+    return {
+        "components": component_count,
+        "retained_bytes": retained,
+        "peak_bytes": peak - baseline,
+        "bytes_per_component": retained / max(component_count, 1),
+    }
+
+
+def binary_benchmark(
+    component_count: int = 20000, ports_per_component: int = 4, repeats: int = 3
+) -> Dict[str, float]:
+    """Compares saving and loading a synthetic device as ParchMint JSON and in
+    the binary ParchMint format, from and to bytes in memory
+
+    Args:
+        component_count (int, optional): number of components in the device. Defaults to 20000.
+        ports_per_component (int, optional): number of ports on each component. Defaults to 4.
+        repeats (int, optional): number of runs, the fastest one is kept. Defaults to 3.
+
+    Returns:
+        Dict[str, float]: sizes in bytes, best times in seconds and the load speedup of the binary format
+    """
+    # pylint: disable=import-outside-toplevel
+    from parchmint import Device, binary, jsonbackend
+    from parchmint.generator import generate_device
+
+    device = generate_device(component_count, ports_per_component)
+
+    def best_time(function: Callable[[], Any]) -> float:
+        times = []
+        for _ in range(max(repeats, 1)):
+            start_time = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start_time)
+        return min(times)
 
-    # Generate Header list to be used in tabulate
-    headers = [
-        "Name",
-        "Components",
-        "Connections",
-        "Valves",
-        "Layers",
-        "Control",
-        "MaxConnectivity",
-        "StdDevArea",
-        "MeanArea",
-        "Max(Xspan,Yspan)",
-        "Min(Xspan,Yspan)",
-    ]
-
-    print(tabulate(file_info, headers=headers, tablefmt="latex", floatfmt=".2f"))
-
-    return file_info
+    json_data = jsonbackend.dumps_bytes(device.to_parchmint_v1_2())
+    binary_data = binary.dumps(device)
+    json_load = best_time(lambda: Device.from_json(json_data))
+    binary_load = best_time(lambda: binary.loads(binary_data))
+    return {
+        "components": component_count,
+        "json_bytes": len(json_data),
+        "binary_bytes": len(binary_data),
+        "json_dump_seconds": best_time(
+            lambda: jsonbackend.dumps_bytes(device.to_parchmint_v1_2())
+        ),
+        "binary_dump_seconds": best_time(lambda: binary.dumps(device)),
+        "json_load_seconds": json_load,
+        "binary_load_seconds": binary_load,
+        "load_speedup": json_load / binary_load if binary_load > 0 else float("inf"),
+    }
@@ -0,0 +1,567 @@
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from parchmint import jsonbackend
+from parchmint.component import Component
+from parchmint.connection import Connection, ConnectionPath
+from parchmint.feature import Feature
+from parchmint.layer import Layer
+from parchmint.params import Params
+from parchmint.port import Port
+from parchmint.target import Target
+
+if TYPE_CHECKING:
+    from parchmint.device import Device
+
+MAGIC = b"PMNTBIN\x00"
+FORMAT_VERSION = 1
+
+# File layout: MAGIC, a little endian uint32 holding the length of the header,
+# the header (a JSON object describing the columns) and the column payloads
+# one after the other. Every field of the object model is stored as a column
+# holding the values of all the entities of a kind, e.g. "ports.x" holds the x
+# coordinate of every port of every component in order. The kind of a column
+# is picked from its values:
+STRING = "s"  # uint32 indices into the string table
+INTEGER = "i"  # int64 array
+FLOAT = "f"  # float64 array
+JSON = "j"  # JSON array, for params and for columns mixing value types
+
+_LENGTH = struct.Struct("<I")
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _column_kind(values: List[Any]) -> str:
+    types = set(map(type, values))
+    if types <= {str}:
+        return STRING
+    if types <= {int}:
+        if values and (min(values) < _INT64_MIN or max(values) > _INT64_MAX):
+            return JSON
+        return INTEGER
+    if types <= {float}:
+        return FLOAT
+    return JSON
+
+
+class _ColumnWriter:
+    """Collects the columns of a file and the string table they refer to"""
+
+    def __init__(self) -> None:
+        self._strings: Dict[str, int] = {}
+        self._columns: List[Tuple[str, str, int, bytes]] = []
+
+    def add(self, name: str, values: List[Any], kind: Optional[str] = None) -> None:
+        """Encodes a column
+
+        Args:
+            name (str): name of the column
+            values (List[Any]): value of every entity
+            kind (Optional[str], optional): kind of the column, picked from the values when None. Defaults to None.
+        """
+        if kind is None:
+            kind = _column_kind(values)
+        if kind == STRING:
+            strings = self._strings
+            payload = np.fromiter(
+                (strings.setdefault(value, len(strings)) for value in values),
+                dtype="<u4",
+                count=len(values),
+            ).tobytes()
+        elif kind == INTEGER:
+            payload = np.array(values, dtype="<i8").tobytes()
+        elif kind == FLOAT:
+            payload = np.array(values, dtype="<f8").tobytes()
+        else:
+            payload = jsonbackend.dumps_bytes(values)
+        self._columns.append((name, kind, len(values), payload))
+
+    def to_bytes(self) -> bytes:
+        """Assembles the file
+
+        Returns:
+            bytes: contents of the file
+        """
+        strings = list(self._strings)
+        text = "".join(strings).encode("utf-8")
+        lengths = np.array([len(value) for value in strings], dtype="<u4").tobytes()
+        header = jsonbackend.dumps_bytes(
+            {
+                "format": FORMAT_VERSION,
+                "strings": [len(strings), len(text)],
+                "columns": [
+                    [name, kind, count, len(payload)]
+                    for name, kind, count, payload in self._columns
+                ],
+            }
+        )
+        return b"".join(
+            [MAGIC, _LENGTH.pack(len(header)), header, lengths, text]
+            + [payload for _, _, _, payload in self._columns]
+        )
+
+
+class _ColumnReader:
+    """Decodes the columns of a file on demand"""
+
+    def __init__(self, data: bytes) -> None:
+        if not is_binary(data):
+            raise ValueError("Not a binary ParchMint file")
+        view = memoryview(data)
+        offset = len(MAGIC)
+        if len(view) < offset + _LENGTH.size:
+            raise ValueError("Truncated binary ParchMint file")
+        (header_size,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        header = jsonbackend.loads(bytes(view[offset : offset + header_size]))
+        offset += header_size
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary ParchMint format: {header['format']}")
+
+        string_count, text_size = header["strings"]
+        lengths = np.frombuffer(view, dtype="<u4", count=string_count, offset=offset)
+        offset += lengths.nbytes
+        text = str(view[offset : offset + text_size], "utf-8")
+        offset += text_size
+        ends = np.cumsum(lengths).tolist()
+        self._strings: List[str] = [
+            text[start:end] for start, end in zip([0] + ends, ends)
+        ]
+
+        self._columns: Dict[str, Tuple[str, int, memoryview]] = {}
+        for name, kind, count, size in header["columns"]:
+            self._columns[name] = (kind, count, view[offset : offset + size])
+            offset += size
+        if offset > len(view):
+            raise ValueError("Truncated binary ParchMint file")
+
+    def array(self, name: str) -> Optional[npt.NDArray]:
+        """Returns a numeric column as an array
+
+        Args:
+            name (str): name of the column
+
+        Returns:
+            Optional[npt.NDArray]: values, None if the column is not numeric
+        """
+        kind, count, payload = self._columns[name]
+        if kind == INTEGER:
+            return np.frombuffer(payload, dtype="<i8", count=count)
+        if kind == FLOAT:
+            return np.frombuffer(payload, dtype="<f8", count=count)
+        return None
+
+    def values(self, name: str) -> List[Any]:
+        """Returns a column as a list
+
+        Args:
+            name (str): name of the column
+
+        Returns:
+            List[Any]: value of every entity
+        """
+        kind, count, payload = self._columns[name]
+        if kind == STRING:
+            strings = self._strings
+            return [
+                strings[index]
+                for index in np.frombuffer(payload, dtype="<u4", count=count).tolist()
+            ]
+        if kind == JSON:
+            return jsonbackend.loads(bytes(payload))
+        return self.array(name).tolist()  # type: ignore
+
+
+def _target_columns(
+    writer: _ColumnWriter, prefix: str, targets: List[Optional[Dict]]
+) -> None:
+    writer.add(
+        f"{prefix}.component",
+        [None if target is None else target["component"] for target in targets],
+    )
+    writer.add(
+        f"{prefix}.port",
+        [None if target is None else target["port"] for target in targets],
+    )
+
+
+def dumps(device_ref: Device) -> bytes:
+    """Encodes a device in the binary ParchMint format
+
+    Args:
+        device_ref (Device): device to encode
+
+    Returns:
+        bytes: contents of the binary file
+    """
+    # pylint: disable=protected-access
+    device_ref._check_valve_types()
+    device_ref.params.set_param("x-span", device_ref.xspan)
+    device_ref.params.set_param("y-span", device_ref.yspan)
+
+    writer = _ColumnWriter()
+    writer.add("device.name", [device_ref.name])
+    writer.add("device.params", [device_ref.params.to_parchmint_v1()], JSON)
+
+    layers = device_ref.layers
+    writer.add("layers.id", [layer.ID for layer in layers])
+    writer.add("layers.name", [layer.name for layer in layers])
+    writer.add("layers.type", [layer.layertype for layer in layers])
+    writer.add("layers.group", [layer.group for layer in layers])
+    writer.add(
+        "layers.params", [layer.params.to_parchmint_v1() for layer in layers], JSON
+    )
+
+    features = device_ref.features
+    writer.add("features.id", [feature._id for feature in features])
+    writer.add("features.type", [feature._type for feature in features])
+    writer.add("features.macro", [feature._macro for feature in features])
+    writer.add(
+        "features.params",
+        [
+            None if feature._params is None else feature._params.to_parchmint_v1()
+            for feature in features
+        ],
+        JSON,
+    )
+    writer.add(
+        "features.layer",
+        [None if f._layer is None else f._layer.ID for f in features],
+    )
+
+    components = device_ref.components
+    writer.add("components.id", [c.ID for c in components])
+    writer.add("components.name", [c.name for c in components])
+    writer.add("components.entity", [c.entity for c in components])
+    writer.add("components.xspan", [c.xspan for c in components])
+    writer.add("components.yspan", [c.yspan for c in components])
+    writer.add(
+        "components.params", [c.params.to_parchmint_v1() for c in components], JSON
+    )
+    writer.add("components.layer_count", [len(c.layers) for c in components])
+    writer.add(
+        "components.layers", [layer.ID for c in components for layer in c.layers]
+    )
+    writer.add("components.port_count", [len(c.ports) for c in components])
+    ports = [port for c in components for port in c.ports]
+    writer.add("ports.label", [port.label for port in ports])
+    writer.add("ports.layer", [port.layer for port in ports])
+    writer.add("ports.x", [port.x for port in ports])
+    writer.add("ports.y", [port.y for port in ports])
+
+    connections = device_ref.connections
+    writer.add("connections.id", [c.ID for c in connections])
+    writer.add("connections.name", [c.name for c in connections])
+    writer.add("connections.entity", [c.entity for c in connections])
+    writer.add(
+        "connections.layer",
+        [None if c.layer is None else c.layer.ID for c in connections],
+    )
+    writer.add(
+        "connections.params", [c.params.to_parchmint_v1() for c in connections], JSON
+    )
+    _target_columns(
+        writer,
+        "connections.source",
+        [None if c.source is None else c.source.to_parchmint_v1() for c in connections],
+    )
+    writer.add("connections.sink_count", [len(c.sinks) for c in connections])
+    _target_columns(
+        writer,
+        "sinks",
+        [sink.to_parchmint_v1() for c in connections for sink in c.sinks],
+    )
+
+    writer.add("connections.path_count", [len(c.paths) for c in connections])
+    paths = [path.to_parchmint_v1_2() for c in connections for path in c.paths]
+    _target_columns(writer, "paths.source", [path["source"] for path in paths])
+    _target_columns(writer, "paths.sink", [path["sink"] for path in paths])
+    writer.add("paths.feature_count", [len(path["features"]) for path in paths])
+    writer.add(
+        "paths.features",
+        [feature_id for path in paths for feature_id in path["features"]],
+    )
+    writer.add("paths.waypoint_count", [len(path["wayPoints"]) for path in paths])
+    writer.add("waypoints.x", [p[0] for path in paths for p in path["wayPoints"]])
+    writer.add("waypoints.y", [p[1] for path in paths for p in path["wayPoints"]])
+
+    valves = list(device_ref._valve_objects_v1_2())
+    writer.add("valves.component", [valve["componentid"] for valve in valves])
+    writer.add("valves.connection", [valve["connectionid"] for valve in valves])
+    writer.add("valves.type", [valve["type"] for valve in valves])
+
+    return writer.to_bytes()
+
+
+def _params(value: Dict) -> Params:
+    # The dicts are freshly decoded, so they are adopted instead of copied
+    params = Params()
+    params.data = value
+    return params
+
+
+def _targets(reader: _ColumnReader, prefix: str) -> List[Target]:
+    return [
+        Target(component, port)
+        for component, port in zip(
+            reader.values(f"{prefix}.component"), reader.values(f"{prefix}.port")
+        )
+    ]
+
+
+def _waypoints(
+    reader: _ColumnReader, counts: List[int], array_waypoints: bool
+) -> List[Union[List[Tuple[Any, Any]], npt.NDArray]]:
+    """Splits the waypoint columns into the waypoints of each path"""
+    ends = np.cumsum(counts, dtype=np.intp)
+    if array_waypoints:
+        xs, ys = reader.array("waypoints.x"), reader.array("waypoints.y")
+        if xs is None or ys is None:
+            xs = np.asarray(reader.values("waypoints.x"))
+            ys = np.asarray(reader.values("waypoints.y"))
+        return np.split(np.column_stack((xs, ys)), ends[:-1])  # type: ignore
+
+    xs, ys = reader.values("waypoints.x"), reader.values("waypoints.y")
+    starts = [0] + ends.tolist()
+    return [
+        list(zip(xs[start:end], ys[start:end]))
+        for start, end in zip(starts, ends.tolist())
+    ]
+
+
+def _ports(reader: _ColumnReader) -> List[Port]:
+    labels = reader.values("ports.label")
+    port_layers = reader.values("ports.layer")
+    ret = [
+        Port(label, layer, x, y)
+        for label, layer, x, y in zip(
+            labels, port_layers, reader.values("ports.x"), reader.values("ports.y")
+        )
+    ]
+    # The constructor replaces empty labels and layers (e.g. None) with ""
+    for port, label, layer in zip(ret, labels, port_layers):
+        if not label:
+            port.label = label
+        if not layer:
+            port.layer = layer
+    return ret
+
+
+def _components(reader: _ColumnReader, layers: Dict[str, Layer]) -> List[Component]:
+    ports = _ports(reader)
+    port_counts = reader.values("components.port_count")
+    port_ends = np.cumsum(port_counts, dtype=np.intp).tolist()
+    layer_counts = reader.values("components.layer_count")
+    layer_ends = np.cumsum(layer_counts, dtype=np.intp).tolist()
+    component_layers = [
+        layers[layer_id] for layer_id in reader.values("components.layers")
+    ]
+
+    ret = []
+    for (
+        component_id,
+        name,
+        entity,
+        xspan,
+        yspan,
+        params,
+        layer_end,
+        layer_count,
+        port_end,
+        port_count,
+    ) in zip(
+        reader.values("components.id"),
+        reader.values("components.name"),
+        reader.values("components.entity"),
+        reader.values("components.xspan"),
+        reader.values("components.yspan"),
+        reader.values("components.params"),
+        layer_ends,
+        layer_counts,
+        port_ends,
+        port_counts,
+    ):
+        component = Component(
+            name=name,
+            ID=component_id,
+            entity=entity,
+            xspan=xspan,
+            yspan=yspan,
+            layers=component_layers[layer_end - layer_count : layer_end],
+            ports_list=ports[port_end - port_count : port_end],
+        )
+        # Set after construction, the constructor would reset the position
+        component.params = _params(params)
+        ret.append(component)
+    return ret
+
+
+def _connections(
+    reader: _ColumnReader,
+    layers: Dict[str, Layer],
+    features: Dict[str, Feature],
+    array_waypoints: bool,
+) -> List[Connection]:
+    sinks = iter(_targets(reader, "sinks"))
+    path_features = iter(reader.values("paths.features"))
+    paths = [
+        ConnectionPath(
+            source,
+            sink,
+            waypoints,
+            [features[next(path_features)] for _ in range(feature_count)],
+        )
+        for source, sink, waypoints, feature_count in zip(
+            _targets(reader, "paths.source"),
+            _targets(reader, "paths.sink"),
+            _waypoints(reader, reader.values("paths.waypoint_count"), array_waypoints),
+            reader.values("paths.feature_count"),
+        )
+    ]
+    path_counts = reader.values("connections.path_count")
+    path_ends = np.cumsum(path_counts, dtype=np.intp).tolist()
+
+    return [
+        Connection(
+            name=name,
+            ID=connection_id,
+            entity=entity,
+            layer=None if layer_id is None else layers[layer_id],
+            params=_params(params),
+            source=source,
+            sinks=[next(sinks) for _ in range(sink_count)],
+            paths=paths[path_end - path_count : path_end],
+        )
+        for connection_id, name, entity, layer_id, params, source, sink_count, path_end, path_count in zip(
+            reader.values("connections.id"),
+            reader.values("connections.name"),
+            reader.values("connections.entity"),
+            reader.values("connections.layer"),
+            reader.values("connections.params"),
+            _targets(reader, "connections.source"),
+            reader.values("connections.sink_count"),
+            path_ends,
+            path_counts,
+        )
+    ]
+
+
+def _load(reader: _ColumnReader, array_waypoints: bool) -> Device:
+    # pylint: disable=import-outside-toplevel,protected-access
+    from parchmint.device import Device
+
+    device_ref = Device(reader.values("device.name")[0])
+
+    for layer_id, name, layer_type, group, params in zip(
+        reader.values("layers.id"),
+        reader.values("layers.name"),
+        reader.values("layers.type"),
+        reader.values("layers.group"),
+        reader.values("layers.params"),
+    ):
+        device_ref.add_layer(Layer(layer_id, name, layer_type, group, _params(params)))
+    layers: Dict[str, Layer] = {}
+    for layer in device_ref.layers:
+        layers.setdefault(layer.ID, layer)
+
+    for feature_id, feature_type, macro, params, layer_id in zip(
+        reader.values("features.id"),
+        reader.values("features.type"),
+        reader.values("features.macro"),
+        reader.values("features.params"),
+        reader.values("features.layer"),
+    ):
+        device_ref.add_feature(
+            Feature(
+                feature_id,
+                feature_type,
+                macro,
+                None if params is None else _params(params),
+                None if layer_id is None else layers[layer_id],
+            )
+        )
+    features: Dict[str, Feature] = {}
+    for feature in device_ref.features:
+        features.setdefault(feature.ID, feature)
+
+    device_ref.add_components(_components(reader, layers))
+    device_ref.add_connections(_connections(reader, layers, features, array_waypoints))
+
+    device_ref._load_params_v1_2(device_ref, reader.values("device.params")[0])
+
+    for component_id, connection_id, valve_type in zip(
+        reader.values("valves.component"),
+        reader.values("valves.connection"),
+        reader.values("valves.type"),
+    ):
+        device_ref._load_valve_v1_2(
+            device_ref,
+            {
+                "componentid": component_id,
+                "connectionid": connection_id,
+                "type": valve_type,
+            },
+        )
+
+    return device_ref
+
+
+def loads(data: bytes, array_waypoints: bool = False) -> Device:
+    """Decodes a device from the binary ParchMint format
+
+    The objects are built column by column and handed to the device in bulk.
+
+    Args:
+        data (bytes): contents of the binary file
+        array_waypoints (bool, optional): store the waypoints of the paths as arrays. Defaults to False.
+
+    Raises:
+        ValueError: if the data is not a binary ParchMint file of a supported format version
+
+    Returns:
+        Device: decoded device
+    """
+    return _load(_ColumnReader(data), array_waypoints)
+
+
+def is_binary(data: bytes) -> bool:
+    """Checks if the data starts like a binary ParchMint file
+
+    Args:
+        data (bytes): contents, or the first bytes, of a file
+
+    Returns:
+        bool: true if the data starts with the binary ParchMint magic number
+    """
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def dump_file(device_ref: Device, file_path) -> None:
+    """Writes a device to a binary ParchMint file
+
+    Args:
+        device_ref (Device): device to write
+        file_path (str | Path): path of the file
+    """
+    with open(file_path, "wb") as data_file:
+        data_file.write(dumps(device_ref))
+
+
+def load_file(file_path, array_waypoints: bool = False) -> Device:
+    """Reads a device from a binary ParchMint file
+
+    Args:
+        file_path (str | Path): path of the file
+        array_waypoints (bool, optional): store the waypoints of the paths as arrays. Defaults to False.
+
+    Returns:
+        Device: device read from the file
+    """
+    with open(file_path, "rb") as data_file:
+        return loads(data_file.read(), array_waypoints)
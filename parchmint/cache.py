@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import tempfile
+from importlib import metadata
+from typing import TYPE_CHECKING, List, Optional, Union
+
+from parchmint import binary, jsonbackend
+from parchmint.validation import (
+    ValidationIssue,
+    detect_schema_version,
+    validate_json_data,
+)
+
+if TYPE_CHECKING:
+    from parchmint.device import Device
+
+DEFAULT_MAX_BYTES = 1 << 30
+
+SNAPSHOT_SUFFIX = ".pmb"
+VALIDATION_SUFFIX = ".validation.json"
+
+# Bumped when the way files are parsed into devices changes, so that snapshots
+# written by older code are not picked up
+CACHE_VERSION = 1
+
+
+def _library_version() -> str:
+    try:
+        return metadata.version("parchmint")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def default_directory() -> pathlib.Path:
+    """Returns the cache directory used when none is given, from the
+    PARCHMINT_CACHE_DIR environment variable or else under ~/.cache
+
+    Returns:
+        pathlib.Path: cache directory
+    """
+    directory = os.environ.get("PARCHMINT_CACHE_DIR")
+    if directory:
+        return pathlib.Path(directory)
+    return pathlib.Path.home().joinpath(".cache", "parchmint")
+
+
+class DeviceCache:
+    """Content addressed on-disk cache of parsed devices.
+
+    Entries are keyed by the SHA-256 of the file contents together with the
+    library, cache and binary format versions, so an edited file or an upgrade
+    never hits a stale entry. Each entry is a binary ParchMint snapshot of the
+    parsed device (see parchmint.binary) and, once asked for, the validation
+    result of the file.
+
+    Entries are written to a temporary file and moved into place with
+    os.replace(), so concurrent readers see either no entry or a complete one,
+    and concurrent writers of the same entry write the same bytes. Reading an
+    entry refreshes its modification time, and the least recently used entries
+    are evicted once the cache grows beyond max_bytes. The size of the cache is
+    kept as a running total of the entries written since the last eviction, so
+    the directory is only scanned when the total passes max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Creates a cache in the given directory, which is created if needed
+
+        Args:
+            directory (Optional[Union[str, os.PathLike]], optional): cache directory, see default_directory() when None. Defaults to None.
+            max_bytes (int, optional): size the cache is trimmed to once writes take it beyond. Defaults to 1GB.
+        """
+        self.directory = (
+            default_directory() if directory is None else pathlib.Path(directory)
+        )
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Size of the entries as of the last scan plus the bytes written since,
+        # None until the directory is first scanned. Entries written or removed
+        # by other processes are only accounted for at the next eviction.
+        self._size: Optional[int] = None
+        self._salt = "\0".join(
+            [_library_version(), str(CACHE_VERSION), str(binary.FORMAT_VERSION), ""]
+        ).encode("utf-8")
+
+    def key(self, data: bytes) -> str:
+        """Returns the key of the entry for the contents of a file
+
+        Args:
+            data (bytes): contents of the ParchMint file
+
+        Returns:
+            str: hex digest
+        """
+        return hashlib.sha256(self._salt + data).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> pathlib.Path:
+        return self.directory.joinpath(key + suffix)
+
+    def _read(self, path: pathlib.Path) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as entry_file:
+                data = entry_file.read()
+        except FileNotFoundError:
+            # Missing, or evicted by another process in the meantime
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted after being read, the data is still good
+            pass
+        return data
+
+    def _write(self, path: pathlib.Path, data: bytes) -> None:
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as entry_file:
+                entry_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def get(self, data: bytes, array_waypoints: bool = False) -> Optional[Device]:
+        """Returns the cached device for the contents of a file
+
+        Args:
+            data (bytes): contents of the ParchMint file
+            array_waypoints (bool, optional): store the waypoints of the paths as arrays. Defaults to False.
+
+        Returns:
+            Optional[Device]: a new device decoded from the snapshot, None if there is no usable entry
+        """
+        path = self._path(self.key(data), SNAPSHOT_SUFFIX)
+        snapshot = self._read(path)
+        if snapshot is None:
+            return None
+        try:
+            return binary.loads(snapshot, array_waypoints)
+        except (ValueError, KeyError, IndexError):
+            # Damaged entry, it is dropped and rebuilt
+            self._remove(path)
+            return None
+
+    def put(self, data: bytes, device: Device) -> None:
+        """Stores the device parsed from the contents of a file
+
+        Args:
+            data (bytes): contents of the ParchMint file
+            device (Device): device parsed from the contents
+        """
+        self._write(self._path(self.key(data), SNAPSHOT_SUFFIX), binary.dumps(device))
+
+    def load(self, file_path, array_waypoints: bool = False) -> Device:
+        """Loads a ParchMint file, from the cache when the same contents were
+        loaded before and with Device.from_json() otherwise
+
+        Args:
+            file_path (str | Path): path of the ParchMint file
+            array_waypoints (bool, optional): store the waypoints of the paths as arrays. Defaults to False.
+
+        Returns:
+            Device: device of the file
+        """
+        # pylint: disable=import-outside-toplevel
+        from parchmint.device import Device
+
+        with open(file_path, "rb") as data_file:
+            data = data_file.read()
+        ret = self.get(data, array_waypoints)
+        if ret is None:
+            ret = Device.from_json(data, array_waypoints)
+            self.put(data, ret)
+        return ret
+
+    def validation_issues(self, file_path) -> List[ValidationIssue]:
+        """Validates a ParchMint file against the schema of its version, the
+        result is cached alongside the device
+
+        Args:
+            file_path (str | Path): path of the ParchMint file
+
+        Returns:
+            List[ValidationIssue]: violations found, empty if the file is valid
+        """
+        with open(file_path, "rb") as data_file:
+            data = data_file.read()
+        path = self._path(self.key(data), VALIDATION_SUFFIX)
+        cached = self._read(path)
+        if cached is not None:
+            try:
+                return [ValidationIssue(*issue) for issue in jsonbackend.loads(cached)]
+            except (ValueError, TypeError):
+                self._remove(path)
+
+        json_data = jsonbackend.loads(data)
+        ret = validate_json_data(json_data, detect_schema_version(json_data))
+        self._write(path, jsonbackend.dumps_bytes([list(issue) for issue in ret]))
+        return ret
+
+    def _entries(self) -> List[os.DirEntry]:
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file()
+            and (
+                entry.name.endswith(SNAPSHOT_SUFFIX)
+                or entry.name.endswith(VALIDATION_SUFFIX)
+            )
+        ]
+
+    @staticmethod
+    def _remove(path: Union[str, os.PathLike]) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def size(self) -> int:
+        """Returns the total size of the entries
+
+        Returns:
+            int: size in bytes
+        """
+        ret = 0
+        for entry in self._entries():
+            try:
+                ret += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return ret
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Removes the least recently used entries until the cache fits
+
+        Args:
+            max_bytes (Optional[int], optional): size to trim the cache to, the max_bytes of the cache when None. Defaults to None.
+
+        Returns:
+            int: number of entries removed
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        stats = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            stats.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in stats)
+        ret = 0
+        for _, size, path in sorted(stats):
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= size
+            ret += 1
+        self._size = total
+        return ret
+
+    def clear(self) -> None:
+        """Removes all the entries"""
+        self.evict(0)
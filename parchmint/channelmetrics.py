@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from parchmint.connection import Connection
+
+
+class ChannelMetrics(NamedTuple):
+    """Routing metrics of a set of connections, one entry per connection"""
+
+    connection_ids: List[str]
+    """IDs of the connections, in the order of the arrays"""
+
+    lengths: npt.NDArray[np.float64]
+    """(C,) total length of the path segments of each connection"""
+
+    bends: npt.NDArray[np.int64]
+    """(C,) number of direction changes along the paths of each connection"""
+
+    manhattan_lengths: npt.NDArray[np.float64]
+    """(C,) length of the horizontal and vertical segments of each connection"""
+
+    bboxes: npt.NDArray[np.float64]
+    """(C, 4) bounding box of the waypoints as xmin, ymin, xmax, ymax, NaN for
+    connections without waypoints"""
+
+    @property
+    def total_length(self) -> float:
+        """Returns the channel length summed over all the connections"""
+        return float(self.lengths.sum())
+
+    @property
+    def manhattan_ratio(self) -> npt.NDArray[np.float64]:
+        """Returns the (C,) fraction of each connection routed with horizontal
+        and vertical segments, 1 for connections without length"""
+        ratio = np.ones_like(self.lengths)
+        np.divide(
+            self.manhattan_lengths, self.lengths, out=ratio, where=self.lengths > 0
+        )
+        return ratio
+
+    @property
+    def is_manhattan(self) -> npt.NDArray[np.bool_]:
+        """Returns the (C,) mask of the connections routed only with horizontal
+        and vertical segments"""
+        return np.isclose(self.manhattan_lengths, self.lengths)
+
+    def for_connection(self, connection_id: str) -> Dict:
+        """Returns the metrics of a single connection
+
+        Args:
+            connection_id (str): ID of the connection
+
+        Returns:
+            Dict: length, bends, manhattan_ratio and bbox of the connection
+        """
+        index = self.connection_ids.index(connection_id)
+        return {
+            "length": float(self.lengths[index]),
+            "bends": int(self.bends[index]),
+            "manhattan_ratio": float(self.manhattan_ratio[index]),
+            "bbox": tuple(self.bboxes[index].tolist()),
+        }
+
+
+def channel_metrics(connections: Sequence[Connection]) -> ChannelMetrics:
+    """Computes the routing metrics of the connections with array math over all
+    the waypoints at once, instead of looping over the waypoints in Python
+
+    Args:
+        connections (Sequence[Connection]): connections to measure
+
+    Returns:
+        ChannelMetrics: metrics of each connection
+    """
+    path_owner: List[int] = []
+    arrays = []
+    for index, connection in enumerate(connections):
+        for path in connection.paths:
+            path_owner.append(index)
+            arrays.append(path.waypoints_array)
+
+    connection_count = len(connections)
+    point_counts = np.array([len(array) for array in arrays], dtype=np.intp)
+    points = (
+        np.concatenate(arrays).astype(np.float64)
+        if point_counts.sum() > 0
+        else np.empty((0, 2))
+    )
+    # Connection and path each point belongs to
+    point_path = np.repeat(np.arange(len(arrays)), point_counts)
+    point_owner = np.asarray(path_owner, dtype=np.intp)[point_path]
+
+    # Segments join consecutive points of the same path, zero length segments
+    # are dropped so that repeated waypoints do not count as bends
+    deltas = np.diff(points, axis=0)
+    same_path = point_path[1:] == point_path[:-1]
+    segment_lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+    keep = same_path & (segment_lengths > 0)
+    deltas = deltas[keep]
+    segment_lengths = segment_lengths[keep]
+    segment_path = point_path[1:][keep]
+    segment_owner = point_owner[1:][keep]
+
+    # bincount gives int64 instead of float64 when there are no segments
+    lengths = np.bincount(
+        segment_owner, weights=segment_lengths, minlength=connection_count
+    ).astype(np.float64, copy=False)
+    axis_aligned = (deltas[:, 0] == 0) | (deltas[:, 1] == 0)
+    manhattan_lengths = np.bincount(
+        segment_owner,
+        weights=np.where(axis_aligned, segment_lengths, 0),
+        minlength=connection_count,
+    ).astype(np.float64, copy=False)
+
+    # A bend is a change of direction between consecutive segments of a path
+    directions = deltas / segment_lengths[:, None] if len(deltas) else deltas
+    turning = np.any(np.abs(directions[1:] - directions[:-1]) > 1e-9, axis=1)
+    is_bend = turning & (segment_path[1:] == segment_path[:-1])
+    bends = np.bincount(segment_owner[1:][is_bend], minlength=connection_count).astype(
+        np.int64
+    )
+
+    # Waypoints are grouped by connection, so the bounding boxes are reductions
+    # over contiguous runs of points
+    bboxes = np.full((connection_count, 4), np.nan)
+    owners_with_points = np.unique(point_owner)
+    if len(owners_with_points):
+        starts = np.searchsorted(point_owner, owners_with_points)
+        bboxes[owners_with_points, :2] = np.minimum.reduceat(points, starts, axis=0)
+        bboxes[owners_with_points, 2:] = np.maximum.reduceat(points, starts, axis=0)
+
+    return ChannelMetrics(
+        connection_ids=[connection.ID for connection in connections],
+        lengths=lengths,
+        bends=bends,
+        manhattan_lengths=manhattan_lengths,
+        bboxes=bboxes,
+    )
@@ -1,7 +1,20 @@
 import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, TextIO
 
+from parchmint import binary, jsonbackend
+from parchmint.benchmarking import characterize_files, write_characteristics
 from parchmint.device import Device
+from parchmint.validation import detect_schema_version, validate_json_data
+
+TSV_COLUMNS = ["path", "version", "valid", "errors", "seconds", "first_error"]
 
 
 def validate_v1():
@@ -15,3 +28,231 @@ def validate_v1():
     file_path = Path(args.input).resolve()
     with open(file_path, encoding="utf-8") as data_file:
         Device.validate_v1(data_file.read())
+
+
+def validate_file(file_path: str) -> Dict:
+    """Validates a single ParchMint file against the schema matching its version
+
+    Args:
+        file_path (str): path of the file
+
+    Returns:
+        Dict: summary record of the validation with the timing of the file
+    """
+    start_time = time.perf_counter()
+    record: Dict = {"path": file_path, "version": None, "valid": False}
+    try:
+        json_data = jsonbackend.load_file(file_path)
+        if not isinstance(json_data, dict):
+            raise ValueError(
+                f"Expected a JSON object at the top level, got {type(json_data).__name__}"
+            )
+        record["version"] = json_data.get("version")
+        issues = validate_json_data(json_data, detect_schema_version(json_data))
+        record["valid"] = len(issues) == 0
+        record["errors"] = [
+            {"path": issue.path, "message": issue.message} for issue in issues
+        ]
+    except (OSError, ValueError) as error:
+        record["errors"] = [{"path": "$", "message": str(error)}]
+    record["seconds"] = round(time.perf_counter() - start_time, 6)
+    return record
+
+
+def validate_files(
+    file_paths: List[str], jobs: int = 1, chunksize: int = 16
+) -> Iterator[Dict]:
+    """Validates the files over a pool of worker processes
+
+    Args:
+        file_paths (List[str]): paths of the files
+        jobs (int, optional): number of worker processes, the files are validated in this process when 1. Defaults to 1.
+        chunksize (int, optional): number of files handed to a worker at a time. Defaults to 16.
+
+    Yields:
+        Dict: validation record of each file, in the order of file_paths
+    """
+    if jobs <= 1 or len(file_paths) <= 1:
+        yield from map(validate_file, file_paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(validate_file, file_paths, chunksize=chunksize)
+
+
+def write_records(records: Iterable[Dict], output: TextIO, output_format: str) -> int:
+    """Writes the validation records as JSON lines or as tab separated values
+
+    Args:
+        records (Iterable[Dict]): validation records
+        output (TextIO): stream to write to
+        output_format (str): "jsonl" or "tsv"
+
+    Returns:
+        int: number of invalid files
+    """
+    invalid_count = 0
+    if output_format == "tsv":
+        output.write("\t".join(TSV_COLUMNS) + "\n")
+    for record in records:
+        if not record["valid"]:
+            invalid_count += 1
+        if output_format == "tsv":
+            errors = record["errors"]
+            first_error = (
+                "{}: {}".format(errors[0]["path"], errors[0]["message"])
+                if errors
+                else ""
+            )
+            row = [
+                record["path"],
+                record["version"],
+                record["valid"],
+                len(errors),
+                record["seconds"],
+                " ".join(first_error.split()),
+            ]
+            output.write("\t".join(str(value) for value in row) + "\n")
+        else:
+            output.write(json.dumps(record) + "\n")
+    return invalid_count
+
+
+def validate_dir():
+    """Validate all the ParchMint files in a directory against the schema of their versions"""
+
+    parser = argparse.ArgumentParser(
+        description="Validates every ParchMint file in a directory and writes a summary per file"
+    )
+
+    parser.add_argument("directory", help="Directory that is searched for the files")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (defaults to the number of CPUs)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["jsonl", "tsv"],
+        default="jsonl",
+        help="Format of the summary",
+    )
+    parser.add_argument(
+        "-o", "--output", help="File to write the summary to (defaults to stdout)"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="**/*.json",
+        help="Glob pattern of the files, relative to the directory",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=16,
+        help="Number of files handed to a worker process at a time",
+    )
+
+    args = parser.parse_args()
+    file_paths = sorted(
+        glob.glob(os.path.join(args.directory, args.pattern), recursive=True)
+    )
+    records = validate_files(file_paths, jobs=args.jobs, chunksize=args.chunksize)
+
+    if args.output is None:
+        invalid_count = write_records(records, sys.stdout, args.format)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            invalid_count = write_records(records, output, args.format)
+
+    sys.exit(1 if invalid_count > 0 else 0)
+
+
+def convert():
+    """Converts a device between ParchMint JSON and the binary ParchMint format"""
+
+    parser = argparse.ArgumentParser(
+        description="Converts between ParchMint JSON and binary ParchMint files, "
+        "the format of the input is detected from its contents"
+    )
+
+    parser.add_argument("input", help="File to convert")
+    parser.add_argument("output", help="File to write")
+    parser.add_argument(
+        "-t",
+        "--to",
+        choices=["json", "binary"],
+        help="Format of the output (defaults to json for .json outputs and binary otherwise)",
+    )
+    parser.add_argument(
+        "--version",
+        choices=["1", "1.2"],
+        default="1.2",
+        help="ParchMint version of JSON outputs",
+    )
+
+    args = parser.parse_args()
+    output_format = args.to
+    if output_format is None:
+        output_format = "json" if args.output.endswith(".json") else "binary"
+
+    with open(args.input, "rb") as data_file:
+        is_binary_input = binary.is_binary(data_file.read(len(binary.MAGIC)))
+    if is_binary_input:
+        device = binary.load_file(args.input)
+    else:
+        device = Device.from_file(args.input)
+
+    if output_format == "json":
+        device.to_file(args.output, version=args.version, streaming=True)
+    else:
+        binary.dump_file(device, args.output)
+
+
+def characterize_dir():
+    """Characterize all the ParchMint files in a directory"""
+
+    parser = argparse.ArgumentParser(
+        description="Computes the size and shape statistics of every ParchMint file in a directory"
+    )
+
+    parser.add_argument("directory", help="Directory that is searched for the files")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (defaults to the number of CPUs)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["tsv", "csv", "json"],
+        default="tsv",
+        help="Format of the table",
+    )
+    parser.add_argument(
+        "-o", "--output", help="File to write the table to (defaults to stdout)"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="**/*.json",
+        help="Glob pattern of the files, relative to the directory",
+    )
+
+    args = parser.parse_args()
+    # Shows the warnings of the files that are skipped
+    logging.basicConfig(format="%(levelname)s: %(message)s")
+    file_paths = sorted(
+        glob.glob(os.path.join(args.directory, args.pattern), recursive=True)
+    )
+    rows = characterize_files(file_paths, jobs=args.jobs)
+
+    if args.output is None:
+        row_count = write_characteristics(rows, sys.stdout, args.format)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            row_count = write_characteristics(rows, output, args.format)
+
+    sys.exit(1 if row_count < len(file_paths) else 0)
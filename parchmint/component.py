@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import logging
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import numpy as np
+import numpy.typing as npt
 
+from parchmint import geometry, hashing
 from parchmint.layer import Layer
 from parchmint.params import Params
 from parchmint.port import Port
@@ -11,16 +14,29 @@ from parchmint.port import Port
 if TYPE_CHECKING:
     from parchmint.device import Device
 
+logger = logging.getLogger(__name__)
+
 
 class Component:
     """The component class describes all the components in the device."""
 
+    __slots__ = (
+        "name",
+        "ID",
+        "params",
+        "entity",
+        "xspan",
+        "yspan",
+        "_ports",
+        "layers",
+    )
+
     def __init__(
         self,
         name: str = "",
         ID: str = "",
         layers: Optional[List[Layer]] = None,
-        params: Params = Params(),
+        params: Optional[Params] = None,
         ports_list: Optional[List[Port]] = None,
         entity: str = "",
         xspan: int = -1,
@@ -39,8 +55,8 @@ class Component:
         """
         self.name: str = name
         self.ID: str = ID
-        self.params = params
-        self.entity: str = entity
+        self.params = params if params is not None else Params()
+        self.entity: str = hashing.intern_string(entity)
         self.xspan: int = xspan
         self.yspan: int = yspan
         self._ports: List[Port] = ports_list if ports_list else []
@@ -88,7 +104,6 @@ class Component:
         try:
             return self.params.get_param("position")[0]
         except Exception as error:
-            print("Could not find xpos for component")
             raise KeyError from error
 
     @xpos.setter
@@ -118,7 +133,6 @@ class Component:
         try:
             return self.params.get_param("position")[1]
         except Exception as error:
-            print("Could not find xpos for component")
             raise KeyError from error
 
     @ypos.setter
@@ -148,7 +162,6 @@ class Component:
         try:
             return self.params.get_param("rotation")
         except Exception as error:
-            print("Could not find rotation for component", error)
             raise KeyError(
                 f"Could not find rotation for component: {self.ID}"
             ) from error
@@ -180,10 +193,10 @@ class Component:
         self._ports.append(port)
 
     def __str__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def to_parchmint_v1(self):
         """Returns the json dict
@@ -245,7 +258,16 @@ class Component:
         return (x, y)
 
     def __hash__(self) -> int:
-        return hash(repr(self))
+        return hash(self.ID)
+
+    def content_digest(self) -> str:
+        """Returns a digest of the full contents of the component (unlike the hash,
+        which only covers the ID)
+
+        Returns:
+            str: hex digest
+        """
+        return hashing.content_digest(self.to_parchmint_v1())
 
     def rotate_point(
         self, xpos: float, ypos: float, angle: float
@@ -260,50 +282,24 @@ class Component:
         Returns:
             Tuple[float, float]: A tuple containing the rotated coordinates
         """
-        # pylint: disable=invalid-name, too-many-locals
-        # Setup the center to be used the translation matrices
-        center_x = self.xspan / 2
-        center_y = self.yspan / 2
-
-        # Setup all the corner points
-        old_topleft = np.array((0, 0, 1)).transpose()
-        old_topright = np.array((self.xspan, 0, 1)).transpose()
-        old_bottomleft = np.array((0, self.yspan, 1)).transpose()
-        old_bottomright = np.array((self.xspan, self.yspan, 1)).transpose()
-
-        pos = np.array(((xpos), (ypos), (1)))
-
-        T1 = np.array(((1, 0, -center_x), (0, 1, -center_y), (0, 0, 1)))
-
-        theta = np.radians(angle)
-        c, s = np.cos(theta), np.sin(theta)
-        R = np.array(((c, -s, 0), (s, c, 0), (0, 0, 1)))
-        T2 = np.array(((1, 0, center_x), (0, 1, center_y), (0, 0, 1)))
-
-        # Rotate the topRight corner and the bottomLeft corner about the center
-        rotated_topleft = T2.dot(R.dot(T1.dot(old_bottomleft)))
-        rotated_topright = T2.dot(R.dot(T1.dot(old_topleft)))
-        rotated_bottomright = T2.dot(R.dot(T1.dot(old_topright)))
-        rotated_bottomleft = T2.dot(R.dot(T1.dot(old_bottomright)))
-
-        # Find the new position of the topleft corner by finding the min of all the corner points
-        xmin = min(
-            rotated_topleft[0],
-            rotated_topright[0],
-            rotated_bottomleft[0],
-            rotated_bottomright[0],
-        )
-        ymin = min(
-            rotated_topleft[1],
-            rotated_topright[1],
-            rotated_bottomleft[1],
-            rotated_bottomright[1],
-        )
+        new_pos = self.rotate_points([(xpos, ypos)], angle)[0]
+        return (int(new_pos[0]), int(new_pos[1]))
+
+    def rotate_points(
+        self, points: npt.ArrayLike, angle: float
+    ) -> npt.NDArray[np.int64]:
+        """Rotates a batch of points around the topleft corner of the component
+        clockwise, using a single affine matrix for the whole batch
 
-        T3 = np.array(((1, 0, -xmin), (0, 1, -ymin), (0, 0, 1)))
+        Args:
+            points (npt.ArrayLike): (N, 2) array of point coordinates
+            angle (float): angle of rotation in degrees
 
-        new_pos = T3.dot(T2.dot(R.dot(T1.dot(pos))))
-        return (round(new_pos[0]), round(new_pos[1]))
+        Returns:
+            npt.NDArray[np.int64]: (N, 2) array of the rotated coordinates
+        """
+        matrix = geometry.frame_matrix(self.xspan, self.yspan, angle)
+        return geometry.round_points(geometry.transform_points(matrix, points))
 
     def rotate_point_around_center(
         self, xpos: float, ypos: float, angle: float
@@ -318,23 +314,25 @@ class Component:
         Returns:
             Tuple[float, float]: A tuple containing the rotated coordinates
         """
-        # pylint: disable=invalid-name,too-many-locals
-
-        # Setup the center to be used the translation matrices
-        center_x = self.xpos + self.xspan / 2
-        center_y = self.ypos + self.yspan / 2
+        new_pos = self.rotate_points_around_center([(xpos, ypos)], angle)[0]
+        return (int(new_pos[0]), int(new_pos[1]))
 
-        pos = np.array(((xpos), (ypos), (1)))
+    def rotate_points_around_center(
+        self, points: npt.ArrayLike, angle: float
+    ) -> npt.NDArray[np.int64]:
+        """Rotates a batch of points around the component center clockwise
 
-        T1 = np.array(((1, 0, -center_x), (0, 1, -center_y), (0, 0, 1)))
-
-        theta = np.radians(angle)
-        c, s = np.cos(theta), np.sin(theta)
-        R = np.array(((c, -s, 0), (s, c, 0), (0, 0, 1)))
-        T2 = np.array(((1, 0, center_x), (0, 1, center_y), (0, 0, 1)))
+        Args:
+            points (npt.ArrayLike): (N, 2) array of point coordinates
+            angle (float): angle of rotation in degrees
 
-        new_pos = T2.dot(R.dot(T1.dot(pos)))
-        return (round(new_pos[0]), round(new_pos[1]))
+        Returns:
+            npt.NDArray[np.int64]: (N, 2) array of the rotated coordinates
+        """
+        matrix = geometry.center_rotation_matrix(
+            self.xpos + self.xspan / 2, self.ypos + self.yspan / 2, angle
+        )
+        return geometry.round_points(geometry.transform_points(matrix, points))
 
     def get_rotated_component_definition(self, angle: int) -> Component:
         """Returns a new component with the same parameters but rotated by the given angle
@@ -345,24 +343,14 @@ class Component:
         Returns:
             Component: [description]
         """
-        new_topleft = self.rotate_point(0, 0, angle)
-        new_topright = self.rotate_point(self.xspan, 0, angle)
-        new_bottomleft = self.rotate_point(0, self.yspan, angle)
-        new_bottomright = self.rotate_point(self.xspan, self.yspan, angle)
+        corners = self.rotate_points(
+            [(0, 0), (self.xspan, 0), (0, self.yspan), (self.xspan, self.yspan)],
+            angle,
+        )
 
         # Find xmin, ymin, xmax, ymax for all the corner points
-        xmin = min(
-            new_topleft[0], new_topright[0], new_bottomleft[0], new_bottomright[0]
-        )
-        ymin = min(
-            new_topleft[1], new_topright[1], new_bottomleft[1], new_bottomright[1]
-        )
-        xmax = max(
-            new_topleft[0], new_topright[0], new_bottomleft[0], new_bottomright[0]
-        )
-        ymax = max(
-            new_topleft[1], new_topright[1], new_bottomleft[1], new_bottomright[1]
-        )
+        xmin, ymin = corners.min(axis=0).tolist()
+        xmax, ymax = corners.max(axis=0).tolist()
 
         # Find the new xspan and yspan
         new_xspan = abs(xmax - xmin)
@@ -386,13 +374,16 @@ class Component:
         rotated_component.rotation = 0
 
         # Create new ports with new rotated coordinates
-        for port in self._ports:
-            new_port = Port()
-            new_port.label = port.label
-            new_location = self.rotate_point(port.x, port.y, angle)
-            new_port.x = new_location[0]
-            new_port.y = new_location[1]
-            rotated_component.add_component_port(new_port)
+        if self._ports:
+            new_locations = self.rotate_points(
+                [(port.x, port.y) for port in self._ports], angle
+            ).tolist()
+            for port, new_location in zip(self._ports, new_locations):
+                new_port = Port()
+                new_port.label = port.label
+                new_port.x = new_location[0]
+                new_port.y = new_location[1]
+                rotated_component.add_component_port(new_port)
 
         return rotated_component
 
@@ -405,50 +396,11 @@ class Component:
         Returns:
             None
         """
+        if logger.isEnabledFor(logging.DEBUG):
+            for port in self._ports:
+                logger.debug("port %s at (%s, %s)", port.label, port.x, port.y)
 
-        # first rotate ports before everything gets confusion
-        for port in self._ports:
-            print(port.label, port.x, port.y)
-            new_location = self.rotate_point(port.x, port.y, self.rotation)
-            port.x = new_location[0]
-            port.y = new_location[1]
-
-        new_topleft = self.rotate_point_around_center(
-            self.xpos + 0, self.ypos + 0, self.rotation
-        )
-        new_topright = self.rotate_point_around_center(
-            self.xpos + self.xspan, self.ypos + 0, self.rotation
-        )
-        new_bottomleft = self.rotate_point_around_center(
-            self.xpos + 0, self.ypos + self.yspan, self.rotation
-        )
-        new_bottomright = self.rotate_point_around_center(
-            self.xpos + self.xspan, self.ypos + self.yspan, self.rotation
-        )
-
-        # Find xmin, ymin, xmax, ymax for all the corner points
-        xmin = min(
-            new_topleft[0], new_topright[0], new_bottomleft[0], new_bottomright[0]
-        )
-        ymin = min(
-            new_topleft[1], new_topright[1], new_bottomleft[1], new_bottomright[1]
-        )
-        xmax = max(
-            new_topleft[0], new_topright[0], new_bottomleft[0], new_bottomright[0]
-        )
-        ymax = max(
-            new_topleft[1], new_topright[1], new_bottomleft[1], new_bottomright[1]
-        )
-
-        # Find the new xspan and yspan
-        new_xspan = abs(xmax - xmin)
-        new_yspan = abs(ymax - ymin)
-        self.xspan = int(new_xspan)
-        self.yspan = int(new_yspan)
-
-        # Create a new component with the rotated coordinates
-        self.xpos = xmin
-        self.ypos = ymin
+        geometry.rotate_components([self], [self.rotation])
 
     @staticmethod
     def from_parchmint_v1(json_data, device_ref: Optional[Device] = None):
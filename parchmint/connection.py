@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import logging
 from os import error
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
+import numpy as np
+import numpy.typing as npt
+
+from parchmint import hashing
 from parchmint.feature import Feature
 from parchmint.layer import Layer
 from parchmint.params import Params
@@ -11,6 +16,23 @@ from parchmint.target import Target
 if TYPE_CHECKING:
     from parchmint.device import Device
 
+logger = logging.getLogger(__name__)
+
+
+def _as_waypoint_array(waypoints: npt.ArrayLike) -> npt.NDArray:
+    """Converts waypoints to an (N, 2) array, integer unless the coordinates
+    have fractional parts"""
+    array = np.asarray(waypoints)
+    if array.size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    if array.dtype.kind not in "iu":
+        array = array.astype(np.float64)
+        if np.all(np.mod(array, 1) == 0):
+            array = array.astype(np.int64)
+    else:
+        array = array.astype(np.int64)
+    return array.reshape(-1, 2)
+
 
 class ConnectionPath:
     """Describes the connection path which is a member of the connection, it consists of
@@ -21,7 +43,7 @@ class ConnectionPath:
         self,
         source: Target,
         sink: Target,
-        waypoints: Optional[List[Tuple[int, int]]] = None,
+        waypoints: Optional[Union[List[Tuple[int, int]], npt.NDArray]] = None,
         features: Optional[List[Feature]] = None,
     ) -> None:
         """Creates a new connection path object
@@ -29,16 +51,21 @@ class ConnectionPath:
         Args:
             source (Target): source corresponding to the path
             sink (Target): sink corresponding to the path
-            waypoints (List[Tuple[int, int]], optional): list of the coordinates. Defaults to [].
+            waypoints (Union[List[Tuple[int, int]], npt.NDArray], optional): list of the coordinates, an (N, 2) array is stored as is. Defaults to [].
         """
         if waypoints is None:
             waypoints = []
         super().__init__()
         self.__source: Optional[Target] = source
         self.__sink: Optional[Target] = sink
-        self.__waypoints: List[Tuple[int, int]] = (
-            waypoints if waypoints is not None else []
-        )
+        # The waypoints are held either as a list of tuples or as an (N, 2)
+        # array, the other one is None
+        self.__waypoints: Optional[List[Tuple[int, int]]] = None
+        self.__waypoint_array: Optional[npt.NDArray] = None
+        if isinstance(waypoints, np.ndarray):
+            self.waypoints_array = waypoints
+        else:
+            self.__waypoints = waypoints
         self.__features: List[Feature] = features if features is not None else []
 
     @property
@@ -104,11 +131,17 @@ class ConnectionPath:
 
     @property
     def waypoints(self) -> List[Tuple[int, int]]:
-        """Returns the waypoints in the connection path
+        """Returns the waypoints in the connection path, waypoints stored as an
+        array are converted to a list (which is kept from then on)
 
         Returns:
             List[Tuple[int, int]]: The list of waypoints
         """
+        if self.__waypoints is None:
+            self.__waypoints = [
+                (x, y) for x, y in self.__waypoint_array.tolist()  # type: ignore
+            ]
+            self.__waypoint_array = None
         return self.__waypoints
 
     @waypoints.setter
@@ -119,6 +152,34 @@ class ConnectionPath:
             value (List[Tuple[int, int]]): List of co-ordinate tuples
         """
         self.__waypoints = value
+        self.__waypoint_array = None
+
+    @property
+    def waypoints_array(self) -> npt.NDArray:
+        """Returns the waypoints as an (N, 2) array, integer unless there are
+        fractional coordinates. The array is read-only, assign a new one to
+        change the waypoints.
+
+        Returns:
+            npt.NDArray: waypoint coordinates
+        """
+        if self.__waypoint_array is not None:
+            return self.__waypoint_array
+        array = _as_waypoint_array(self.__waypoints)
+        array.setflags(write=False)
+        return array
+
+    @waypoints_array.setter
+    def waypoints_array(self, value: npt.ArrayLike) -> None:
+        """Stores the waypoints as an array instead of a list of tuples
+
+        Args:
+            value (npt.ArrayLike): (N, 2) waypoint coordinates
+        """
+        array = _as_waypoint_array(value)
+        array.setflags(write=False)
+        self.__waypoint_array = array
+        self.__waypoints = None
 
     def add_waypoint(self, x: int, y: int) -> None:
         """Adds a waypoint to the connection path
@@ -127,7 +188,7 @@ class ConnectionPath:
             x (int): x co-ordinate of the waypoint
             y (int): y co-ordinate of the waypoint
         """
-        self.__waypoints.append((x, y))
+        self.waypoints.append((x, y))
 
     def to_parchmint_v1_2(self):
         """Returns the json dict
@@ -140,17 +201,22 @@ class ConnectionPath:
             if self.__source is None
             else self.__source.to_parchmint_v1(),
             "sink": None if self.__sink is None else self.__sink.to_parchmint_v1(),
-            "wayPoints": [list(wp) for wp in self.__waypoints],
+            "wayPoints": self.__waypoint_array.tolist()
+            if self.__waypoint_array is not None
+            else [list(wp) for wp in self.__waypoints],  # type: ignore
             "features": [feat.ID for feat in self.__features],
         }
 
     @staticmethod
-    def from_parchmint_v1_2(json_data: Dict, device_ref: Device) -> ConnectionPath:
+    def from_parchmint_v1_2(
+        json_data: Dict, device_ref: Device, array_waypoints: bool = False
+    ) -> ConnectionPath:
         """Generates the connection path from the json dict for parchmint v1.2
 
         Args:
             json_data (Dict): JSON data dictionary
             device_ref (Device): Reference for parchmint device
+            array_waypoints (bool, optional): store the waypoints as an array. Defaults to False.
 
         Returns:
             ConnectionPath: Connection path object
@@ -164,7 +230,9 @@ class ConnectionPath:
         ret = ConnectionPath(
             source=Target(json_data=json_data["source"]),
             sink=Target(json_data=json_data["sink"]),
-            waypoints=[(wp[0], wp[1]) for wp in json_data["wayPoints"]],
+            waypoints=_as_waypoint_array(json_data["wayPoints"])
+            if array_waypoints
+            else [(wp[0], wp[1]) for wp in json_data["wayPoints"]],
             features=features,
         )
 
@@ -300,7 +368,17 @@ class Connection:
         return ret
 
     def __hash__(self) -> int:
-        return hash(repr(self))
+        # Connections compare by identity, so they hash by identity too
+        return object.__hash__(self)
+
+    def content_digest(self) -> str:
+        """Returns a digest of the full contents of the connection (unlike the hash,
+        which only covers its identity)
+
+        Returns:
+            str: hex digest
+        """
+        return hashing.content_digest(self.to_parchmint_v1_2())
 
     @staticmethod
     def from_parchmint_v1(json_data: Dict, device_ref: Device) -> Connection:
@@ -328,9 +406,9 @@ class Connection:
                 for target in json_data["sinks"]:
                     connection.sinks.append(Target(json_data=target))
             else:
-                print("connection", connection.name, "does not have any sinks")
+                logger.debug("connection %s does not have any sinks", connection.name)
         else:
-            print("connection", connection.name, "does not have any sinks")
+            logger.debug("connection %s does not have any sinks", connection.name)
 
         # TODO - Change this in the v1.2 version
         if "waypoints" in json_data.keys():
@@ -341,11 +419,14 @@ class Connection:
         return connection
 
     @staticmethod
-    def from_parchmint_v1_2(json_data: Dict, device_ref: Device) -> Connection:
+    def from_parchmint_v1_2(
+        json_data: Dict, device_ref: Device, array_waypoints: bool = False
+    ) -> Connection:
         """Parses from the json dict
 
         Args:
             json (dict): json dict after json.loads()
+            array_waypoints (bool, optional): store the waypoints of the paths as arrays. Defaults to False.
         """
         if device_ref is None:
             raise ValueError(
@@ -363,7 +444,7 @@ class Connection:
             if "sinks" in json_data.keys()
             else [],
             paths=[
-                ConnectionPath.from_parchmint_v1_2(path, device_ref)
+                ConnectionPath.from_parchmint_v1_2(path, device_ref, array_waypoints)
                 for path in json_data["paths"]
             ],
         )
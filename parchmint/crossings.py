@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+from itertools import combinations
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from parchmint.spatialindex import Point
+
+if TYPE_CHECKING:
+    from parchmint.connection import Connection
+    from parchmint.target import Target
+
+# How two segments meet
+POINT = "point"
+OVERLAP = "overlap"
+
+
+class Crossing(NamedTuple):
+    """An intersection between path segments of two different connections"""
+
+    layer_id: Optional[str]
+    """ID of the layer both connections are on"""
+
+    first_id: str
+    """ID of the first connection"""
+
+    second_id: str
+    """ID of the second connection"""
+
+    kind: str
+    """POINT for segments crossing or touching, OVERLAP for collinear segments
+    sharing a stretch"""
+
+    start: Point
+    """Intersection point, or start of the shared stretch"""
+
+    end: Point
+    """Same as start for POINT crossings, end of the shared stretch otherwise"""
+
+
+def _cross(
+    ax: npt.NDArray, ay: npt.NDArray, bx: npt.NDArray, by: npt.NDArray
+) -> npt.NDArray:
+    return ax * by - ay * bx
+
+
+class _Segments(NamedTuple):
+    """Path segments of the connections checked together"""
+
+    coordinates: npt.NDArray[np.float64]
+    """(x1, y1, x2, y2) of each segment"""
+
+    owners: npt.NDArray[np.intp]
+    """Position of the connection of each segment"""
+
+    path_starts: npt.NDArray[np.bool_]
+    """True for the first segment of a path"""
+
+    path_ends: npt.NDArray[np.bool_]
+    """True for the last segment of a path"""
+
+    unlayered: npt.NDArray[np.bool_]
+    """True for the segments of connections without a layer"""
+
+
+def _candidate_pairs(segments: _Segments) -> npt.NDArray[np.intp]:
+    """Pairs of segments of different connections registered in a common grid
+    cell, with overlapping bounding boxes. Two connections without a layer are
+    not paired up."""
+    coordinates, owners = segments.coordinates, segments.owners
+    xmin = np.minimum(coordinates[:, 0], coordinates[:, 2])
+    ymin = np.minimum(coordinates[:, 1], coordinates[:, 3])
+    xmax = np.maximum(coordinates[:, 0], coordinates[:, 2])
+    ymax = np.maximum(coordinates[:, 1], coordinates[:, 3])
+
+    extents = np.maximum(xmax - xmin, ymax - ymin)
+    cell_size = max(float(extents.mean()), 1.0)
+    cell_xmin = np.floor(xmin / cell_size).astype(np.int64).tolist()
+    cell_ymin = np.floor(ymin / cell_size).astype(np.int64).tolist()
+    cell_xmax = np.floor(xmax / cell_size).astype(np.int64).tolist()
+    cell_ymax = np.floor(ymax / cell_size).astype(np.int64).tolist()
+
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    for index in range(len(coordinates)):
+        for cell_x in range(cell_xmin[index], cell_xmax[index] + 1):
+            for cell_y in range(cell_ymin[index], cell_ymax[index] + 1):
+                cells.setdefault((cell_x, cell_y), []).append(index)
+
+    pairs = {
+        pair
+        for indices in cells.values()
+        if len(indices) > 1
+        for pair in combinations(indices, 2)
+    }
+    if not pairs:
+        return np.empty((0, 2), dtype=np.intp)
+    ret = np.array(sorted(pairs), dtype=np.intp)
+    first, second = ret[:, 0], ret[:, 1]
+    keep = (
+        (owners[first] != owners[second])
+        & ~(segments.unlayered[first] & segments.unlayered[second])
+        & (xmin[first] <= xmax[second])
+        & (xmin[second] <= xmax[first])
+        & (ymin[first] <= ymax[second])
+        & (ymin[second] <= ymax[first])
+    )
+    return ret[keep]
+
+
+def _is_terminal_point(segments: _Segments, index: int, point: List[float]) -> bool:
+    """Checks if the point is the start or the end of the path of the segment"""
+    coordinates = segments.coordinates[index].tolist()
+    return bool(
+        (segments.path_starts[index] and point == coordinates[:2])
+        or (segments.path_ends[index] and point == coordinates[2:])
+    )
+
+
+def _layer_crossings(
+    segments: _Segments,
+    connections: Sequence[Connection],
+    layer_id: Optional[str],
+) -> List[Crossing]:
+    # pylint: disable=too-many-locals
+    pairs = _candidate_pairs(segments)
+    if len(pairs) == 0:
+        return []
+
+    # Targets (component and port) of each connection, when first needed
+    terminals: Dict[int, Set[Target]] = {}
+
+    def shares_terminal(first: int, second: int) -> bool:
+        """Checks if the connections of two segments are attached to a common
+        component port"""
+        owners = [int(segments.owners[first]), int(segments.owners[second])]
+        for owner in owners:
+            if owner not in terminals:
+                connection = connections[owner]
+                terminals[owner] = set(connection.sinks)
+                if connection.source is not None:
+                    terminals[owner].add(connection.source)
+        return not terminals[owners[0]].isdisjoint(terminals[owners[1]])
+
+    def is_terminal_contact(first: int, second: int, point: List[float]) -> bool:
+        # Meeting at an end point of both paths, e.g. two channels leaving the
+        # same port, is not a crossing. Meeting at a shared waypoint is.
+        return (
+            _is_terminal_point(segments, first, point)
+            and _is_terminal_point(segments, second, point)
+            and shares_terminal(first, second)
+        )
+
+    coordinates = segments.coordinates
+    p1 = coordinates[pairs[:, 0], :2]
+    p2 = coordinates[pairs[:, 0], 2:]
+    q1 = coordinates[pairs[:, 1], :2]
+    q2 = coordinates[pairs[:, 1], 2:]
+    r = p2 - p1
+    s = q2 - q1
+    qp = q1 - p1
+    denominator = _cross(r[:, 0], r[:, 1], s[:, 0], s[:, 1])
+    along_p = _cross(qp[:, 0], qp[:, 1], s[:, 0], s[:, 1])
+    along_q = _cross(qp[:, 0], qp[:, 1], r[:, 0], r[:, 1])
+
+    ret: List[Crossing] = []
+    # Channels crossing at a waypoint meet in several pairs of segments
+    seen = set()
+
+    # Segments that are not parallel meet in at most one point
+    skew = denominator != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = along_p / denominator
+        u = along_q / denominator
+    hits = skew & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+    for index in np.flatnonzero(hits).tolist():
+        first, second = pairs[index].tolist()
+        if t[index] in (0, 1) and u[index] in (0, 1):
+            point = (p1[index] if t[index] == 0 else p2[index]).tolist()
+            if is_terminal_contact(first, second, point):
+                continue
+        else:
+            point = (p1[index] + t[index] * r[index]).tolist()
+        key = (segments.owners[first], segments.owners[second], tuple(point))
+        if key in seen:
+            continue
+        seen.add(key)
+        ret.append(
+            Crossing(
+                layer_id,
+                connections[segments.owners[first]].ID,
+                connections[segments.owners[second]].ID,
+                POINT,
+                tuple(point),
+                tuple(point),
+            )
+        )
+
+    # Collinear segments overlap along the stretch their projections share
+    collinear = ~skew & (along_p == 0) & (along_q == 0)
+    for index in np.flatnonzero(collinear).tolist():
+        direction = r[index] if np.any(r[index]) else s[index]
+        if not np.any(direction):
+            # Both segments are single points, equal points are shared end points
+            continue
+        first_index, second_index = pairs[index].tolist()
+        axis = 0 if abs(direction[0]) >= abs(direction[1]) else 1
+        first = sorted((p1[index].tolist(), p2[index].tolist()), key=lambda p: p[axis])
+        second = sorted((q1[index].tolist(), q2[index].tolist()), key=lambda p: p[axis])
+        start = max(first[0], second[0], key=lambda p: p[axis])
+        end = min(first[1], second[1], key=lambda p: p[axis])
+        if start[axis] > end[axis]:
+            continue
+        if start == end:
+            if is_terminal_contact(first_index, second_index, start):
+                continue
+            key = (
+                segments.owners[first_index],
+                segments.owners[second_index],
+                tuple(start),
+            )
+            if key in seen:
+                continue
+            seen.add(key)
+            kind = POINT
+        else:
+            kind = OVERLAP
+        ret.append(
+            Crossing(
+                layer_id,
+                connections[segments.owners[first_index]].ID,
+                connections[segments.owners[second_index]].ID,
+                kind,
+                tuple(start),
+                tuple(end),
+            )
+        )
+    return ret
+
+
+def find_crossings(connections: Sequence[Connection]) -> List[Crossing]:
+    """Finds all the intersections between path segments of different
+    connections on the same layer.
+
+    The segments of each layer are bucketed into a uniform grid and only the
+    segments sharing a grid cell are tested against each other, so the cost
+    grows with the number of nearby segment pairs rather than with the square
+    of the number of segments. Channels that only meet at the ends of their
+    paths, on a component port both of them are attached to, are not reported.
+    Like in the design rule check, connections without a layer are checked
+    against the connections of every layer but not against each other.
+
+    Args:
+        connections (Sequence[Connection]): connections to check
+
+    Returns:
+        List[Crossing]: crossings found
+    """
+    layers: Dict[Optional[str], Tuple[List[npt.NDArray], List[int], List[int]]] = {}
+    for index, connection in enumerate(connections):
+        layer_id = connection.layer.ID if connection.layer is not None else None
+        arrays, owners, path_sizes = layers.setdefault(layer_id, ([], [], []))
+        for path in connection.paths:
+            waypoints = path.waypoints_array.astype(np.float64)
+            if len(waypoints) < 2:
+                continue
+            arrays.append(np.hstack((waypoints[:-1], waypoints[1:])))
+            owners.extend([index] * (len(waypoints) - 1))
+            path_sizes.append(len(waypoints) - 1)
+
+    def segments_of(
+        layer_id: Optional[str],
+    ) -> Tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+        arrays, owners, path_sizes = layers.get(layer_id, ([], [], []))
+        sizes = np.array(path_sizes, dtype=np.intp)
+        path_starts = np.zeros(len(owners), dtype=bool)
+        path_ends = np.zeros(len(owners), dtype=bool)
+        if len(sizes):
+            ends = np.cumsum(sizes)
+            path_starts[ends - sizes] = True
+            path_ends[ends - 1] = True
+        return (
+            np.concatenate(arrays) if arrays else np.empty((0, 4)),
+            np.array(owners, dtype=np.intp),
+            path_starts,
+            path_ends,
+        )
+
+    unlayered = segments_of(None)
+    ret: List[Crossing] = []
+    for layer_id in layers:
+        if layer_id is None:
+            continue
+        layered = segments_of(layer_id)
+        if len(layered[1]) == 0:
+            continue
+        segments = _Segments(
+            *(np.concatenate((own, other)) for own, other in zip(layered, unlayered)),
+            unlayered=np.arange(len(layered[1]) + len(unlayered[1])) >= len(layered[1]),
+        )
+        ret.extend(_layer_crossings(segments, connections, layer_id))
+    return ret
+
+
+def crossing_pairs(crossings: Sequence[Crossing]) -> List[Tuple[str, str]]:
+    """Returns the distinct pairs of connections that cross
+
+    Args:
+        crossings (Sequence[Crossing]): crossings found by find_crossings()
+
+    Returns:
+        List[Tuple[str, str]]: connection ID pairs, in the order first found
+    """
+    ret: Dict[Tuple[str, str], None] = {}
+    for crossing in crossings:
+        pair = tuple(sorted((crossing.first_id, crossing.second_id)))
+        ret[pair] = None  # type: ignore
+    return list(ret)  # type: ignore
@@ -1,23 +1,48 @@
 from __future__ import annotations
 
-import json
+import logging
 import pathlib
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
 from warnings import warn
 
-import jsonschema
 import networkx as nx
 
+from parchmint import diagnostics, drc, geometry, jsonbackend, profiling
+from parchmint.channelmetrics import ChannelMetrics, channel_metrics
 from parchmint.component import Component
 from parchmint.connection import Connection
+from parchmint.drc import DRCViolation
 from parchmint.feature import Feature
+from parchmint.fingerprint import DeviceFingerprint, compute_fingerprint
+from parchmint.geometrystore import GeometryStore
 from parchmint.layer import Layer
 from parchmint.params import Params
 from parchmint.similaritymatcher import SimilarityMatcher
+from parchmint.spatialindex import SpatialIndex
+from parchmint.streaming import DEFAULT_CHUNK_SIZE, dump_device, load_device
+from parchmint.validation import (
+    ValidationIssue,
+    iter_validation_errors,
+    validate_json,
+)
+
+if TYPE_CHECKING:
+    from parchmint.cache import DeviceCache
 
 PROJECT_DIR = pathlib.Path(__file__).parent.parent.absolute()
 
+logger = logging.getLogger(__name__)
+
 
 class ValveType(Enum):
     """Types of the valves"""
@@ -50,6 +75,83 @@ class ValveType(Enum):
             return False
 
 
+class _IDIndex:
+    """ID keyed lookup table that shadows one of the entity lists of the device.
+
+    The table is kept in sync by the add/remove methods of the device. Since the
+    entity lists are public and can be appended to or replaced directly, the
+    table is rebuilt whenever the list it was built from changes identity or
+    length outside of those methods.
+    """
+
+    def __init__(self) -> None:
+        self._table: Dict[str, Any] = {}
+        self._source: Optional[List[Any]] = None
+        self._size: int = -1
+        self._has_duplicates: bool = False
+
+    def lookup(self, items: List[Any]) -> Dict[str, Any]:
+        """Returns the lookup table for the given entity list
+
+        Args:
+            items (List[Any]): entity list the table shadows
+
+        Returns:
+            Dict[str, Any]: table mapping IDs to the first entity with that ID
+        """
+        if items is not self._source or len(items) != self._size:
+            self.rebuild(items)
+        return self._table
+
+    def rebuild(self, items: List[Any]) -> None:
+        """Rebuilds the lookup table from scratch
+
+        Args:
+            items (List[Any]): entity list the table shadows
+        """
+        table: Dict[str, Any] = {}
+        for item in items:
+            table.setdefault(item.ID, item)
+        self._table = table
+        self._source = items
+        self._size = len(items)
+        self._has_duplicates = len(table) != len(items)
+
+    def added(self, items: List[Any], item: Any) -> None:
+        """Registers an entity that was just appended to the list
+
+        Args:
+            items (List[Any]): entity list the table shadows
+            item (Any): entity that was appended
+        """
+        if items is not self._source or len(items) != self._size + 1:
+            self.rebuild(items)
+            return
+        if item.ID in self._table:
+            self._has_duplicates = True
+        else:
+            self._table[item.ID] = item
+        self._size += 1
+
+    def removed(self, items: List[Any], item: Any) -> None:
+        """Unregisters an entity that was just removed from the list
+
+        Args:
+            items (List[Any]): entity list the table shadows
+            item (Any): entity that was removed
+        """
+        if (
+            items is not self._source
+            or len(items) != self._size - 1
+            or self._has_duplicates
+        ):
+            self.rebuild(items)
+            return
+        if self._table.get(item.ID) is item:
+            del self._table[item.ID]
+        self._size -= 1
+
+
 class Device:
     """The device object is the top level object for describing a microfluidic device.
     It contains the entire list of components, connections and all the relationships
@@ -72,10 +174,24 @@ class Device:
         self.features = []  # Store Raw JSON Objects for now
         self.graph = nx.MultiDiGraph()
 
+        # ID indexes for the entity lists, used for constant time lookups
+        self._component_index = _IDIndex()
+        self._connection_index = _IDIndex()
+        self._layer_index = _IDIndex()
+        self._feature_index = _IDIndex()
+
+        # Derived data that is built on demand and dropped when the device changes
+        self._spatial_index: Optional[SpatialIndex] = None
+        self._fingerprint: Optional[DeviceFingerprint] = None
+        self._geometry_store: Optional[GeometryStore] = None
+
         # Stores the valve / connection mappings
         self._valve_map: Dict[str, Connection] = {}
         self._valve_type_map: Dict[str, ValveType] = {}
 
+        # Problems found while building the device, e.g. duplicate components
+        self.warnings: List[diagnostics.DeviceWarning] = []
+
     @property
     def xspan(self) -> Optional[int]:
         """Returns the x span of the device
@@ -108,6 +224,84 @@ class Device:
         """
         self.params.set_param("y-span", yspan)
 
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """Returns the spatial index over the component bounding boxes and the
+        connection path segments. The index is built on first use and rebuilt
+        after components or connections are added, removed or rotated through
+        the device. Call invalidate_caches() after moving components or editing
+        waypoints directly.
+
+        Returns:
+            SpatialIndex: spatial index of the device
+        """
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex.from_device(self)
+        return self._spatial_index
+
+    @property
+    def geometry(self) -> GeometryStore:
+        """Returns the columnar geometry store of the components (bounding boxes,
+        rotations and ports as arrays). The store is built on first use and
+        updated in place when components are added, removed or rotated through
+        the device. Call geometry.refresh() or invalidate_caches() after changing
+        components directly.
+
+        Returns:
+            GeometryStore: geometry store of the device
+        """
+        if self._geometry_store is None:
+            self._geometry_store = GeometryStore(
+                self.components, on_change=self._invalidate_derived
+            )
+        return self._geometry_store
+
+    def invalidate_caches(self) -> None:
+        """Drops the derived data (e.g. the spatial index, the fingerprint and
+        the geometry store) so that it is rebuilt from the current state of the
+        device on next use"""
+        self._invalidate_derived()
+        self._geometry_store = None
+
+    def _invalidate_derived(self) -> None:
+        # Data that is recomputed as a whole, the geometry store is kept up to
+        # date by the methods changing the components instead
+        self._spatial_index = None
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> DeviceFingerprint:
+        """Returns the isomorphism invariant fingerprint of the device (entity
+        histogram, degree sequence, layer signature and WL hash of the netlist).
+        Devices with different fingerprints never match in compare(), so the
+        fingerprint can also be used as a dedup key. It is computed on first use
+        and dropped by invalidate_caches().
+
+        Returns:
+            DeviceFingerprint: fingerprint of the device
+        """
+        if self._fingerprint is None:
+            self._fingerprint = compute_fingerprint(self)
+        return self._fingerprint
+
+    def channel_metrics(self) -> ChannelMetrics:
+        """Returns the routing metrics (channel length, bends, manhattan ratio
+        and bounding box) of all the connections, computed in one pass
+
+        Returns:
+            ChannelMetrics: metrics of each connection
+        """
+        return channel_metrics(self.connections)
+
+    def run_drc(self) -> List[DRCViolation]:
+        """Runs the design rule checks (component overlap and spacing, channels
+        crossing components and other channels) on the device
+
+        Returns:
+            List[DRCViolation]: violations found, empty if the device is clean
+        """
+        return drc.check_device(self)
+
     def get_feature(self, feature_id: str) -> Feature:
         """Returns the feature object with the given name
 
@@ -117,10 +311,10 @@ class Device:
         Returns:
             Feature: Feature object with the given name
         """
-        for feature in self.features:
-            if feature.ID == feature_id:
-                return feature
-        raise KeyError(f"Feature not found: {feature_id}")
+        feature = self._feature_index.lookup(self.features).get(feature_id)
+        if feature is None:
+            raise KeyError(f"Feature not found: {feature_id}")
+        return feature
 
     @property
     def valves(self) -> List[Component]:
@@ -186,11 +380,9 @@ class Device:
         Args:
             valve_id (str): ID of the valve to be removed
         """
-        for valve in self.valves:
-            if valve.ID == valve_id:
-                self._valve_map.pop(valve.ID)
-                self._valve_type_map.pop(valve.ID)
-                break
+        if valve_id in self._valve_map:
+            self._valve_map.pop(valve_id)
+            self._valve_type_map.pop(valve_id)
 
         self.remove_component(valve_id)
 
@@ -204,28 +396,70 @@ class Device:
         Returns:
             bool: If semntically feasible, return true. Else false.
         """
-        matcher = SimilarityMatcher(self, device, compare_params=compare_params)
+        # Cheap invariant check first, VF2 takes long to fail on devices that
+        # are clearly different
+        with profiling.phase("compare"):
+            with profiling.phase("compare.fingerprint"):
+                same_fingerprint = self.fingerprint == device.fingerprint
+            if not same_fingerprint:
+                logger.info("Devices %s and %s do not match", self.name, device.name)
+                return False
 
-        is_same = matcher.is_isomorphic()
-        matcher.print_params_diff()
-        matcher.print_layers_diff()
-        matcher.print_port_diff()
-        matcher.print_in_edges_diff()
-        matcher.print_out_edges_diff()
+            with profiling.phase("compare.match", len(self.components)):
+                matcher = SimilarityMatcher(self, device, compare_params=compare_params)
+                is_same = matcher.is_isomorphic()
+            # The differences are only worked out when they are logged
+            if logger.isEnabledFor(logging.INFO):
+                with profiling.phase("compare.diff"):
+                    for line in matcher.diff_lines():
+                        logger.info("%s", line)
 
         if is_same:
-            print("Match!")
+            logger.info("Devices %s and %s match", self.name, device.name)
         else:
-            print("Not Match!")
+            logger.info("Devices %s and %s do not match", self.name, device.name)
 
         return is_same
 
+    def apply_rotations(self) -> int:
+        """Applies the rotation param of every component to its geometry and
+        resets the rotation to 0.
+
+        The ports, spans and positions of all the rotated components are
+        computed together with array math (see geometry.rotate_components).
+
+        Returns:
+            int: number of components whose geometry changed
+        """
+        rotated_components = []
+        angles = []
+        reset_components = []
+        for component in self.components:
+            if not component.params.exists("rotation"):
+                continue
+            angle = component.params.get_param("rotation")
+            if angle % 360 != 0:
+                rotated_components.append(component)
+                angles.append(angle)
+            if angle != 0:
+                component.rotation = 0
+                reset_components.append(component)
+
+        geometry.rotate_components(rotated_components, angles)
+
+        if rotated_components:
+            self._invalidate_derived()
+        if reset_components and self._geometry_store is not None:
+            self._geometry_store.refresh_all(reset_components)
+        return len(rotated_components)
+
     def add_feature(self, feature: Feature) -> None:
         """Adds a feature to the device
         Args:
             feature (Feature): Feature object to be added
         """
         self.features.append(feature)
+        self._feature_index.added(self.features, feature)
 
     def remove_feature(self, feature_id: str) -> None:
         """Removes a feature from the device
@@ -234,11 +468,11 @@ class Device:
         Raises:
             Exception: Raises the error if the feature is not found in the device
         """
-        for feature in self.features:
-            if feature.ID == feature_id:
-                self.features.remove(feature)
-                return
-        raise KeyError(f"Feature not found: {feature_id}")
+        feature = self._feature_index.lookup(self.features).get(feature_id)
+        if feature is None:
+            raise KeyError(f"Feature not found: {feature_id}")
+        self.features.remove(feature)
+        self._feature_index.removed(self.features, feature)
 
     def add_component(self, component: Component) -> None:
         """Adds a component object to the device
@@ -250,19 +484,66 @@ class Device:
             Exception: if the passed object is not a Component instance
         """
         if isinstance(component, Component):
-            # Check if Component Exists, if it does ignore it
+            # Check if Component Exists, a duplicate is added with a warning
             if self.component_exists(component.ID):
-                print(
-                    "Component {} already present in device, "
-                    "hence skipping the component".format(component.name)
+                diagnostics.report_warning(
+                    logger,
+                    diagnostics.DUPLICATE_COMPONENT,
+                    "Component %s already present in device, "
+                    "adding it as a duplicate",
+                    component.name,
+                    device=self,
+                    entity=component.ID,
                 )
             self.components.append(component)
+            self._component_index.added(self.components, component)
             self.graph.add_node(component.ID)
+            self._invalidate_derived()
+            if self._geometry_store is not None:
+                self._geometry_store.add(component)
         else:
             raise ValueError(
                 "Could not add component since its not an instance of parchmint:Component"
             )
 
+    def add_components(self, components: Iterable[Component]) -> None:
+        """Adds several component objects to the device, same as calling
+        add_component() for each of them but with the lookups, the graph and
+        the ID index updated in bulk
+
+        Args:
+            components (Iterable[Component]): components to add
+
+        Raises:
+            Exception: if one of the objects is not a Component instance
+        """
+        components = list(components)
+        for component in components:
+            if not isinstance(component, Component):
+                raise ValueError(
+                    "Could not add component since its not an instance of parchmint:Component"
+                )
+        known_ids = set(self._component_index.lookup(self.components))
+        for component in components:
+            if component.ID in known_ids:
+                diagnostics.report_warning(
+                    logger,
+                    diagnostics.DUPLICATE_COMPONENT,
+                    "Component %s already present in device, "
+                    "adding it as a duplicate",
+                    component.name,
+                    device=self,
+                    entity=component.ID,
+                )
+            known_ids.add(component.ID)
+        self.components.extend(components)
+        self._component_index.rebuild(self.components)
+        self.graph.add_nodes_from(component.ID for component in components)
+        self._invalidate_derived()
+        if self._geometry_store is not None:
+            for component in components:
+                self._geometry_store.add(component)
+
     def remove_component(self, component_id: str) -> None:
         """Removes a component object from the device
 
@@ -272,12 +553,19 @@ class Device:
         Raises:
             Exception: Raises the error if the component is not found in the device
         """
-        for component in self.components:
-            if component.ID == component_id:
-                self.components.remove(component)
-                self.graph.remove_node(component_id)
-                return
-        raise KeyError(f"Component not found:{component_id}")
+        component = self._component_index.lookup(self.components).get(component_id)
+        if component is None:
+            raise KeyError(f"Component not found:{component_id}")
+        self.components.remove(component)
+        self._component_index.removed(self.components, component)
+        self.graph.remove_node(component_id)
+        self._invalidate_derived()
+        if self._geometry_store is not None:
+            self._geometry_store.remove(component_id)
+            # A component with a duplicate ID takes the place of the removed one
+            duplicate = self._component_index.lookup(self.components).get(component_id)
+            if duplicate is not None:
+                self._geometry_store.add(duplicate)
 
     def add_connection(self, connection: Connection) -> None:
         """Adds a connection object to the device
@@ -300,10 +588,13 @@ class Device:
 
             # Check if the connection sinks are defined / exist in the device
             if len(connection.sinks) == 0:
-                print(
-                    "Warning: No sinks defined for connection {}".format(
-                        connection.name
-                    )
+                diagnostics.report_warning(
+                    logger,
+                    diagnostics.MISSING_SINKS,
+                    "No sinks defined for connection %s",
+                    connection.name,
+                    device=self,
+                    entity=connection.ID,
                 )
 
             for sink in connection.sinks:
@@ -313,6 +604,8 @@ class Device:
                     )
 
             self.connections.append(connection)
+            self._connection_index.added(self.connections, connection)
+            self._invalidate_derived()
             # Connect the components associated here on the nx graph
             for sink in connection.sinks:
                 self.graph.add_edge(
@@ -328,6 +621,62 @@ class Device:
                 "Could not add component since its not an instance of parchmint:Connection"
             )
 
+    def add_connections(self, connections: Iterable[Connection]) -> None:
+        """Adds several connection objects to the device, same as calling
+        add_connection() for each of them but with the graph and the ID index
+        updated in bulk. Nothing is added if one of the connections is invalid.
+
+        Args:
+            connections (Iterable[Connection]): connections to add
+
+        Raises:
+            Exception: if one of the objects is not a Connection type object
+        """
+        connections = list(connections)
+        component_ids = self._component_index.lookup(self.components)
+        edges = []
+        for connection in connections:
+            if not isinstance(connection, Connection):
+                raise ValueError(
+                    "Could not add component since its not an instance of parchmint:Connection"
+                )
+            if connection.source is None:
+                raise ValueError("Connection source is not defined")
+            if connection.source.component not in component_ids:
+                raise KeyError(
+                    f"Source component {connection.source} not found in the device while adding connection: {connection.ID}"
+                )
+            if len(connection.sinks) == 0:
+                diagnostics.report_warning(
+                    logger,
+                    diagnostics.MISSING_SINKS,
+                    "No sinks defined for connection %s",
+                    connection.name,
+                    device=self,
+                    entity=connection.ID,
+                )
+            for sink in connection.sinks:
+                if sink.component not in component_ids:
+                    raise KeyError(
+                        f"Sink component {sink} not found in the device while adding connection: {connection.name}"
+                    )
+                edges.append(
+                    (
+                        connection.source.component,
+                        sink.component,
+                        {
+                            "source_port": connection.source,
+                            "sink_port": sink,
+                            "connection_ref": connection,
+                            "connection_id": connection.ID,
+                        },
+                    )
+                )
+        self.connections.extend(connections)
+        self._connection_index.rebuild(self.connections)
+        self._invalidate_derived()
+        self.graph.add_edges_from(edges)
+
     def remove_connection(self, connection_id: str) -> None:
         """Removes a connection object from the device
 
@@ -337,16 +686,15 @@ class Device:
         Raises:
             Exception: Raises the error if the connection is not found in the device
         """
-        for connection in self.connections:
-            if connection.ID == connection_id:
-                self.connections.remove(connection)
-                if connection.source is not None:
-                    for sink in connection.sinks:
-                        self.graph.remove_edge(
-                            connection.source.component, sink.component
-                        )
-                return
-        raise KeyError(f"Connection not found: {connection_id}")
+        connection = self._connection_index.lookup(self.connections).get(connection_id)
+        if connection is None:
+            raise KeyError(f"Connection not found: {connection_id}")
+        self.connections.remove(connection)
+        self._connection_index.removed(self.connections, connection)
+        self._invalidate_derived()
+        if connection.source is not None:
+            for sink in connection.sinks:
+                self.graph.remove_edge(connection.source.component, sink.component)
 
     def add_layer(self, layer: Layer) -> None:
         """Adds a layer to the device
@@ -356,6 +704,8 @@ class Device:
         """
         if isinstance(layer, Layer):
             self.layers.append(layer)
+            self._layer_index.added(self.layers, layer)
+            self._invalidate_derived()
 
     def remove_layer(self, layer_id: str) -> None:
         """Removes a layer from the device, also removes all the components and connections corresponding to the layer
@@ -363,10 +713,7 @@ class Device:
         Args:
             layer_id (str): ID of the layer to be removed
         """
-        layer_to_delete = None
-        for layer in self.layers:
-            if layer.ID == layer_id:
-                layer_to_delete = layer
+        layer_to_delete = self._layer_index.lookup(self.layers).get(layer_id)
 
         if layer_to_delete is None:
             raise KeyError(f"Layer not found{layer_id}")
@@ -400,10 +747,10 @@ class Device:
         Returns:
             Layer: layer with the corresponding id
         """
-        for layer in self.layers:
-            if layer.ID == layer_id:
-                return layer
-        raise KeyError(f"Could not find the layer {layer_id}")
+        layer = self._layer_index.lookup(self.layers).get(layer_id)
+        if layer is None:
+            raise KeyError(f"Could not find the layer {layer_id}")
+        return layer
 
     def merge_netlist(self, netlist: Device) -> None:
         """Merges two netlists together. Currently assumes that both
@@ -416,7 +763,7 @@ class Device:
         # First create a map of layers
         layer_mapping = {}
         for layer in netlist.layers:
-            if layer not in self.layers:
+            if layer.ID not in self._layer_index.lookup(self.layers):
                 self.add_layer(layer)
                 layer_mapping[layer] = layer
             else:
@@ -475,11 +822,10 @@ class Device:
         Returns:
             Optional[str]: name of the corresponding object
         """
-        for component in self.components:
-            if component.ID == component_id:
-                return component.name
-
-        raise KeyError(f"Could not find component with ID: {component_id}")
+        component = self._component_index.lookup(self.components).get(component_id)
+        if component is None:
+            raise KeyError(f"Could not find component with ID: {component_id}")
+        return component.name
 
     def component_exists(self, component_id: str) -> bool:
         """checks if component exists in the device
@@ -490,11 +836,7 @@ class Device:
         Returns:
             bool: true if the component exists
         """
-        for component in self.components:
-            if component_id == component.ID:
-                return True
-
-        return False
+        return component_id in self._component_index.lookup(self.components)
 
     def connection_exists(self, connection_id: str) -> bool:
         """checks if connection exists in the device
@@ -505,11 +847,7 @@ class Device:
         Returns:
             bool: true if the connection exists
         """
-        for connection in self.connections:
-            if connection_id == connection.ID:
-                return True
-
-        return False
+        return connection_id in self._connection_index.lookup(self.connections)
 
     def get_component(self, component_id: str) -> Component:
         """Returns the component with the corresponding ID
@@ -523,10 +861,10 @@ class Device:
         Returns:
             Component: component with the corresponding id
         """
-        for component in self.components:
-            if component.ID == component_id:
-                return component
-        raise KeyError(f"Could not find component with id: {component_id}")
+        component = self._component_index.lookup(self.components).get(component_id)
+        if component is None:
+            raise KeyError(f"Could not find component with id: {component_id}")
+        return component
 
     def get_connection(self, component_id: str) -> Connection:
         """Returns the connection with the corresponding id
@@ -540,10 +878,10 @@ class Device:
         Returns:
             Connection: connection with the corresponding id
         """
-        for connection in self.connections:
-            if connection.ID == component_id:
-                return connection
-        raise KeyError(f"Could not find connection with id: {component_id}")
+        connection = self._connection_index.lookup(self.connections).get(component_id)
+        if connection is None:
+            raise KeyError(f"Could not find connection with id: {component_id}")
+        return connection
 
     def get_connections_for_edge(
         self, source: Component, sink: Component
@@ -563,10 +901,12 @@ class Device:
                 for edge in list((self.graph[source.ID][sink.ID]).values())
             ]
         except KeyError:
-            print(
-                "Warning ! - No connections found between {} and {}".format(
-                    source, sink
-                )
+            diagnostics.report_warning(
+                logger,
+                diagnostics.NO_CONNECTIONS,
+                "No connections found between %s and %s",
+                source,
+                sink,
             )
             return []
 
@@ -600,11 +940,11 @@ class Device:
         """
         ret = {}
         ret["name"] = self.name
-        ret["components"] = [c.to_parchmint_v1() for c in self.components]
-        ret["connections"] = [c.to_parchmint_v1() for c in self.connections]
+        ret["version"] = 1
         ret["params"] = self.params.to_parchmint_v1()
         ret["layers"] = [layer.to_parchmint_v1() for layer in self.layers]
-        ret["version"] = 1
+        ret["components"] = [c.to_parchmint_v1() for c in self.components]
+        ret["connections"] = [c.to_parchmint_v1() for c in self.connections]
 
         return ret
 
@@ -616,56 +956,96 @@ class Device:
         """
         self.params.set_param("x-span", self.xspan)
         self.params.set_param("y-span", self.yspan)
+        # The version, layers and features are placed ahead of the components
+        # and connections that refer to them so that the file can be loaded in
+        # a single streaming pass
         ret = {}
         ret["name"] = self.name
-        ret["components"] = [c.to_parchmint_v1() for c in self.components]
-        ret["connections"] = [c.to_parchmint_v1_2() for c in self.connections]
-        ret["params"] = self.params.to_parchmint_v1()
-        ret["layers"] = [layer.to_parchmint_v1() for layer in self.layers]
-
-        ret["features"] = [feature.to_parchmint_v1_2() for feature in self.features]
 
         # Modify the version of the parchmint
         ret["version"] = "1.2"
 
-        # Add the valvemap information
-        valve_objects = []
-        for valve_id, connection in self._valve_map.items():
+        with profiling.phase("to_parchmint_v1_2"):
+            ret["params"] = self.params.to_parchmint_v1()
+            ret["layers"] = [layer.to_parchmint_v1() for layer in self.layers]
+
+            with profiling.phase("to_parchmint_v1_2.features", len(self.features)):
+                ret["features"] = [
+                    feature.to_parchmint_v1_2() for feature in self.features
+                ]
+            with profiling.phase("to_parchmint_v1_2.components", len(self.components)):
+                ret["components"] = [c.to_parchmint_v1() for c in self.components]
+            with profiling.phase(
+                "to_parchmint_v1_2.connections", len(self.connections)
+            ):
+                ret["connections"] = [c.to_parchmint_v1_2() for c in self.connections]
+
+            # Add the valvemap information
+            with profiling.phase("to_parchmint_v1_2.valves", len(self._valve_map)):
+                self._check_valve_types()
+                ret["valves"] = list(self._valve_objects_v1_2())
+
+        return ret
+
+    def _check_valve_types(self) -> None:
+        for valve_id in self._valve_map:
             if valve_id not in self._valve_type_map:
                 raise Exception(f"Could not find type info for valve id: {valve_id}")
-            valve_object = {
+
+    def _valve_objects_v1_2(self) -> Iterator[Dict]:
+        for valve_id, connection in self._valve_map.items():
+            yield {
                 "componentid": valve_id,
                 "connectionid": connection.ID,
                 "type": str(self._valve_type_map[valve_id]),
             }
-            valve_objects.append(valve_object)
-        ret["valves"] = valve_objects
 
-        return ret
+    @staticmethod
+    def validate(
+        json_str: str, schema_version: Optional[str] = None
+    ) -> List[ValidationIssue]:
+        """Validates the json string against the schema and returns the violations
+
+        Args:
+            json_str (str): json string
+            schema_version (Optional[str], optional): schema version ("1" or "1.2"), detected from the "version" key when None. Defaults to None.
+
+        Returns:
+            List[ValidationIssue]: violations with their JSON paths, empty if the json is valid
+        """
+        return validate_json(json_str, schema_version)
 
     @staticmethod
-    def validate_v1(json_str: str) -> None:
-        """Validates the json string against the schema
+    def _print_validation_errors(json_str: str, schema_version: str) -> None:
+        """Prints the errors of validating the json string against the schema
 
         Args:
             json_str (str): json string
+            schema_version (str): schema version
         """
-        schema_path = PROJECT_DIR.joinpath("schemas").joinpath("parchmint_v1.json")
-        with open(schema_path, encoding="utf-8") as json_file:
-            schema = json.load(json_file)
-            json_data = json.loads(json_str)
-            validator = jsonschema.Draft7Validator(schema)
+        with profiling.phase("validate"):
+            with profiling.phase("validate.decode"):
+                json_data = jsonbackend.loads(json_str)
+            with profiling.phase("validate.schema"):
+                errors = list(iter_validation_errors(json_data, schema_version))
+
+        is_empty = True
+        for error in errors:
+            is_empty = False
+            print(error)
+            print("------")
 
-            errors = validator.iter_errors(json_data)  # get all validation errors
+        if is_empty:
+            print("No errors found")
 
-            is_empty = True
-            for error in errors:
-                is_empty = False
-                print(error)
-                print("------")
+    @staticmethod
+    def validate_v1(json_str: str) -> None:
+        """Validates the json string against the schema
 
-            if is_empty:
-                print("No errors found")
+        Args:
+            json_str (str): json string
+        """
+        Device._print_validation_errors(json_str, "1")
 
     @staticmethod
     def validate_v1_2(json_str: str) -> None:
@@ -674,47 +1054,120 @@ class Device:
         Args:
             json_str (str): json string
         """
-        schema_path = PROJECT_DIR.joinpath("schemas").joinpath("parchmint_v1_2.json")
-        with open(schema_path, encoding="utf-8") as json_file:
-            schema = json.load(json_file)
-            json_data = json.loads(json_str)
-            validator = jsonschema.Draft7Validator(schema)
+        Device._print_validation_errors(json_str, "1.2")
 
-            errors = validator.iter_errors(json_data)  # get all validation errors
+    @staticmethod
+    def from_json(json_str: Union[str, bytes], array_waypoints: bool = False) -> Device:
+        """Creates a device from a json string
 
-            is_empty = True
-            for error in errors:
-                is_empty = False
-                print(error)
-                print("------")
+        Args:
+            json_str (Union[str, bytes]): json string, bytes are decoded as UTF-8
+            array_waypoints (bool, optional): store the waypoints of the paths as arrays, for ParchMint 1.1 and 1.2 documents. Defaults to False.
 
-            if is_empty:
-                print("No errors found")
+        Returns:
+            Device: device created from the json string
+        """
+        with profiling.phase("from_json"):
+            with profiling.phase("from_json.decode"):
+                json_data = jsonbackend.loads(json_str)
+            json_version = json_data["version"]
+
+            if json_version == "1.0":
+                ret = Device.from_parchmint_v1(json_data)
+            elif json_version == "1.1":
+                ret = Device.from_parchmint_v1_2(json_data, array_waypoints)
+            elif json_version == "1.2":
+                ret = Device.from_parchmint_v1_2(json_data, array_waypoints)
+            else:
+                raise ValueError(f"Unsupported ParchMint version: {json_version}")
+
+        return ret
 
     @staticmethod
-    def from_json(json_str: str) -> Device:
-        """Creates a device from a json string
+    def from_file(
+        file_path,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache: Optional[DeviceCache] = None,
+        array_waypoints: bool = False,
+    ) -> Device:
+        """Creates a device from a ParchMint file
+
+        With streaming enabled the file is parsed incrementally and every
+        layer, feature, component, connection and valve is built as soon as it
+        is read, so the text and the decoded JSON of the whole file are never
+        held in memory at the same time as the device.
+
+        With a cache, a file whose contents were loaded before is read back
+        from the snapshot in the cache instead of being parsed again. Streaming
+        does not apply then, since the whole file is read to compute its key.
 
         Args:
-            json_str (str): json string
+            file_path (str | Path): path of the ParchMint JSON file
+            streaming (bool, optional): parse the file incrementally. Defaults to False.
+            chunk_size (int, optional): number of characters read at a time when streaming. Defaults to 64k.
+            cache (Optional[DeviceCache], optional): cache of parsed devices to go through. Defaults to None.
+            array_waypoints (bool, optional): store the waypoints of the paths as arrays, for ParchMint 1.1 and 1.2 files. Defaults to False.
 
         Returns:
-            Device: device created from the json string
+            Device: device created from the file
         """
-        ret = Device("")
-        json_data = json.loads(json_str)
-        json_version = json_data["version"]
+        if cache is not None:
+            return cache.load(file_path, array_waypoints)
 
-        if json_version == "1.0":
-            ret = Device.from_parchmint_v1(json_data)
-        elif json_version == "1.1":
-            ret = Device.from_parchmint_v1_2(json_data)
-        elif json_version == "1.2":
-            ret = Device.from_parchmint_v1_2(json_data)
-        else:
-            raise ValueError(f"Unsupported ParchMint version: {json_version}")
+        if streaming:
+            return load_device(Device(""), file_path, chunk_size, array_waypoints)
 
-        return ret
+        with open(file_path, "rb") as data_file:
+            return Device.from_json(data_file.read(), array_waypoints)
+
+    def to_json(self, version: str = "1.2") -> str:
+        """Serializes the device to canonical ParchMint JSON
+
+        The output is compact and identical whichever JSON backend is in use
+        (see parchmint.jsonbackend), so files written by different installs
+        diff cleanly.
+
+        Args:
+            version (str, optional): ParchMint version, "1" or "1.2". Defaults to "1.2".
+
+        Returns:
+            str: json string
+        """
+        return jsonbackend.dumps(self._to_parchmint(version))
+
+    def to_file(
+        self,
+        file_path,
+        version: str = "1.2",
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Writes the device to a ParchMint file, in the same canonical form as
+        to_json()
+
+        With streaming enabled the file is written chunk by chunk as the
+        layers, features, components, connections and valves are serialized,
+        so the dictionary of the whole device is never built.
+
+        Args:
+            file_path (str | Path): path of the file to write
+            version (str, optional): ParchMint version, "1" or "1.2". Defaults to "1.2".
+            streaming (bool, optional): serialize the device incrementally. Defaults to False.
+            chunk_size (int, optional): number of bytes written at a time when streaming. Defaults to 64k.
+        """
+        with open(file_path, "wb") as data_file:
+            if streaming:
+                dump_device(self, data_file, version, chunk_size)
+            else:
+                data_file.write(jsonbackend.dumps_bytes(self._to_parchmint(version)))
+
+    def _to_parchmint(self, version: str) -> Dict:
+        if version in ("1", "1.0"):
+            return self.to_parchmint_v1()
+        if version == "1.2":
+            return self.to_parchmint_v1_2()
+        raise ValueError(f"Unsupported ParchMint version: {version}")
 
     @staticmethod
     def from_parchmint_v1(json_data: Dict) -> Device:
@@ -732,7 +1185,7 @@ class Device:
             for layer in json_data["layers"]:
                 device_ref.add_layer(Layer(json_data=layer))
         else:
-            print("no layers found")
+            diagnostics.report_missing_section(logger, "layers", device=device_ref)
 
         # Loop through the components
         if "components" in json_data.keys():
@@ -740,33 +1193,62 @@ class Device:
                 component = Component.from_parchmint_v1(component_json, device_ref)
                 device_ref.add_component(component)
         else:
-            print("no components found")
+            diagnostics.report_missing_section(logger, "components", device=device_ref)
 
         if "connections" in json_data.keys():
             for connection_json in json_data["connections"]:
                 connection = Connection.from_parchmint_v1(connection_json, device_ref)
                 device_ref.add_connection(connection)
         else:
-            print("no connections found")
+            diagnostics.report_missing_section(logger, "connections", device=device_ref)
 
         if "params" in json_data.keys():
-            device_ref.params = Params(json_data["params"])
-
-            if device_ref.params.exists("xspan"):
-                device_ref.xspan = device_ref.params.get_param("xspan")
-            elif device_ref.params.exists("width"):
-                device_ref.xspan = device_ref.params.get_param("width")
-            elif device_ref.params.exists("x-span"):
-                device_ref.xspan = device_ref.params.get_param("x-span")
-
-            if device_ref.params.exists("yspan"):
-                device_ref.yspan = device_ref.params.get_param("yspan")
-            elif device_ref.params.exists("length"):
-                device_ref.yspan = device_ref.params.get_param("length")
-            elif device_ref.params.exists("y-span"):
-                device_ref.yspan = device_ref.params.get_param("y-span")
+            Device._load_params_v1(device_ref, json_data["params"])
         else:
-            print("no params found")
+            logger.debug("no params found")
+
+        if "valveMap" in json_data.keys():
+            Device._load_valve_map_v1(
+                device_ref, json_data["valveMap"], json_data["valveTypeMap"]
+            )
+
+        return device_ref
+
+    @staticmethod
+    def _load_params_v1(device_ref: Device, params_json: Dict) -> None:
+        """Loads the device params (and the spans) for Version = 1.0
+
+        Args:
+            device_ref (Device): device being loaded
+            params_json (Dict): JSON dictionary of the params
+        """
+        device_ref.params = Params(params_json)
+
+        if device_ref.params.exists("xspan"):
+            device_ref.xspan = device_ref.params.get_param("xspan")
+        elif device_ref.params.exists("width"):
+            device_ref.xspan = device_ref.params.get_param("width")
+        elif device_ref.params.exists("x-span"):
+            device_ref.xspan = device_ref.params.get_param("x-span")
+
+        if device_ref.params.exists("yspan"):
+            device_ref.yspan = device_ref.params.get_param("yspan")
+        elif device_ref.params.exists("length"):
+            device_ref.yspan = device_ref.params.get_param("length")
+        elif device_ref.params.exists("y-span"):
+            device_ref.yspan = device_ref.params.get_param("y-span")
+
+    @staticmethod
+    def _load_valve_map_v1(
+        device_ref: Device, valve_map: Dict, valve_type_map: Dict
+    ) -> None:
+        """Maps the valves of the device for Version = 1.0
+
+        Args:
+            device_ref (Device): device being loaded
+            valve_map (Dict): valve id to connection id mapping
+            valve_type_map (Dict): valve id to valve type mapping
+        """
 
         def get_valve_type(value: str):
             if value is ValveType.NORMALLY_OPEN:
@@ -776,23 +1258,21 @@ class Device:
             else:
                 raise KeyError(f"Unknown valve type: {value}")
 
-        if "valveMap" in json_data.keys():
-            valve_map = json_data["valveMap"]
-            valve_type_map = json_data["valveTypeMap"]
-
-            for key, value in valve_map.items():
-                device_ref.map_valve(
-                    device_ref.get_component(key),
-                    device_ref.get_connection(value),
-                    get_valve_type(valve_type_map[key]),
-                )
-
-        return device_ref
+        for key, value in valve_map.items():
+            device_ref.map_valve(
+                device_ref.get_component(key),
+                device_ref.get_connection(value),
+                get_valve_type(valve_type_map[key]),
+            )
 
     @staticmethod
-    def from_parchmint_v1_2(json_data: Dict) -> Device:
+    def from_parchmint_v1_2(json_data: Dict, array_waypoints: bool = False) -> Device:
         """Parses the json string and creates the device for Version = 1.2
 
+        Args:
+            json_data (Dict): JSON dictionary of the device
+            array_waypoints (bool, optional): store the waypoints of the paths as arrays. Defaults to False.
+
         Returns:
             dict: JSON Dictionary
         """
@@ -801,42 +1281,90 @@ class Device:
 
         # First always add the layers
         if "layers" in json_data.keys():
-            for layer in json_data["layers"]:
-                device_ref.add_layer(Layer(json_data=layer))
+            with profiling.phase(
+                "from_parchmint_v1_2.layers", len(json_data["layers"])
+            ):
+                for layer in json_data["layers"]:
+                    device_ref.add_layer(Layer(json_data=layer))
         else:
-            print("no layers found")
+            diagnostics.report_missing_section(logger, "layers", device=device_ref)
 
         # Second add all the features
         if "features" in json_data.keys():
-            for feature_json in json_data["features"]:
-                feature = Feature.from_parchmint_v1_2(feature_json, device_ref)
-                device_ref.add_feature(feature)
+            with profiling.phase(
+                "from_parchmint_v1_2.features", len(json_data["features"])
+            ):
+                for feature_json in json_data["features"]:
+                    feature = Feature.from_parchmint_v1_2(feature_json, device_ref)
+                    device_ref.add_feature(feature)
 
         # Loop through the components
         if "components" in json_data.keys():
-            for component_json in json_data["components"]:
-                component = Component.from_parchmint_v1_2(component_json, device_ref)
-                device_ref.add_component(component)
+            with profiling.phase(
+                "from_parchmint_v1_2.components", len(json_data["components"])
+            ):
+                device_ref.add_components(
+                    Component.from_parchmint_v1_2(component_json, device_ref)
+                    for component_json in json_data["components"]
+                )
         else:
-            print("no components found")
+            diagnostics.report_missing_section(logger, "components", device=device_ref)
 
         if "connections" in json_data.keys():
-            for connection_json in json_data["connections"]:
-                connection = Connection.from_parchmint_v1_2(connection_json, device_ref)
-                device_ref.add_connection(connection)
+            # The connections are built first and then added together, so that
+            # building the netlist graph is timed on its own
+            with profiling.phase(
+                "from_parchmint_v1_2.connections", len(json_data["connections"])
+            ):
+                connections = [
+                    Connection.from_parchmint_v1_2(
+                        connection_json, device_ref, array_waypoints
+                    )
+                    for connection_json in json_data["connections"]
+                ]
+            with profiling.phase("from_parchmint_v1_2.graph", len(connections)):
+                device_ref.add_connections(connections)
         else:
-            print("no connections found")
+            diagnostics.report_missing_section(logger, "connections", device=device_ref)
 
         if "params" in json_data.keys():
-            device_ref.params = Params(json_data["params"])
+            Device._load_params_v1_2(device_ref, json_data["params"])
+        else:
+            logger.debug("no params found")
 
-            if device_ref.params.exists("x-span"):
-                device_ref.xspan = device_ref.params.get_param("x-span")
+        if "valves" in json_data.keys():
+            with profiling.phase(
+                "from_parchmint_v1_2.valves", len(json_data["valves"])
+            ):
+                for valve_object in json_data["valves"]:
+                    Device._load_valve_v1_2(device_ref, valve_object)
 
-            if device_ref.params.exists("y-span"):
-                device_ref.yspan = device_ref.params.get_param("y-span")
-        else:
-            print("no params found")
+        return device_ref
+
+    @staticmethod
+    def _load_params_v1_2(device_ref: Device, params_json: Dict) -> None:
+        """Loads the device params (and the spans) for Version = 1.2
+
+        Args:
+            device_ref (Device): device being loaded
+            params_json (Dict): JSON dictionary of the params
+        """
+        device_ref.params = Params(params_json)
+
+        if device_ref.params.exists("x-span"):
+            device_ref.xspan = device_ref.params.get_param("x-span")
+
+        if device_ref.params.exists("y-span"):
+            device_ref.yspan = device_ref.params.get_param("y-span")
+
+    @staticmethod
+    def _load_valve_v1_2(device_ref: Device, valve_object: Dict) -> None:
+        """Maps a single valve object of the device for Version = 1.2
+
+        Args:
+            device_ref (Device): device being loaded
+            valve_object (Dict): JSON dictionary of the valve
+        """
 
         def get_valve_type(value: str) -> ValveType:
             if value == ValveType.NORMALLY_OPEN:
@@ -846,20 +1374,14 @@ class Device:
             else:
                 raise ValueError(f"Unknown valve type: {value}")
 
-        if "valves" in json_data.keys():
-            valve_objects = json_data["valves"]
-
-            for valve_object in valve_objects:
-                componentid = valve_object["componentid"]
-                connectionid = valve_object["connectionid"]
-                # Note - Sets it to default normally open if nothign is specified
-                valve_type = valve_object["type"] if "type" in valve_object else None
-                device_ref.map_valve(
-                    device_ref.get_component(componentid),
-                    device_ref.get_connection(connectionid),
-                    get_valve_type(valve_type)
-                    if valve_type is not None
-                    else ValveType.NORMALLY_OPEN,
-                )
-
-        return device_ref
+        componentid = valve_object["componentid"]
+        connectionid = valve_object["connectionid"]
+        # Note - Sets it to default normally open if nothign is specified
+        valve_type = valve_object["type"] if "type" in valve_object else None
+        device_ref.map_valve(
+            device_ref.get_component(componentid),
+            device_ref.get_connection(connectionid),
+            get_valve_type(valve_type)
+            if valve_type is not None
+            else ValveType.NORMALLY_OPEN,
+        )
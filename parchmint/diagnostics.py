@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from parchmint.device import Device
+
+# Codes of the warnings
+DUPLICATE_COMPONENT = "duplicate_component"
+MISSING_SINKS = "missing_sinks"
+MISSING_SECTION = "missing_section"
+NO_CONNECTIONS = "no_connections"
+
+# The library only logs, applications decide where the records go. The null
+# handler keeps the records away from the stderr fallback of logging when the
+# application did not configure it.
+logging.getLogger("parchmint").addHandler(logging.NullHandler())
+
+
+class DeviceWarning(NamedTuple):
+    """A problem found while building or querying a device. The message is
+    only formatted when it is read."""
+
+    code: str
+    """Kind of problem, one of the codes of parchmint.diagnostics"""
+
+    entity: Optional[str]
+    """ID or name of the component or connection concerned, None if there is
+    none"""
+
+    template: str
+    """%-style template of the message"""
+
+    args: Tuple[Any, ...]
+    """Arguments of the template"""
+
+    @property
+    def message(self) -> str:
+        """Returns the formatted message
+
+        Returns:
+            str: message
+        """
+        return self.template % self.args
+
+
+_counts: Counter = Counter()
+_counts_lock = threading.Lock()
+
+
+def report_warning(
+    logger: logging.Logger,
+    code: str,
+    template: str,
+    *args: Any,
+    device: Optional[Device] = None,
+    entity: Optional[str] = None,
+) -> None:
+    """Counts a warning, adds it to the warnings of the device and logs it.
+    The message is only formatted if the logger lets the record through.
+
+    Args:
+        logger (logging.Logger): logger of the module reporting the warning
+        code (str): kind of problem
+        template (str): %-style template of the message
+        *args (Any): arguments of the template
+        device (Optional[Device], optional): device collecting the warning. Defaults to None.
+        entity (Optional[str], optional): ID or name of the entity concerned. Defaults to None.
+    """
+    with _counts_lock:
+        _counts[code] += 1
+    if device is not None:
+        device.warnings.append(DeviceWarning(code, entity, template, args))
+    logger.warning(template, *args)
+
+
+def report_missing_section(
+    logger: logging.Logger, key: str, device: Optional[Device] = None
+) -> None:
+    """Reports a section missing from the file a device is loaded from
+
+    Args:
+        logger (logging.Logger): logger of the module loading the device
+        key (str): key of the missing section
+        device (Optional[Device], optional): device being loaded. Defaults to None.
+    """
+    report_warning(logger, MISSING_SECTION, "no %s found", key, device=device)
+
+
+def warning_counts() -> Dict[str, int]:
+    """Returns the number of warnings reported in the process for each code
+
+    Returns:
+        Dict[str, int]: number of warnings by code
+    """
+    with _counts_lock:
+        return dict(_counts)
+
+
+def reset_warning_counts() -> None:
+    """Sets the warning counts back to zero"""
+    with _counts_lock:
+        _counts.clear()
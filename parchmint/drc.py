@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
+
+from parchmint.crossings import find_crossings
+from parchmint.spatialindex import (
+    COMPONENT,
+    SEGMENT,
+    BoundingBox,
+    SpatialIndex,
+    SpatialItem,
+    segment_intersects_box,
+)
+
+if TYPE_CHECKING:
+    from parchmint.device import Device
+
+COMPONENT_OVERLAP = "component_overlap"
+COMPONENT_SPACING = "component_spacing"
+CHANNEL_COMPONENT_CROSSING = "channel_component_crossing"
+CHANNEL_CROSSING = "channel_crossing"
+
+
+class DRCViolation(NamedTuple):
+    """A design rule violation between two primitives of the device"""
+
+    rule: str
+    """Rule that is violated, one of the module level rule constants"""
+
+    first_id: str
+    """ID of the first component / connection involved"""
+
+    second_id: str
+    """ID of the second component / connection involved"""
+
+    layer_id: Optional[str]
+    """ID of the layer the violation is on"""
+
+    location: BoundingBox
+    """Region of the violation as (xmin, ymin, xmax, ymax)"""
+
+    value: float = 0.0
+    """Measured gap for spacing violations, 0 otherwise"""
+
+
+def _component_spacing(item: SpatialItem) -> float:
+    params = item.ref.params
+    return (
+        params.get_param("componentSpacing") if params.exists("componentSpacing") else 0
+    )
+
+
+def _shared_layer(first: SpatialItem, second: SpatialItem) -> Optional[str]:
+    """Returns a layer both primitives are on (or None if they share none). A
+    primitive without layer information is treated as being on every layer of
+    the other one, two primitives without any share none."""
+    if not first.layers:
+        return second.layers[0] if second.layers else None
+    for layer_id in first.layers:
+        if not second.layers or layer_id in second.layers:
+            return layer_id
+    return None
+
+
+def _box_intersection(first: BoundingBox, second: BoundingBox) -> BoundingBox:
+    return (
+        max(first[0], second[0]),
+        max(first[1], second[1]),
+        min(first[2], second[2]),
+        min(first[3], second[3]),
+    )
+
+
+def _attached_components(item: SpatialItem) -> List[str]:
+    connection = item.ref
+    ret = [sink.component for sink in connection.sinks]
+    if connection.source is not None:
+        ret.append(connection.source.component)
+    return ret
+
+
+def _check_components(
+    first: SpatialItem, second: SpatialItem, layer_id: str
+) -> Optional[DRCViolation]:
+    region = _box_intersection(first.bbox, second.bbox)
+    if region[0] < region[2] and region[1] < region[3]:
+        return DRCViolation(COMPONENT_OVERLAP, first.ID, second.ID, layer_id, region)
+
+    required = max(_component_spacing(first), _component_spacing(second))
+    gap = math.hypot(max(region[0] - region[2], 0), max(region[1] - region[3], 0))
+    if gap < required:
+        location = (
+            min(region[0], region[2]),
+            min(region[1], region[3]),
+            max(region[0], region[2]),
+            max(region[1], region[3]),
+        )
+        return DRCViolation(
+            COMPONENT_SPACING, first.ID, second.ID, layer_id, location, gap
+        )
+    return None
+
+
+def _check_channel_component(
+    channel: SpatialItem, component: SpatialItem, layer_id: str
+) -> Optional[DRCViolation]:
+    if component.ID in _attached_components(channel):
+        return None
+    start, end = channel.segment
+    if not segment_intersects_box(start, end, component.bbox):
+        return None
+    return DRCViolation(
+        CHANNEL_COMPONENT_CROSSING,
+        channel.ID,
+        component.ID,
+        layer_id,
+        _box_intersection(channel.bbox, component.bbox),
+    )
+
+
+def check_device(
+    device: Device, spatial_index: Optional[SpatialIndex] = None
+) -> List[DRCViolation]:
+    """Runs the overlap and spacing design rule checks on the device.
+
+    The checks flag components that overlap or are closer than their
+    componentSpacing param, channel segments crossing components they are not
+    connected to and channel segments of different connections crossing each
+    other, for primitives on the same layer. Candidate pairs come from the
+    spatial index and the channel crossings from crossings.find_crossings() run
+    on the connections in the index, so only primitives that are close to each
+    other are compared.
+
+    Args:
+        device (Device): device to check
+        spatial_index (Optional[SpatialIndex], optional): index of the primitives to check, the device's own index when None. Defaults to None.
+
+    Returns:
+        List[DRCViolation]: violations found
+    """
+    index = spatial_index if spatial_index is not None else device.spatial_index
+    items = index.items
+
+    violations: List[DRCViolation] = []
+
+    # Components are paired up within the spacing of either of them
+    margins = [
+        _component_spacing(item) if item.kind == COMPONENT else 0.0 for item in items
+    ]
+    for first_index, second_index in index.candidate_pairs(
+        kind=COMPONENT, margins=margins
+    ):
+        first, second = items[first_index], items[second_index]
+        layer_id = _shared_layer(first, second)
+        if layer_id is None:
+            continue
+        violation = _check_components(first, second, layer_id)
+        if violation is not None:
+            violations.append(violation)
+
+    # Channel segments are only checked against the components they touch,
+    # crossings between channels are found by the crossing detector below
+    channels = [item for item in items if item.kind == SEGMENT]
+    for channel in channels:
+        for component in index.query_window(*channel.bbox, kind=COMPONENT):
+            layer_id = _shared_layer(channel, component)
+            if layer_id is None:
+                continue
+            violation = _check_channel_component(channel, component, layer_id)
+            if violation is not None:
+                violations.append(violation)
+
+    # The crossings are looked for between the connections in the index
+    connections = list({id(item.ref): item.ref for item in channels}.values())
+    for crossing in find_crossings(connections):
+        violations.append(
+            DRCViolation(
+                CHANNEL_CROSSING,
+                crossing.first_id,
+                crossing.second_id,
+                crossing.layer_id,
+                (
+                    min(crossing.start[0], crossing.end[0]),
+                    min(crossing.start[1], crossing.end[1]),
+                    max(crossing.start[0], crossing.end[0]),
+                    max(crossing.start[1], crossing.end[1]),
+                ),
+            )
+        )
+    return violations
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import warnings
+from collections import Counter
+from typing import TYPE_CHECKING, Any, NamedTuple, Tuple
+
+import networkx as nx
+
+from parchmint import hashing
+
+if TYPE_CHECKING:
+    from parchmint.component import Component
+    from parchmint.device import Device
+
+# Number of neighbourhood aggregation rounds used for the WL graph hash
+WL_ITERATIONS = 3
+
+
+class DeviceFingerprint(NamedTuple):
+    """Isomorphism invariant summary of a device.
+
+    Two devices that SimilarityMatcher can match always have equal fingerprints,
+    so devices with different fingerprints can be rejected without running VF2.
+    Params are not part of the fingerprint.
+    """
+
+    entity_histogram: Tuple[Tuple[str, int], ...]
+    """Number of components of each entity, sorted by entity"""
+
+    degree_sequence: Tuple[Tuple[int, int], ...]
+    """Sorted (in degree, out degree) of every component in the netlist"""
+
+    layer_signature: Tuple[Tuple[Tuple[str, ...], int], ...]
+    """Number of components on each combination of layers, sorted"""
+
+    wl_hash: str
+    """Weisfeiler-Lehman hash of the netlist labelled by the component nodes"""
+
+    @property
+    def digest(self) -> str:
+        """Returns a short key for the fingerprint, e.g. for deduplicating a
+        corpus of devices
+
+        Returns:
+            str: hex digest
+        """
+        return hashing.content_digest(tuple(self))
+
+
+def _port_label(label: Any) -> str:
+    # Some files carry whole port objects as labels, dump those with sorted keys
+    # so that labels that compare equal give the same string
+    if isinstance(label, str):
+        return label
+    return hashing.canonical_json(label)
+
+
+def _node_label(component: Component) -> str:
+    """Label of a netlist node, made up of the component attributes that
+    SimilarityMatcher always compares (entity, layers and port labels)"""
+    layers = ",".join(layer.ID for layer in component.layers)
+    ports = ",".join(_port_label(port.label) for port in component.ports)
+    return f"{component.entity}|{layers}|{ports}"
+
+
+def compute_fingerprint(
+    device: Device, iterations: int = WL_ITERATIONS
+) -> DeviceFingerprint:
+    """Computes the fingerprint of the device
+
+    Args:
+        device (Device): device to fingerprint
+        iterations (int, optional): number of WL iterations. Defaults to WL_ITERATIONS.
+
+    Returns:
+        DeviceFingerprint: fingerprint of the device
+    """
+    graph = device.graph
+    components = {component.ID: component for component in device.components}
+
+    entity_histogram = Counter(component.entity for component in components.values())
+    layer_signature = Counter(
+        tuple(layer.ID for layer in component.layers)
+        for component in components.values()
+    )
+    degree_sequence = sorted(
+        (graph.in_degree(node), graph.out_degree(node)) for node in graph.nodes
+    )
+
+    # Collapse the parallel edges into an edge count so the hash distinguishes
+    # a single connection from several connections between the same components
+    labelled = nx.DiGraph()
+    for node in graph.nodes:
+        component = components.get(node)
+        labelled.add_node(
+            node, label=_node_label(component) if component is not None else ""
+        )
+    for source, sink in graph.edges():
+        if labelled.has_edge(source, sink):
+            continue
+        labelled.add_edge(source, sink, label=str(graph.number_of_edges(source, sink)))
+    # The directed WL hashes changed in networkx 3.5, the digest is only stable
+    # for a given networkx version
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        wl_hash = nx.weisfeiler_lehman_graph_hash(
+            labelled, edge_attr="label", node_attr="label", iterations=iterations
+        )
+
+    return DeviceFingerprint(
+        entity_histogram=tuple(sorted(entity_histogram.items())),
+        degree_sequence=tuple(degree_sequence),
+        layer_signature=tuple(sorted(layer_signature.items())),
+        wl_hash=wl_hash,
+    )
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import List, Optional, Tuple
+
+from parchmint.component import Component
+from parchmint.connection import Connection, ConnectionPath
+from parchmint.device import Device, ValveType
+from parchmint.feature import Feature
+from parchmint.layer import Layer
+from parchmint.params import Params
+from parchmint.port import Port
+from parchmint.target import Target
+
+# Entities picked for the non valve components
+ENTITIES = ["MIXER", "CHAMBER", "PORT", "TREE", "MUX", "NOZZLE DROPLET GENERATOR"]
+VALVE_ENTITY = "VALVE3D"
+
+# Range of the component spans, the components are placed on a grid whose pitch
+# leaves room for the largest of them
+_SPAN_RANGE = (1000, 5000, 500)
+_PITCH = 2 * _SPAN_RANGE[1]
+
+# Number of following components the sinks of a connection are picked from, so
+# that the channels stay local like in real designs
+_SINK_WINDOW = 8
+
+
+def _layer_type(index: int) -> str:
+    # The first layer is a flow layer, the rest alternate control and flow
+    return "CONTROL" if index % 2 == 1 else "FLOW"
+
+
+def _ports(rng: random.Random, count: int, xspan: int, yspan: int, layer: str):
+    """Ports spread along the top and bottom edges of the component"""
+    ret = []
+    for index in range(count):
+        x = (index // 2 + 1) * xspan // (count // 2 + 2)
+        y = 0 if index % 2 == 0 else yspan
+        ret.append(Port(str(index + 1), layer, x, y))
+    rng.shuffle(ret)
+    return ret
+
+
+def _route(
+    start: Tuple[int, int], end: Tuple[int, int], bends: int
+) -> List[Tuple[int, int]]:
+    """Staircase route from start to end with the given number of bends"""
+    ret = [start]
+    x, y = start
+    for index in range(1, bends + 1):
+        fraction = index / (bends + 1)
+        if index % 2 == 1:
+            x = round(start[0] + (end[0] - start[0]) * fraction)
+        else:
+            y = round(start[1] + (end[1] - start[1]) * fraction)
+        ret.append((x, y))
+    ret.append(end)
+    return ret
+
+
+def generate_device(
+    component_count: int = 1000,
+    ports_per_component: int = 4,
+    fanout: int = 2,
+    layer_count: int = 2,
+    waypoints_per_path: int = 2,
+    feature_count: int = 0,
+    valve_ratio: float = 0.1,
+    seed: int = 0,
+    name: Optional[str] = None,
+) -> Device:
+    """Generates a synthetic device that is valid against the v1.2 schema.
+
+    The components are placed on a grid and connected to components that
+    follow them closely, each connection is routed with one path per sink.
+    The same arguments always give the same device.
+
+    Args:
+        component_count (int, optional): number of components, valves included. Defaults to 1000.
+        ports_per_component (int, optional): number of ports on each non valve component. Defaults to 4.
+        fanout (int, optional): maximum number of sinks of a connection, the number is drawn between 1 and fanout. Defaults to 2.
+        layer_count (int, optional): number of layers, alternating flow and control. Defaults to 2.
+        waypoints_per_path (int, optional): number of bends between the end points of each path. Defaults to 2.
+        feature_count (int, optional): number of features, attached to the paths in turn. Defaults to 0.
+        valve_ratio (float, optional): fraction of the components that are valves mapped onto connections. Defaults to 0.1.
+        seed (int, optional): seed of the random generator. Defaults to 0.
+        name (Optional[str], optional): name of the device, derived from the size and seed when None. Defaults to None.
+
+    Raises:
+        ValueError: if the arguments are out of range
+
+    Returns:
+        Device: generated device
+    """
+    # pylint: disable=too-many-locals
+    if component_count < 0 or ports_per_component < 1 or fanout < 1:
+        raise ValueError(
+            "component_count has to be >= 0, ports_per_component and fanout >= 1"
+        )
+    if layer_count < 1 or waypoints_per_path < 0 or feature_count < 0:
+        raise ValueError(
+            "layer_count has to be >= 1, waypoints_per_path and feature_count >= 0"
+        )
+    if not 0 <= valve_ratio <= 1:
+        raise ValueError("valve_ratio has to be between 0 and 1")
+
+    rng = random.Random(seed)
+    device = Device(name if name is not None else f"synthetic_{component_count}_{seed}")
+
+    layers = [
+        Layer(str(index), f"{_layer_type(index)}_{index}", _layer_type(index), "0")
+        for index in range(layer_count)
+    ]
+    for layer in layers:
+        device.add_layer(layer)
+    flow_layers = [layer for layer in layers if layer.layer_type == "FLOW"]
+    control_layers = [layer for layer in layers if layer.layer_type == "CONTROL"]
+
+    # Components, the valves come last
+    valve_count = round(component_count * valve_ratio)
+    columns = max(math.ceil(math.sqrt(component_count)), 1)
+    components = []
+    for index in range(component_count):
+        is_valve = index >= component_count - valve_count
+        xspan = rng.randrange(*_SPAN_RANGE)
+        yspan = rng.randrange(*_SPAN_RANGE)
+        if is_valve:
+            component_layers = [rng.choice(control_layers or flow_layers)]
+            port_count = 1
+        else:
+            component_layers = [rng.choice(flow_layers)]
+            port_count = ports_per_component
+        component = Component(
+            name=f"{'valve' if is_valve else 'c'}{index}",
+            ID=f"{'valve' if is_valve else 'c'}{index}",
+            entity=VALVE_ENTITY if is_valve else rng.choice(ENTITIES),
+            layers=component_layers,
+            params=Params({"rotation": 0}),
+            ports_list=_ports(
+                rng, port_count, xspan, yspan, component_layers[0].layer_type
+            ),
+            xspan=xspan,
+            yspan=yspan,
+        )
+        component.xpos = (index % columns) * _PITCH
+        component.ypos = (index // columns) * _PITCH
+        components.append(component)
+    device.add_components(components)
+
+    features = [
+        Feature(
+            f"feature{index}",
+            "RECTANGLE",
+            "RECT",
+            Params({"width": rng.randrange(100, 1000, 100)}),
+            rng.choice(flow_layers),
+        )
+        for index in range(feature_count)
+    ]
+    for feature in features:
+        device.add_feature(feature)
+
+    # Each flow component drives a connection to components shortly after it
+    flow_components = components[: component_count - valve_count]
+    connections = []
+    paths = []
+    for index, source_component in enumerate(flow_components[:-1]):
+        candidates = flow_components[index + 1 : index + 1 + _SINK_WINDOW]
+        sink_components = rng.sample(
+            candidates, min(rng.randint(1, fanout), len(candidates))
+        )
+        source_port = rng.choice(source_component.ports)
+        source = Target(source_component.ID, source_port.label)
+        sinks = []
+        connection_paths = []
+        for sink_component in sink_components:
+            sink_port = rng.choice(sink_component.ports)
+            sink = Target(sink_component.ID, sink_port.label)
+            sinks.append(sink)
+            path = ConnectionPath(
+                source,
+                sink,
+                _route(
+                    (
+                        source_component.xpos + source_port.x,
+                        source_component.ypos + source_port.y,
+                    ),
+                    (
+                        sink_component.xpos + sink_port.x,
+                        sink_component.ypos + sink_port.y,
+                    ),
+                    waypoints_per_path,
+                ),
+            )
+            connection_paths.append(path)
+            paths.append(path)
+        connections.append(
+            Connection(
+                name=f"n{index}",
+                ID=f"n{index}",
+                entity="CHANNEL",
+                layer=source_component.layers[0],
+                params=Params({"channelWidth": rng.randrange(100, 500, 50)}),
+                source=source,
+                sinks=sinks,
+                paths=connection_paths,
+            )
+        )
+    device.add_connections(connections)
+
+    if paths:
+        for index, feature in enumerate(features):
+            paths[index % len(paths)].features.append(feature)
+
+    if connections:
+        for valve in components[component_count - valve_count :]:
+            device.map_valve(
+                valve,
+                rng.choice(connections),
+                rng.choice([ValveType.NORMALLY_OPEN, ValveType.NORMALLY_CLOSED]),
+            )
+
+    rows = math.ceil(component_count / columns)
+    device.xspan = columns * _PITCH
+    device.yspan = rows * _PITCH
+    return device
+
+
+def generate_file(
+    file_path,
+    version: str = "1.2",
+    streaming: bool = True,
+    **kwargs,
+) -> Device:
+    """Generates a synthetic device and writes it to a ParchMint file
+
+    Args:
+        file_path (str | Path): path of the file to write
+        version (str, optional): ParchMint version of the file, "1" or "1.2". Defaults to "1.2".
+        streaming (bool, optional): write the file incrementally. Defaults to True.
+        **kwargs: arguments of generate_device()
+
+    Returns:
+        Device: generated device
+    """
+    device = generate_device(**kwargs)
+    device.to_file(file_path, version=version, streaming=streaming)
+    return device
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from parchmint.component import Component
+
+# Exact cosine / sine for rotations by 0, 90, 180 and 270 degrees
+_QUARTER_COS = np.array([1.0, 0.0, -1.0, 0.0])
+_QUARTER_SIN = np.array([0.0, 1.0, 0.0, -1.0])
+
+
+def rotation_terms(
+    angles: npt.ArrayLike,
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Returns the cosine and sine of the angles, snapped to exact values for the
+    multiples of 90 degrees so that axis aligned rotations stay on the integer grid
+
+    Args:
+        angles (npt.ArrayLike): angles of rotation in degrees
+
+    Returns:
+        Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]: cosines and sines
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    theta = np.radians(angles)
+    cos, sin = np.cos(theta), np.sin(theta)
+    quarter = np.mod(angles, 90) == 0
+    if np.any(quarter):
+        turns = np.mod(np.round(angles / 90), 4).astype(np.intp)
+        cos = np.where(quarter, _QUARTER_COS[turns], cos)
+        sin = np.where(quarter, _QUARTER_SIN[turns], sin)
+    return cos, sin
+
+
+def _freeze(matrix: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    matrix.setflags(write=False)
+    return matrix
+
+
+@lru_cache(maxsize=None)
+def rotation_matrix(angle: float) -> npt.NDArray[np.float64]:
+    """Returns the affine matrix rotating points clockwise (in screen coordinates)
+    about the origin
+
+    Args:
+        angle (float): angle of rotation in degrees
+
+    Returns:
+        npt.NDArray[np.float64]: read-only 3x3 affine matrix
+    """
+    cos, sin = rotation_terms(angle)
+    return _freeze(np.array(((cos, -sin, 0.0), (sin, cos, 0.0), (0.0, 0.0, 1.0))))
+
+
+@lru_cache(maxsize=4096)
+def frame_matrix(xspan: float, yspan: float, angle: float) -> npt.NDArray[np.float64]:
+    """Returns the affine matrix that rotates a point of an xspan x yspan component
+    about the component center and moves it so that the topleft corner of the
+    rotated component is the origin
+
+    Args:
+        xspan (float): x span of the component
+        yspan (float): y span of the component
+        angle (float): angle of rotation in degrees
+
+    Returns:
+        npt.NDArray[np.float64]: read-only 3x3 affine matrix
+    """
+    linear, offset, _ = frame_transforms([xspan], [yspan], [angle])
+    matrix = np.identity(3)
+    matrix[:2, :2] = linear[0]
+    matrix[:2, 2] = offset[0]
+    return _freeze(matrix)
+
+
+def center_rotation_matrix(
+    center_x: float, center_y: float, angle: float
+) -> npt.NDArray[np.float64]:
+    """Returns the affine matrix rotating points about the given center
+
+    Args:
+        center_x (float): x coordinate of the center
+        center_y (float): y coordinate of the center
+        angle (float): angle of rotation in degrees
+
+    Returns:
+        npt.NDArray[np.float64]: 3x3 affine matrix
+    """
+    matrix = rotation_matrix(angle).copy()
+    matrix[:2, 2] = (center_x, center_y) - matrix[:2, :2].dot((center_x, center_y))
+    return matrix
+
+
+def transform_points(
+    matrix: npt.NDArray[np.float64], points: npt.ArrayLike
+) -> npt.NDArray[np.float64]:
+    """Applies the affine matrix to a batch of points
+
+    Args:
+        matrix (npt.NDArray[np.float64]): 3x3 affine matrix
+        points (npt.ArrayLike): (N, 2) array of points
+
+    Returns:
+        npt.NDArray[np.float64]: (N, 2) array of the transformed points
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return points.dot(matrix[:2, :2].T) + matrix[:2, 2]
+
+
+def frame_transforms(
+    xspans: npt.ArrayLike, yspans: npt.ArrayLike, angles: npt.ArrayLike
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Computes the rotation of the local frame of many components at once. A
+    point p of component i is moved to linear[i] @ p + offset[i].
+
+    Args:
+        xspans (npt.ArrayLike): x spans of the components
+        yspans (npt.ArrayLike): y spans of the components
+        angles (npt.ArrayLike): angles of rotation in degrees
+
+    Returns:
+        Tuple: (N, 2, 2) rotation matrices, (N, 2) offsets and (N, 2) spans of the
+        rotated bounding boxes
+    """
+    xspans = np.asarray(xspans, dtype=np.float64)
+    yspans = np.asarray(yspans, dtype=np.float64)
+    cos, sin = rotation_terms(angles)
+    linear = np.empty((len(cos), 2, 2))
+    linear[:, 0, 0] = cos
+    linear[:, 0, 1] = -sin
+    linear[:, 1, 0] = sin
+    linear[:, 1, 1] = cos
+
+    # Half spans of the rotated bounding box, the topleft corner of the rotated
+    # component sits at center - half span
+    half_x = (np.abs(cos) * xspans + np.abs(sin) * yspans) / 2
+    half_y = (np.abs(sin) * xspans + np.abs(cos) * yspans) / 2
+    center_x = xspans / 2
+    center_y = yspans / 2
+    offset = np.empty((len(cos), 2))
+    offset[:, 0] = half_x - (cos * center_x - sin * center_y)
+    offset[:, 1] = half_y - (sin * center_x + cos * center_y)
+    return linear, offset, np.stack((2 * half_x, 2 * half_y), axis=1)
+
+
+def round_points(points: npt.NDArray[np.float64]) -> npt.NDArray[np.int64]:
+    """Rounds the coordinates to the nearest integer (half to even, like round())
+
+    Args:
+        points (npt.NDArray[np.float64]): coordinates
+
+    Returns:
+        npt.NDArray[np.int64]: rounded coordinates
+    """
+    return np.rint(points).astype(np.int64)
+
+
+def rotate_components(
+    components: Sequence[Component], angles: Optional[npt.ArrayLike] = None
+) -> None:
+    """Rotates the components in place, batching the math over all of them.
+
+    This is the bulk version of Component.rotate_component(): the ports are
+    rotated within the component frame, and the position and spans are set to
+    the bounding box of the component rotated about its center.
+
+    Args:
+        components (Sequence[Component]): components to rotate
+        angles (Optional[npt.ArrayLike], optional): angle for each component, the rotation param of each component when None. Defaults to None.
+    """
+    if len(components) == 0:
+        return
+    if angles is None:
+        angles = [component.rotation for component in components]
+    angles = np.broadcast_to(np.asarray(angles, dtype=np.float64), len(components))
+
+    xspans = np.array([component.xspan for component in components], dtype=np.float64)
+    yspans = np.array([component.yspan for component in components], dtype=np.float64)
+    linear, offset, _ = frame_transforms(xspans, yspans, angles)
+
+    # Rotate all the ports of all the components in one go
+    port_counts = [len(component.ports) for component in components]
+    if sum(port_counts) > 0:
+        owners = np.repeat(np.arange(len(components)), port_counts)
+        ports = np.array(
+            [(port.x, port.y) for component in components for port in component.ports],
+            dtype=np.float64,
+        )
+        rotated = round_points(
+            np.einsum("nij,nj->ni", linear[owners], ports) + offset[owners]
+        ).tolist()
+        index = 0
+        for component in components:
+            for port in component.ports:
+                port.x, port.y = rotated[index]
+                index += 1
+
+    # Rotate the corners about the component centers and take their bounding box,
+    # components without a position are rotated in place at the origin
+    has_position = [component.params.exists("position") for component in components]
+    positions = np.array(
+        [
+            (component.xpos, component.ypos) if placed else (0, 0)
+            for component, placed in zip(components, has_position)
+        ],
+        dtype=np.float64,
+    )
+    corners = np.empty((len(components), 4, 2))
+    corners[:, :, 0] = np.stack(
+        (np.zeros_like(xspans), xspans, np.zeros_like(xspans), xspans), axis=1
+    )
+    corners[:, :, 1] = np.stack(
+        (np.zeros_like(yspans), np.zeros_like(yspans), yspans, yspans), axis=1
+    )
+    half = np.stack((xspans / 2, yspans / 2), axis=1)[:, None, :]
+    rotated_corners = round_points(
+        np.einsum("nij,nkj->nki", linear, corners - half) + half + positions[:, None, :]
+    )
+    mins = rotated_corners.min(axis=1)
+    spans = np.abs(rotated_corners.max(axis=1) - mins)
+
+    for component, placed, (xmin, ymin), (xspan, yspan) in zip(
+        components, has_position, mins.tolist(), spans.tolist()
+    ):
+        component.xspan = int(xspan)
+        component.yspan = int(yspan)
+        if placed:
+            component.xpos = xmin
+            component.ypos = ymin
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from parchmint.component import Component
+
+_INITIAL_CAPACITY = 16
+
+
+class GeometryStore:
+    """Columnar copy of the component geometry of a device.
+
+    Every component gets a row in contiguous arrays holding its bounding box
+    (xmin, ymin, xmax, ymax) and rotation, and its port offsets are kept per row.
+    This lets bounding box, area and placement computations run as array math
+    instead of walking the objects.
+
+    The device keeps the store in sync when components are added, removed or
+    rotated through its methods. After changing a component object directly,
+    call refresh() for it. Positions written through set_positions() are also
+    written back to the component objects. Components without a position param
+    have NaN coordinates.
+    """
+
+    def __init__(
+        self,
+        components: Iterable[Component] = (),
+        on_change: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Creates a store holding the given components
+
+        Args:
+            components (Iterable[Component], optional): components to add. Defaults to ().
+            on_change (Optional[Callable[[], None]], optional): called when the store changes the component objects or reloads rows from them, the device uses it to drop the data derived from the geometry. Defaults to None.
+        """
+        self._on_change = on_change
+        self._size = 0
+        self._bboxes = np.empty((_INITIAL_CAPACITY, 4))
+        self._rotations = np.empty(_INITIAL_CAPACITY)
+        self._components: List[Component] = []
+        self._rows: Dict[str, int] = {}
+        self._port_offsets: List[npt.NDArray[np.float64]] = []
+
+        # Flattened port arrays, rebuilt on demand when the ports change
+        self._flat_ports: Optional[
+            Tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]
+        ] = None
+
+        for component in components:
+            self.add(component)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, component_id: str) -> bool:
+        return component_id in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        """Returns the component IDs in row order
+
+        Returns:
+            List[str]: component IDs
+        """
+        return [component.ID for component in self._components]
+
+    def row(self, component_id: str) -> int:
+        """Returns the row of the component
+
+        Args:
+            component_id (str): ID of the component
+
+        Raises:
+            KeyError: if the component is not in the store
+
+        Returns:
+            int: row index into the arrays
+        """
+        if component_id not in self._rows:
+            raise KeyError(f"Component not found in geometry store: {component_id}")
+        return self._rows[component_id]
+
+    def rows(self, component_ids: Iterable[str]) -> npt.NDArray[np.intp]:
+        """Returns the rows of the components
+
+        Args:
+            component_ids (Iterable[str]): IDs of the components
+
+        Returns:
+            npt.NDArray[np.intp]: row indices
+        """
+        return np.array(
+            [self.row(component_id) for component_id in component_ids], dtype=np.intp
+        )
+
+    @property
+    def bboxes(self) -> npt.NDArray[np.float64]:
+        """Returns the (N, 4) bounding boxes as xmin, ymin, xmax, ymax (read-only view)"""
+        return self._readonly(self._bboxes[: self._size])
+
+    @property
+    def positions(self) -> npt.NDArray[np.float64]:
+        """Returns the (N, 2) topleft corners (read-only view)"""
+        return self._readonly(self._bboxes[: self._size, :2])
+
+    @property
+    def spans(self) -> npt.NDArray[np.float64]:
+        """Returns the (N, 2) x and y spans"""
+        return self._bboxes[: self._size, 2:] - self._bboxes[: self._size, :2]
+
+    @property
+    def rotations(self) -> npt.NDArray[np.float64]:
+        """Returns the (N,) rotations in degrees (read-only view)"""
+        return self._readonly(self._rotations[: self._size])
+
+    @property
+    def placed(self) -> npt.NDArray[np.bool_]:
+        """Returns the (N,) mask of the components that have a position"""
+        return ~np.isnan(self._bboxes[: self._size, 0])
+
+    def areas(self) -> npt.NDArray[np.float64]:
+        """Returns the (N,) areas of the component bounding boxes
+
+        Returns:
+            npt.NDArray[np.float64]: areas
+        """
+        spans = self.spans
+        return spans[:, 0] * spans[:, 1]
+
+    def extent(self) -> Optional[Tuple[float, float, float, float]]:
+        """Returns the bounding box of all the placed components
+
+        Returns:
+            Optional[Tuple[float, float, float, float]]: xmin, ymin, xmax, ymax or None if nothing is placed
+        """
+        bboxes = self._bboxes[: self._size][self.placed]
+        if len(bboxes) == 0:
+            return None
+        xmin, ymin = bboxes[:, :2].min(axis=0).tolist()
+        xmax, ymax = bboxes[:, 2:].max(axis=0).tolist()
+        return (xmin, ymin, xmax, ymax)
+
+    def port_coordinates(
+        self,
+    ) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]:
+        """Returns the absolute coordinates of all the component ports
+
+        Returns:
+            Tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]: (P, 2) coordinates and the (P,) row of the component owning each port
+        """
+        if self._flat_ports is None:
+            counts = [len(offsets) for offsets in self._port_offsets]
+            offsets = (
+                np.concatenate(self._port_offsets)
+                if sum(counts) > 0
+                else np.empty((0, 2))
+            )
+            owners = np.repeat(np.arange(self._size), counts)
+            self._flat_ports = (offsets, owners)
+        offsets, owners = self._flat_ports
+        return offsets + self._bboxes[owners, :2], owners
+
+    def component_port_coordinates(self, component_id: str) -> npt.NDArray[np.float64]:
+        """Returns the absolute coordinates of the ports of one component
+
+        Args:
+            component_id (str): ID of the component
+
+        Returns:
+            npt.NDArray[np.float64]: (P, 2) port coordinates, in port order
+        """
+        row = self.row(component_id)
+        return self._port_offsets[row] + self._bboxes[row, :2]
+
+    def add(self, component: Component) -> None:
+        """Adds a component to the store, components whose ID is already present
+        are ignored
+
+        Args:
+            component (Component): component to add
+        """
+        if component.ID in self._rows:
+            return
+        if self._size == len(self._rotations):
+            self._grow()
+        row = self._size
+        self._size += 1
+        self._components.append(component)
+        self._rows[component.ID] = row
+        self._port_offsets.append(np.empty((0, 2)))
+        self._write_row(row, component)
+
+    def remove(self, component_id: str) -> None:
+        """Removes a component from the store, the last row is moved into its
+        place
+
+        Args:
+            component_id (str): ID of the component
+        """
+        row = self.row(component_id)
+        last = self._size - 1
+        if row != last:
+            self._bboxes[row] = self._bboxes[last]
+            self._rotations[row] = self._rotations[last]
+            moved = self._components[last]
+            self._components[row] = moved
+            self._port_offsets[row] = self._port_offsets[last]
+            self._rows[moved.ID] = row
+        self._components.pop()
+        self._port_offsets.pop()
+        del self._rows[component_id]
+        self._size = last
+        self._flat_ports = None
+
+    def refresh(self, component: Component) -> None:
+        """Reloads the row of a component from the component object
+
+        Args:
+            component (Component): component that was changed
+        """
+        self._write_row(self.row(component.ID), component)
+        if self._on_change is not None:
+            self._on_change()
+
+    def refresh_all(self, components: Optional[Iterable[Component]] = None) -> None:
+        """Reloads the rows of the components from the component objects
+
+        Args:
+            components (Optional[Iterable[Component]], optional): components to reload, all when None. Defaults to None.
+        """
+        for component in self._components if components is None else components:
+            self.refresh(component)
+
+    def set_positions(
+        self, component_ids: Sequence[str], positions: npt.ArrayLike
+    ) -> None:
+        """Moves components to new topleft positions, updating both the arrays
+        and the component objects
+
+        Args:
+            component_ids (Sequence[str]): IDs of the components to move
+            positions (npt.ArrayLike): (N, 2) new topleft corners
+        """
+        rows = self.rows(component_ids)
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        spans = self._bboxes[rows, 2:] - self._bboxes[rows, :2]
+        # Components that had no position keep their spans
+        unplaced = np.isnan(spans[:, 0])
+        if np.any(unplaced):
+            spans[unplaced] = [
+                (max(component.xspan, 0), max(component.yspan, 0))
+                for component in (self._components[row] for row in rows[unplaced])
+            ]
+        self._bboxes[rows, :2] = positions
+        self._bboxes[rows, 2:] = positions + spans
+        for row, (xpos, ypos) in zip(rows.tolist(), positions.tolist()):
+            component = self._components[row]
+            component.xpos = int(xpos) if float(xpos).is_integer() else xpos
+            component.ypos = int(ypos) if float(ypos).is_integer() else ypos
+        if self._on_change is not None:
+            self._on_change()
+
+    def _write_row(self, row: int, component: Component) -> None:
+        params = component.params
+        if params.exists("position"):
+            xmin, ymin = component.xpos, component.ypos
+            self._bboxes[row] = (
+                xmin,
+                ymin,
+                xmin + max(component.xspan, 0),
+                ymin + max(component.yspan, 0),
+            )
+        else:
+            self._bboxes[row] = np.nan
+        self._rotations[row] = (
+            params.get_param("rotation") if params.exists("rotation") else 0
+        )
+        self._port_offsets[row] = np.array(
+            [(port.x, port.y) for port in component.ports], dtype=np.float64
+        ).reshape(-1, 2)
+        self._flat_ports = None
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._rotations)
+        bboxes = np.empty((capacity, 4))
+        bboxes[: self._size] = self._bboxes[: self._size]
+        rotations = np.empty(capacity)
+        rotations[: self._size] = self._rotations[: self._size]
+        self._bboxes = bboxes
+        self._rotations = rotations
+
+    @staticmethod
+    def _readonly(array: npt.NDArray) -> npt.NDArray:
+        view = array.view()
+        view.setflags(write=False)
+        return view
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+from typing import Any
+
+
+def freeze(value: Any) -> Any:
+    """Converts a decoded json value into nested tuples that are hashable and
+    compare equal exactly when the values do, independent of the dict key order
+
+    Args:
+        value (Any): decoded json value
+
+    Returns:
+        Any: hashable equivalent of the value
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def intern_string(value: Any) -> Any:
+    """Interns the value if it is a string, so that the labels, layer names and
+    entities repeated across a device share one string object
+
+    Args:
+        value (Any): value to intern
+
+    Returns:
+        Any: interned string, or the value unchanged if it is not a string
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def canonical_json(value: Any) -> str:
+    """Serializes the value as compact json with sorted keys, so equal values
+    always give the same string
+
+    Args:
+        value (Any): json serializable value
+
+    Returns:
+        str: canonical json string
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def content_digest(value: Any) -> str:
+    """Returns the SHA-256 digest of the canonical json of the value
+
+    Args:
+        value (Any): json serializable value
+
+    Returns:
+        str: hex digest
+    """
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
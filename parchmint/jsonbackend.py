@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from typing import Any, Callable, List, NamedTuple, Union
+
+STDLIB = "json"
+UJSON = "ujson"
+ORJSON = "orjson"
+
+# Backends in order of preference, the PARCHMINT_JSON_BACKEND environment
+# variable forces one of them. Whatever the backend, dumps() gives the same
+# canonical text: compact separators, keys in insertion order, non-ASCII
+# characters as UTF-8 and floats formatted like the standard library does.
+PREFERENCE = (ORJSON, UJSON, STDLIB)
+
+# Floats in exponent notation are the one thing the fast encoders format
+# differently from the standard library (1e16 vs 1e+16, 1e-5 vs 1e-05)
+_EXPONENT_PATTERN = re.compile(rb"[0-9]e[-+]?[0-9]", re.IGNORECASE)
+
+# orjson decodes integers beyond 64 bits as floats. Documents with a run of 19
+# or more digits, the shortest integers outside int64 (e.g.
+# -9223372036854775809), are decoded with the standard library instead. The
+# runs are found by mapping every digit to "0" and everything else to " "
+_DIGITS = bytes(ord("0") if chr(code).isdigit() else ord(" ") for code in range(256))
+_LONG_DIGIT_RUN = b"0" * 19
+
+
+def _has_non_finite(value: Any) -> bool:
+    """Checks if a value holds NaN or an infinity, which orjson writes as null
+    where the standard library writes NaN and Infinity"""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif hasattr(item, "tolist"):
+            stack.append(item.tolist())
+    return False
+
+
+def _default(value: Any) -> Any:
+    """Converts values the encoders do not know (numpy scalars and arrays)"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(
+        value, separators=(",", ":"), ensure_ascii=False, default=_default
+    ).encode("utf-8")
+
+
+class _Backend(NamedTuple):
+    name: str
+    loads: Callable[[Union[str, bytes]], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _load_backend(name: str) -> _Backend:
+    """Imports the library of the backend
+
+    Raises:
+        ImportError: if the library is not installed
+        ValueError: if the backend name is unknown
+    """
+    # pylint: disable=import-outside-toplevel
+    if name == ORJSON:
+        import orjson
+
+        def orjson_loads(data: Union[str, bytes]) -> Any:
+            raw = data.encode("utf-8") if isinstance(data, str) else data
+            if raw.translate(_DIGITS).find(_LONG_DIGIT_RUN) != -1:
+                return json.loads(data)
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                # NaN and Infinity, as written by dumps() for non-finite floats
+                return json.loads(data)
+
+        return _Backend(
+            ORJSON, orjson_loads, lambda value: orjson.dumps(value, default=_default)
+        )
+    if name == UJSON:
+        import ujson
+
+        return _Backend(
+            UJSON,
+            ujson.loads,
+            lambda value: ujson.dumps(
+                value,
+                ensure_ascii=False,
+                escape_forward_slashes=False,
+                default=_default,
+            ).encode("utf-8"),
+        )
+    if name == STDLIB:
+        return _Backend(STDLIB, json.loads, _stdlib_dumps)
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+
+def available_backends() -> List[str]:
+    """Returns the backends that can be used in this environment
+
+    Returns:
+        List[str]: backend names, fastest first
+    """
+    ret = []
+    for name in PREFERENCE:
+        try:
+            _load_backend(name)
+        except ImportError:
+            continue
+        ret.append(name)
+    return ret
+
+
+def _select_backend() -> _Backend:
+    requested = os.environ.get("PARCHMINT_JSON_BACKEND")
+    if requested:
+        return _load_backend(requested)
+    return _load_backend(available_backends()[0])
+
+
+_backend: _Backend = _select_backend()
+
+
+def get_backend() -> str:
+    """Returns the name of the backend in use
+
+    Returns:
+        str: backend name
+    """
+    return _backend.name
+
+
+def set_backend(name: str) -> None:
+    """Switches to another backend
+
+    Args:
+        name (str): "orjson", "ujson" or "json"
+
+    Raises:
+        ImportError: if the library of the backend is not installed
+    """
+    global _backend  # pylint: disable=global-statement
+    _backend = _load_backend(name)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decodes a JSON document
+
+    Args:
+        data (Union[str, bytes]): JSON text, bytes are decoded as UTF-8
+
+    Returns:
+        Any: decoded value
+    """
+    return _backend.loads(data)
+
+
+def load_file(path: Union[str, "os.PathLike[str]"]) -> Any:
+    """Reads and decodes a JSON file
+
+    Args:
+        path (Union[str, os.PathLike[str]]): path of the file
+
+    Returns:
+        Any: decoded value
+    """
+    with open(path, "rb") as data_file:
+        return loads(data_file.read())
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """Encodes a value as canonical JSON
+
+    Args:
+        value (Any): value to encode
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if _backend.name == STDLIB:
+        return _stdlib_dumps(value)
+    try:
+        ret = _backend.dumps(value)
+    except (TypeError, ValueError, OverflowError):
+        # e.g. non string keys or integers beyond 64 bits
+        return _stdlib_dumps(value)
+    if _EXPONENT_PATTERN.search(ret) is not None:
+        return _stdlib_dumps(value)
+    # The values are only walked when there is a null they could have become
+    if _backend.name == ORJSON and b"null" in ret and _has_non_finite(value):
+        return _stdlib_dumps(value)
+    return ret
+
+
+def dumps(value: Any) -> str:
+    """Encodes a value as canonical JSON
+
+    Args:
+        value (Any): value to encode
+
+    Returns:
+        str: JSON text
+    """
+    return dumps_bytes(value).decode("utf-8")
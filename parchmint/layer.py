@@ -1,5 +1,6 @@
 from typing import Dict, Optional
 
+from parchmint import hashing
 from parchmint.params import Params
 
 
@@ -9,6 +10,8 @@ class Layer:
     Used to define a layer object that can be used in the device model.
     """
 
+    __slots__ = ("_id", "name", "layertype", "group", "params")
+
     def __init__(
         self,
         layer_id: Optional[str] = None,
@@ -25,7 +28,9 @@ class Layer:
         """
         self._id: str = "" if layer_id is None else layer_id
         self.name: str = "" if name is None else name
-        self.layertype: str = "" if layer_type is None else layer_type
+        self.layertype: str = (
+            "" if layer_type is None else hashing.intern_string(layer_type)
+        )
         self.group: str = "" if group is None else group
         self.params: Params = Params() if params is None else params
 
@@ -79,8 +84,8 @@ class Layer:
         """
         self.name = json_data["name"]
         self.ID = json_data["id"]
-        self.layertype = json_data["type"]
-        self.group = json_data["group"]
+        self.layertype = hashing.intern_string(json_data["type"])
+        self.group = hashing.intern_string(json_data["group"])
         self.params = Params(json_data["params"])
 
     def to_parchmint_v1(self):
@@ -98,13 +103,22 @@ class Layer:
         }
 
     def __str__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def __hash__(self) -> int:
-        return hash(repr(self))
+        return hash(self.ID)
+
+    def content_digest(self) -> str:
+        """Returns a digest of the full contents of the layer (unlike the hash,
+        which only covers the ID)
+
+        Returns:
+            str: hex digest
+        """
+        return hashing.content_digest(self.to_parchmint_v1())
 
     def __eq__(self, object_to_compare: object) -> bool:
         if isinstance(object_to_compare, Layer):
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import networkx as nx
+
+from parchmint import jsonbackend
+from parchmint.component import Component
+from parchmint.connection import Connection
+from parchmint.device import Device
+from parchmint.feature import Feature
+from parchmint.layer import Layer
+from parchmint.params import Params
+
+
+class _LazyRecords:
+    """Raw JSON records of one kind of entity, turned into objects one at a
+    time as they are asked for"""
+
+    def __init__(self, records: List[Dict], build: Callable[[Dict], Any]) -> None:
+        self._records = records
+        self._build = build
+        self._built: Dict[int, Any] = {}
+        self._positions: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def ids(self) -> List[str]:
+        """Returns the IDs of the records, in file order"""
+        return [record["id"] for record in self._records]
+
+    @property
+    def built_count(self) -> int:
+        """Returns the number of records turned into objects so far"""
+        return len(self._built)
+
+    def position(self, entity_id: str) -> Optional[int]:
+        """Returns the position of the first record with the ID, None if there
+        is none"""
+        if self._positions is None:
+            positions: Dict[str, int] = {}
+            for index, record in enumerate(self._records):
+                positions.setdefault(record["id"], index)
+            self._positions = positions
+        return self._positions.get(entity_id)
+
+    def get(self, position: int) -> Any:
+        """Returns the object of the record at the position, building it on
+        first access"""
+        ret = self._built.get(position)
+        if ret is None:
+            ret = self._build(self._records[position])
+            self._built[position] = ret
+        return ret
+
+    def all(self) -> List[Any]:
+        """Returns the objects of all the records, in file order"""
+        return [self.get(position) for position in range(len(self._records))]
+
+
+class LazyDevice:
+    """Read-mostly view of a ParchMint document that keeps the raw JSON records
+    and builds the Component, Connection and Feature objects only when they are
+    first asked for.
+
+    Counts, ID lookups, valves and the netlist graph are answered from the raw
+    records, so inspecting a large file costs little more than decoding it.
+    Objects that were built are kept and returned again on later accesses, and
+    to_device() reuses them when it builds the full Device. The view is not
+    meant to be edited, build the Device for that.
+    """
+
+    def __init__(self, json_data: Dict) -> None:
+        """Creates a lazy view over a decoded ParchMint document
+
+        Args:
+            json_data (Dict): decoded ParchMint document (version 1.0, 1.1 or 1.2)
+
+        Raises:
+            ValueError: if the version of the document is not supported
+        """
+        version = json_data["version"]
+        if version not in ("1.0", "1.1", "1.2"):
+            raise ValueError(f"Unsupported ParchMint version: {version}")
+        self.version: str = version
+        self.name: str = json_data["name"]
+        self._json_data = json_data
+
+        self.layers: List[Layer] = [
+            Layer(json_data=layer) for layer in json_data.get("layers", [])
+        ]
+        self._layer_lookup: Dict[str, Layer] = {}
+        for layer in self.layers:
+            self._layer_lookup.setdefault(layer.ID, layer)
+
+        parse_connection = (
+            Connection.from_parchmint_v1
+            if version == "1.0"
+            else Connection.from_parchmint_v1_2
+        )
+        self._features = _LazyRecords(
+            json_data.get("features", []),
+            lambda record: Feature.from_parchmint_v1_2(record, self),  # type: ignore
+        )
+        self._components = _LazyRecords(
+            json_data.get("components", []),
+            lambda record: Component.from_parchmint_v1_2(record, self),  # type: ignore
+        )
+        self._connections = _LazyRecords(
+            json_data.get("connections", []),
+            lambda record: parse_connection(record, self),  # type: ignore
+        )
+        self._params: Optional[Params] = None
+        self._graph: Optional[nx.MultiDiGraph] = None
+
+    @staticmethod
+    def from_json(json_str: Union[str, bytes]) -> LazyDevice:
+        """Creates a lazy view over a json string
+
+        Args:
+            json_str (Union[str, bytes]): json string
+
+        Returns:
+            LazyDevice: lazy view of the document
+        """
+        return LazyDevice(jsonbackend.loads(json_str))
+
+    @staticmethod
+    def from_file(file_path) -> LazyDevice:
+        """Creates a lazy view over a ParchMint file
+
+        Args:
+            file_path (str | Path): path of the ParchMint JSON file
+
+        Returns:
+            LazyDevice: lazy view of the file
+        """
+        return LazyDevice(jsonbackend.load_file(file_path))
+
+    @property
+    def params(self) -> Params:
+        """Returns the params of the device
+
+        Returns:
+            Params: device params
+        """
+        if self._params is None:
+            self._params = Params(self._json_data.get("params"))
+        return self._params
+
+    @property
+    def component_count(self) -> int:
+        """Returns the number of components, without building them"""
+        return len(self._components)
+
+    @property
+    def connection_count(self) -> int:
+        """Returns the number of connections, without building them"""
+        return len(self._connections)
+
+    @property
+    def feature_count(self) -> int:
+        """Returns the number of features, without building them"""
+        return len(self._features)
+
+    @property
+    def component_ids(self) -> List[str]:
+        """Returns the IDs of the components, in file order"""
+        return self._components.ids
+
+    @property
+    def connection_ids(self) -> List[str]:
+        """Returns the IDs of the connections, in file order"""
+        return self._connections.ids
+
+    @property
+    def valve_ids(self) -> List[str]:
+        """Returns the IDs of the valve components, without building them"""
+        if self.version == "1.0":
+            return list(self._json_data.get("valveMap", {}))
+        return [valve["componentid"] for valve in self._json_data.get("valves", [])]
+
+    @property
+    def materialized_count(self) -> int:
+        """Returns the number of components, connections and features built so
+        far"""
+        return (
+            self._components.built_count
+            + self._connections.built_count
+            + self._features.built_count
+        )
+
+    def component_exists(self, component_id: str) -> bool:
+        """Checks if a component exists, without building it
+
+        Args:
+            component_id (str): id of the component
+
+        Returns:
+            bool: true if the component exists
+        """
+        return self._components.position(component_id) is not None
+
+    def connection_exists(self, connection_id: str) -> bool:
+        """Checks if a connection exists, without building it
+
+        Args:
+            connection_id (str): id of the connection
+
+        Returns:
+            bool: true if the connection exists
+        """
+        return self._connections.position(connection_id) is not None
+
+    def get_layer(self, layer_id: str) -> Layer:
+        """Returns the layer with the corresponding id
+
+        Args:
+            layer_id (str): id of the layer
+
+        Raises:
+            KeyError: if a layer with the corresponding id is not present
+
+        Returns:
+            Layer: layer with the corresponding id
+        """
+        layer = self._layer_lookup.get(layer_id)
+        if layer is None:
+            raise KeyError(f"Could not find the layer {layer_id}")
+        return layer
+
+    def get_feature(self, feature_id: str) -> Feature:
+        """Returns the feature with the corresponding ID, building it on first
+        access
+
+        Args:
+            feature_id (str): id of the feature
+
+        Raises:
+            KeyError: if the feature is not found
+
+        Returns:
+            Feature: feature with the corresponding id
+        """
+        position = self._features.position(feature_id)
+        if position is None:
+            raise KeyError(f"Feature not found: {feature_id}")
+        return self._features.get(position)
+
+    def get_component(self, component_id: str) -> Component:
+        """Returns the component with the corresponding ID, building it on first
+        access
+
+        Args:
+            component_id (str): id of the component
+
+        Raises:
+            KeyError: if the component is not found
+
+        Returns:
+            Component: component with the corresponding id
+        """
+        position = self._components.position(component_id)
+        if position is None:
+            raise KeyError(f"Could not find component with ID: {component_id}")
+        return self._components.get(position)
+
+    def get_connection(self, connection_id: str) -> Connection:
+        """Returns the connection with the corresponding ID, building it on
+        first access
+
+        Args:
+            connection_id (str): id of the connection
+
+        Raises:
+            KeyError: if the connection is not found
+
+        Returns:
+            Connection: connection with the corresponding id
+        """
+        position = self._connections.position(connection_id)
+        if position is None:
+            raise KeyError(f"Could not find connection with ID: {connection_id}")
+        return self._connections.get(position)
+
+    @property
+    def components(self) -> List[Component]:
+        """Returns all the components, building the ones not built yet
+
+        Returns:
+            List[Component]: components in file order
+        """
+        return self._components.all()
+
+    @property
+    def connections(self) -> List[Connection]:
+        """Returns all the connections, building the ones not built yet
+
+        Returns:
+            List[Connection]: connections in file order
+        """
+        return self._connections.all()
+
+    @property
+    def features(self) -> List[Feature]:
+        """Returns all the features, building the ones not built yet
+
+        Returns:
+            List[Feature]: features in file order
+        """
+        return self._features.all()
+
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        """Returns the netlist graph built from the raw records: a node per
+        component ID and an edge from the source to each sink of every
+        connection. Unlike Device.graph, the edges only carry the
+        connection_id, source_port and sink_port labels, not the objects.
+
+        Raises:
+            ValueError: if a connection has no source
+            KeyError: if a connection end point is not a component of the device
+
+        Returns:
+            nx.MultiDiGraph: netlist graph
+        """
+        if self._graph is None:
+            graph = nx.MultiDiGraph()
+            graph.add_nodes_from(self.component_ids)
+            for record in self._json_data.get("connections", []):
+                # Same checks as Device.add_connection()
+                source = record.get("source")
+                if source is None:
+                    raise ValueError("Connection source is not defined")
+                if source["component"] not in graph:
+                    raise KeyError(
+                        f"Source component {source['component']} not found in the device while adding connection: {record['id']}"
+                    )
+                for sink in record.get("sinks") or []:
+                    if sink["component"] not in graph:
+                        raise KeyError(
+                            f"Sink component {sink['component']} not found in the device while adding connection: {record['id']}"
+                        )
+                    graph.add_edge(
+                        source["component"],
+                        sink["component"],
+                        connection_id=record["id"],
+                        source_port=source["port"],
+                        sink_port=sink["port"],
+                    )
+            self._graph = graph
+        return self._graph
+
+    def to_device(self) -> Device:
+        """Builds the full device, reusing the objects already built
+
+        Returns:
+            Device: device with every component, connection, feature and valve
+        """
+        # pylint: disable=protected-access
+        device_ref = Device(self.name)
+        for layer in self.layers:
+            device_ref.add_layer(layer)
+        for feature in self.features:
+            device_ref.add_feature(feature)
+        device_ref.add_components(self.components)
+        device_ref.add_connections(self.connections)
+
+        json_data = self._json_data
+        if self.version == "1.0":
+            if "params" in json_data:
+                Device._load_params_v1(device_ref, json_data["params"])
+            if "valveMap" in json_data:
+                Device._load_valve_map_v1(
+                    device_ref, json_data["valveMap"], json_data["valveTypeMap"]
+                )
+        else:
+            if "params" in json_data:
+                Device._load_params_v1_2(device_ref, json_data["params"])
+            for valve_object in json_data.get("valves", []):
+                Device._load_valve_v1_2(device_ref, valve_object)
+        return device_ref
@@ -1,19 +1,54 @@
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+# Read-only view used by all the params that have no data yet
+_EMPTY: Mapping = MappingProxyType({})
+
+
 class Params:
     """
     Describes the Params object that is used to store the parameters of the component/connection/features/layers
     """
 
+    __slots__ = ("_data",)
+
     def __init__(self, json_data=None):
         """Creates an instance of the params
 
         Args:
             json (dict, optional): json dict form json.loads(). Defaults to None.
         """
-        self.data = {}
+        # The dict is only allocated once a param is set
+        self._data: Optional[Dict] = None
 
         if json_data:
             self.parse_from_json(json_data)
 
+    @property
+    def data(self) -> Dict:
+        """Returns the dict storing the params
+
+        Returns:
+            Dict: param names and values
+        """
+        if self._data is None:
+            self._data = {}
+        return self._data
+
+    @data.setter
+    def data(self, value: Dict) -> None:
+        """Replaces the dict storing the params
+
+        Args:
+            value (Dict): param names and values
+        """
+        self._data = value
+
+    @property
+    def _items(self) -> Mapping:
+        # Read access that does not allocate the dict
+        return _EMPTY if self._data is None else self._data
+
     def __ne__(self, other) -> bool:
         """operator overload to compare two params.
         ex. P1 != P2
@@ -24,17 +59,19 @@ class Params:
         Returns:
             bool: Return true if NOT equal. Otherwise false
         """
-        len1 = len(self.data)
-        len2 = len(other.data)
+        data = self._items
+        other_data = other._items  # pylint: disable=protected-access
+        len1 = len(data)
+        len2 = len(other_data)
 
         if len1 != len2:
             return True
         else:
-            for key, value in self.data.items():
-                if key not in other.data:
+            for key, value in data.items():
+                if key not in other_data:
                     return True
                 else:
-                    if value != other.data[key]:
+                    if value != other_data[key]:
                         return True
 
         return False
@@ -60,8 +97,9 @@ class Params:
         Returns:
             [type]: [description]
         """
-        if key in self.data:
-            return self.data[key]
+        data = self._items
+        if key in data:
+            return data[key]
         else:
             raise KeyError(f"{key} not found in params")
 
@@ -83,7 +121,7 @@ class Params:
         Returns:
             bool: true if key is present in the params
         """
-        return key in self.data
+        return key in self._items
 
     def parse_from_json(self, json):
         """Parses from the json dict
@@ -91,14 +129,13 @@ class Params:
         Args:
             json (dict): json dict after json.loads()
         """
-        for key, value in json.items():
-            self.data[key] = value
+        self.data.update(json)
 
     def __str__(self):
-        return str(self.__dict__)
+        return str({"data": dict(self._items)})
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str({"data": dict(self._items)})
 
     def to_parchmint_v1(self) -> dict:
         """Returns the json dict
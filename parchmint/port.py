@@ -1,9 +1,13 @@
 from typing import Dict, Optional
 
+from parchmint import hashing
+
 
 class Port:
     """Describes the port on a component"""
 
+    __slots__ = ("_xpos", "_ypos", "label", "layer")
+
     def __init__(
         self,
         label: Optional[str] = None,
@@ -20,8 +24,8 @@ class Port:
         """
         self._xpos: float = x
         self._ypos: float = y
-        self.label: str = label if label else ""
-        self.layer: str = layer if layer else ""
+        self.label: str = hashing.intern_string(label) if label else ""
+        self.layer: str = hashing.intern_string(layer) if layer else ""
 
         if json_data:
             self.parse_from_json(json_data)
@@ -62,14 +66,14 @@ class Port:
         """
         self._xpos = json["x"]
         self._ypos = json["y"]
-        self.label = json["label"]
-        self.layer = json["layer"]
+        self.label = hashing.intern_string(json["label"])
+        self.layer = hashing.intern_string(json["layer"])
 
     def __str__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def to_parchmint_v1(self):
         """Returns the json dict
@@ -91,4 +95,13 @@ class Port:
             return False
 
     def __hash__(self) -> int:
-        return hash(repr(self))
+        return hash(self.label)
+
+    def content_digest(self) -> str:
+        """Returns a digest of the full contents of the port (unlike the hash,
+        which only covers the label)
+
+        Returns:
+            str: hex digest
+        """
+        return hashing.content_digest(self.to_parchmint_v1())
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Set to profile the whole process and print the report to stderr on exit,
+# "memory" also records the peak memory of each phase
+ENVIRONMENT_VARIABLE = "PARCHMINT_PROFILE"
+
+
+class PhaseRecord(NamedTuple):
+    """Measurements of one run of an instrumented phase"""
+
+    name: str
+    """Name of the phase, e.g. from_parchmint_v1_2.components"""
+
+    seconds: float
+    """Wall time spent in the phase"""
+
+    count: Optional[int]
+    """Number of objects handled by the phase, None if it does not count any"""
+
+    peak_bytes: Optional[int]
+    """Peak memory allocated during the phase above the memory allocated when
+    it started, None if memory is not traced. When tracemalloc was already
+    tracing before profiling started, its peak is left alone and this is an
+    upper bound that can include peaks from before the phase."""
+
+    depth: int
+    """Number of phases the phase is nested in"""
+
+
+Hook = Callable[[PhaseRecord], None]
+
+
+class PhaseSummary(NamedTuple):
+    """Totals of all the runs of a phase"""
+
+    name: str
+    calls: int
+    seconds: float
+    count: Optional[int]
+    peak_bytes: Optional[int]
+
+
+class ProfileReport:
+    """Phases recorded while profiling, in the order they finished"""
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.records: List[PhaseRecord] = []
+
+    def summary(self) -> List[PhaseSummary]:
+        """Returns the totals of each phase, in the order the phases first
+        finished. The peak memory is the largest of the runs.
+
+        Returns:
+            List[PhaseSummary]: one summary per phase name
+        """
+        ret: Dict[str, PhaseSummary] = {}
+        for record in list(self.records):
+            previous = ret.get(record.name)
+            if previous is None:
+                ret[record.name] = PhaseSummary(
+                    record.name, 1, record.seconds, record.count, record.peak_bytes
+                )
+                continue
+            count = previous.count
+            if record.count is not None:
+                count = (count or 0) + record.count
+            peak_bytes = previous.peak_bytes
+            if record.peak_bytes is not None:
+                peak_bytes = max(peak_bytes or 0, record.peak_bytes)
+            ret[record.name] = PhaseSummary(
+                record.name,
+                previous.calls + 1,
+                previous.seconds + record.seconds,
+                count,
+                peak_bytes,
+            )
+        return list(ret.values())
+
+    def to_dict(self) -> Dict:
+        """Returns the report as a dictionary that can be used in json.dumps()
+
+        Returns:
+            Dict: the records and the per phase totals
+        """
+        return {
+            "records": [record._asdict() for record in self.records],
+            "summary": [phase._asdict() for phase in self.summary()],
+        }
+
+    def write(self, output: TextIO) -> None:
+        """Writes the per phase totals as a text table
+
+        Args:
+            output (TextIO): text stream to write to
+        """
+        output.write(
+            f"{'phase':<40} {'calls':>6} {'seconds':>10} {'count':>10} {'peak MB':>10}\n"
+        )
+        for phase in self.summary():
+            count = "" if phase.count is None else phase.count
+            peak = "" if phase.peak_bytes is None else f"{phase.peak_bytes / 1e6:.2f}"
+            output.write(
+                f"{phase.name:<40} {phase.calls:>6} {phase.seconds:>10.4f} {count:>10} {peak:>10}\n"
+            )
+
+
+class _Recording(NamedTuple):
+    """Report being recorded with the hooks given to profile()"""
+
+    report: ProfileReport
+    thread: Optional[int]
+    """Identifier of the thread whose phases are recorded, None for all the
+    threads"""
+    hooks: List[Hook]
+    owns_tracing: bool
+    """True if tracemalloc was started for the report"""
+
+    def records_thread(self, thread: int) -> bool:
+        return self.thread is None or self.thread == thread
+
+
+# Reports being recorded, a phase is added to the ones of its thread
+_recordings: List[_Recording] = []
+_hooks: List[Hook] = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class _NullPhase:
+    """Phase used when nothing is being profiled"""
+
+    def __enter__(self) -> _NullPhase:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Phase being measured"""
+
+    def __init__(self, name: str, count: Optional[int]) -> None:
+        self.name = name
+        self.count = count
+        self.trace_memory = any(
+            recording.report.trace_memory
+            for recording in _active_recordings(threading.get_ident())
+        )
+        self.start_time = 0.0
+        self.start_memory = 0
+        self.peak_bytes = 0
+
+    def __enter__(self) -> _Phase:
+        stack = _stack()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current = _fold_peak(stack)
+            self.start_memory = current
+        stack.append(self)
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        seconds = time.perf_counter() - self.start_time
+        stack = _stack()
+        peak_bytes = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            _fold_peak(stack)
+            peak_bytes = self.peak_bytes
+        stack.pop()
+        record = PhaseRecord(self.name, seconds, self.count, peak_bytes, len(stack))
+        recordings = _active_recordings(threading.get_ident())
+        with _lock:
+            hooks = list(_hooks)
+        for recording in recordings:
+            recording.report.records.append(record)
+            hooks.extend(recording.hooks)
+        for hook in hooks:
+            try:
+                hook(record)
+            except Exception:  # pylint: disable=broad-except
+                # A failing hook must not break the work being profiled
+                logger.exception("Profiling hook %r failed on %s", hook, record.name)
+
+
+def _active_recordings(thread: int) -> List[_Recording]:
+    with _lock:
+        return [
+            recording for recording in _recordings if recording.records_thread(thread)
+        ]
+
+
+def _stack() -> List[_Phase]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _fold_peak(stack: List[_Phase]) -> int:
+    """Adds the peak since the last reset to the open phases and resets it, so
+    that nested phases each get their own peak. The peak is only reset when
+    tracemalloc was started by a profile, resetting it would clobber the peak
+    of code that traces memory itself."""
+    current, peak = tracemalloc.get_traced_memory()
+    for phase in stack:
+        if phase.trace_memory:
+            phase.peak_bytes = max(phase.peak_bytes, peak - phase.start_memory)
+    with _lock:
+        owns_tracing = any(recording.owns_tracing for recording in _recordings)
+    if owns_tracing and hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    return current
+
+
+def is_active() -> bool:
+    """Checks if anything is being profiled
+
+    Returns:
+        bool: true if phases are being recorded
+    """
+    return bool(_recordings)
+
+
+def phase(name: str, count: Optional[int] = None):
+    """Returns a context manager that measures a phase of the work. It does
+    nothing unless a profile is being recorded.
+
+    Args:
+        name (str): name of the phase
+        count (Optional[int], optional): number of objects handled by the phase. Defaults to None.
+
+    Returns:
+        context manager measuring the phase
+    """
+    if not _recordings:
+        return _NULL_PHASE
+    return _Phase(name, count)
+
+
+def add_hook(hook: Hook) -> None:
+    """Adds a function called with the record of every phase that finishes
+    while profiling, in any thread, e.g. to forward the measurements to a
+    metrics system. Exceptions raised by the hook are logged and ignored.
+
+    Args:
+        hook (Hook): function called with each PhaseRecord
+    """
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Removes a hook added with add_hook()
+
+    Args:
+        hook (Hook): hook to remove
+
+    Raises:
+        ValueError: if the hook was not added
+    """
+    with _lock:
+        _hooks.remove(hook)
+
+
+@contextmanager
+def profile(
+    trace_memory: bool = False, hooks: Optional[List[Hook]] = None
+) -> Iterator[ProfileReport]:
+    """Records the instrumented phases run inside the block. Only the phases
+    run by the thread that entered the block are recorded, work handed to
+    other threads is not.
+
+    Args:
+        trace_memory (bool, optional): record the peak memory of each phase with tracemalloc, which slows the work down. Defaults to False.
+        hooks (Optional[List[Hook]], optional): functions called with the record of each phase of the block, exceptions they raise are logged and ignored. Defaults to None.
+
+    Yields:
+        ProfileReport: report filled in as the phases finish
+    """
+    report = ProfileReport(trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    recording = _Recording(
+        report, threading.get_ident(), list(hooks or []), started_tracing
+    )
+    with _lock:
+        _recordings.append(recording)
+    try:
+        yield report
+    finally:
+        with _lock:
+            _recordings.remove(recording)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def _profile_process(trace_memory: bool) -> ProfileReport:
+    """Records the phases of the whole process and writes the report to
+    stderr on exit"""
+    report = ProfileReport(trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+    _recordings.append(_Recording(report, None, [], trace_memory))
+    atexit.register(report.write, sys.stderr)
+    return report
+
+
+process_report: Optional[ProfileReport] = None
+"""Report of the whole process when PARCHMINT_PROFILE is set"""
+
+if os.environ.get(ENVIRONMENT_VARIABLE, "").lower() not in ("", "0", "false"):
+    process_report = _profile_process(
+        os.environ[ENVIRONMENT_VARIABLE].lower() == "memory"
+    )
@@ -1,11 +1,65 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Tuple
 
 from networkx.algorithms.isomorphism import DiGraphMatcher
 
+from parchmint import hashing
+
 if TYPE_CHECKING:
     from parchmint import Device
+    from parchmint.component import Component
+
+# Kinds of node mismatches recorded while matching
+PARAMS_MISMATCH = "params"
+LAYERS_MISMATCH = "layers"
+PORTS_MISMATCH = "ports"
+IN_EDGES_MISMATCH = "in_edges"
+OUT_EDGES_MISMATCH = "out_edges"
+
+
+class _NodeSignature(NamedTuple):
+    """Attributes of a netlist node that semantic_feasibility compares"""
+
+    entity: str
+    layers: Tuple[str, ...]
+    ports: Tuple[Any, ...]
+    params: Any
+    in_ports: Tuple[Tuple[Any, Any], ...]
+    out_ports: Tuple[Tuple[Any, Any], ...]
+
+
+def _edge_ports(edges) -> Tuple[Tuple[Any, Any], ...]:
+    """Sorted (source port, sink port) labels of the edges"""
+    return tuple(
+        sorted(
+            (
+                (
+                    hashing.freeze(data["source_port"].port),
+                    hashing.freeze(data["sink_port"].port),
+                )
+                for _, _, data in edges
+            ),
+            key=repr,
+        )
+    )
+
+
+def _node_signatures(device: Device) -> Dict[str, _NodeSignature]:
+    """Computes the signature of every node in the netlist of the device"""
+    graph = device.graph
+    ret = {}
+    for node in graph.nodes:
+        component = device.get_component(node)
+        ret[node] = _NodeSignature(
+            entity=component.entity,
+            layers=tuple(layer.ID for layer in component.layers),
+            ports=tuple(hashing.freeze(port.label) for port in component.ports),
+            params=hashing.freeze(component.params.data),
+            in_ports=_edge_ports(graph.in_edges(node, data=True)),
+            out_ports=_edge_ports(graph.out_edges(node, data=True)),
+        )
+    return ret
 
 
 class SimilarityMatcher(DiGraphMatcher):
@@ -26,23 +80,27 @@ class SimilarityMatcher(DiGraphMatcher):
         self._graph2_device = device2
         self._param_flag = compare_params
         self._connection_flag = check_connection_target
-        self._graph1_in_edges = device1.graph.in_edges
-        self._graph1_out_edges = device1.graph.out_edges
-        self._graph2_in_edges = device2.graph.in_edges
-        self._graph2_out_edges = device2.graph.out_edges
-        self._graph1_in_edges_diff_list = []
-        self._graph1_out_edges_diff_list = []
-        self._graph2_in_edges_diff_list = []
-        self._graph2_out_edges_diff_list = []
-        self._graph1_param_diff_list = []
-        self._graph2_param_diff_list = []
-        self._graph1_layer_diff_list = []
-        self._graph2_layer_diff_list = []
-        self._graph1_port_diff_list = []
-        self._graph2_port_diff_list = []
+
+        # Node attributes are looked up once here so that each candidate pair
+        # is checked in constant time during the VF2 search
+        self._graph1_signatures = _node_signatures(device1)
+        self._graph2_signatures = _node_signatures(device2)
+
+        # Mismatches found while matching as (kind, G1 node, G2 node), the dict
+        # keeps the order they were found in and drops repeats
+        self._mismatches: Dict[Tuple[str, str, str], None] = {}
 
         super().__init__(device1.graph, device2.graph)
 
+    @property
+    def mismatches(self) -> List[Tuple[str, str, str]]:
+        """Returns the node mismatches found while matching
+
+        Returns:
+            List[Tuple[str, str, str]]: (kind, G1 node, G2 node) of each mismatch
+        """
+        return list(self._mismatches)
+
     def semantic_feasibility(self, G1_node: str, G2_node: str) -> bool:
         """Overriding semantic_feasibility to compare the layers, params, ports, and connections
 
@@ -53,143 +111,140 @@ class SimilarityMatcher(DiGraphMatcher):
         Returns:
             bool: if they are semantically feasible, return true. else return false.
         """
-        feasible = True
-
-        graph1_component = self._graph1_device.get_component(G1_node)
-        graph2_component = self._graph2_device.get_component(G2_node)
+        signature1 = self._graph1_signatures[G1_node]
+        signature2 = self._graph2_signatures[G2_node]
 
         # Compare the components
-        feasible = graph1_component.entity == graph2_component.entity
+        feasible = signature1.entity == signature2.entity
 
         # compare connectivities
-        for item in self._graph1_in_edges:
-            conn_g1 = self._graph1_in_edges[item]
-            conn_g2 = self._graph2_in_edges[item]
-
-            g1_source = conn_g1["source_port"]
-            g2_source = conn_g2["source_port"]
-
-            g1_sink = conn_g1["sink_port"]
-            g2_sink = conn_g2["sink_port"]
-
-            if (g1_source.component != g2_source.component) or (
-                g1_source.port != g2_source.port
-            ):
-                print("source port wrong")
-                self._graph1_in_edges_diff_list.append(g1_source.component)
-                self._graph1_in_edges_diff_list.append(g1_source.port)
-                self._graph2_in_edges_diff_list.append(g2_source.component)
-                self._graph2_in_edges_diff_list.append(g2_source.port)
-                if self._connection_flag:
-                    feasible = False
-
-            if (g1_sink.component != g2_sink.component) or (
-                g1_sink.port != g2_sink.port
-            ):
-                print("sink port wrong")
-                self._graph1_out_edges_diff_list.append(g1_sink.component)
-                self._graph1_out_edges_diff_list.append(g1_sink.port)
-                self._graph2_out_edges_diff_list.append(g2_sink.component)
-                self._graph2_out_edges_diff_list.append(g2_sink.port)
-                if self._connection_flag:
-                    feasible = False
+        if signature1.in_ports != signature2.in_ports:
+            self._mismatches[(IN_EDGES_MISMATCH, G1_node, G2_node)] = None
+            if self._connection_flag:
+                feasible = False
+
+        if signature1.out_ports != signature2.out_ports:
+            self._mismatches[(OUT_EDGES_MISMATCH, G1_node, G2_node)] = None
+            if self._connection_flag:
+                feasible = False
 
         # compare layers
-        if graph1_component.layers != graph2_component.layers:
-            print("layer wrong")
-            self._graph1_layer_diff_list.append(graph1_component.layers)
-            self._graph2_layer_diff_list.append(graph2_component.layers)
+        if signature1.layers != signature2.layers:
+            self._mismatches[(LAYERS_MISMATCH, G1_node, G2_node)] = None
             feasible = False
 
         # compare params
-        if graph1_component.params != graph2_component.params:
-            print("params wrong")
-            self._graph1_param_diff_list.append(graph1_component.params)
-            self._graph2_param_diff_list.append(graph2_component.params)
-
+        if signature1.params != signature2.params:
+            self._mismatches[(PARAMS_MISMATCH, G1_node, G2_node)] = None
             if self._param_flag is True:
                 feasible = False
-            else:
-                feasible = True
 
         # compare ports
-        if graph1_component.ports != graph2_component.ports:
-            print("ports wrong")
-            self._graph1_port_diff_list.append(graph1_component.ports)
-            self._graph2_port_diff_list.append(graph2_component.ports)
+        if signature1.ports != signature2.ports:
+            self._mismatches[(PORTS_MISMATCH, G1_node, G2_node)] = None
             feasible = False
 
         return feasible
 
+    def _mismatched_components(self, kind: str) -> List[Tuple[Component, Component]]:
+        """Returns the component pairs of the recorded mismatches of one kind"""
+        return [
+            (
+                self._graph1_device.get_component(node1),
+                self._graph2_device.get_component(node2),
+            )
+            for mismatch_kind, node1, node2 in self._mismatches
+            if mismatch_kind == kind
+        ]
+
+    def _params_diff_lines(self) -> Iterator[str]:
+        yield "----Param differences----"
+        for component1, component2 in self._mismatched_components(PARAMS_MISMATCH):
+            yield f"G1: {component1.params}, G2: {component2.params}"
+        yield "----End----"
+
+    def _layers_diff_lines(self) -> Iterator[str]:
+        yield "----Layer differences----"
+        for component1, component2 in self._mismatched_components(LAYERS_MISMATCH):
+            yield f"G1: {component1.layers}, G2: {component2.layers}"
+        yield "----End----"
+
+    def _port_diff_lines(self) -> Iterator[str]:
+        yield "----Port differences----"
+        for component1, component2 in self._mismatched_components(PORTS_MISMATCH):
+            yield f"G1: {component1.ports}, G2: {component2.ports}"
+        yield "----End----"
+
+    def _in_edges_diff_lines(self) -> Iterator[str]:
+        yield "----In edges differences----"
+        for kind, node1, node2 in self._mismatches:
+            if kind != IN_EDGES_MISMATCH:
+                continue
+            for _, _, data in self.G1.in_edges(node1, data=True):
+                source = data["source_port"]
+                yield f"G1: {source.component} -port: {source.port}"
+            for _, _, data in self.G2.in_edges(node2, data=True):
+                source = data["source_port"]
+                yield f"G2: {source.component} -port: {source.port}"
+        yield "----End----"
+
+    def _out_edges_diff_lines(self) -> Iterator[str]:
+        yield "----Out edges differences----"
+        for kind, node1, node2 in self._mismatches:
+            if kind != OUT_EDGES_MISMATCH:
+                continue
+            for _, _, data in self.G1.out_edges(node1, data=True):
+                sink = data["sink_port"]
+                yield f"G1: {sink.component} -port: {sink.port}"
+            for _, _, data in self.G2.out_edges(node2, data=True):
+                sink = data["sink_port"]
+                yield f"G2: {sink.component} -port: {sink.port}"
+        yield "----End----"
+
+    def diff_lines(self) -> Iterator[str]:
+        """Returns the lines of all the differences found between G1 and G2,
+        the params, layers, ports, in edges and out edges in turn
+
+        Returns:
+            Iterator[str]: lines of the differences
+        """
+        yield from self._params_diff_lines()
+        yield from self._layers_diff_lines()
+        yield from self._port_diff_lines()
+        yield from self._in_edges_diff_lines()
+        yield from self._out_edges_diff_lines()
+
     def print_params_diff(self) -> None:
         """
         This method prints out the difference in the parameters between G1 and G2
         """
-        print("----Param differences----")
-
-        for i in range(len(self._graph1_param_diff_list)):
-            print(
-                f"G1: {self._graph1_param_diff_list[i]}, G2: {self._graph2_param_diff_list[i]}"
-            )
-
-        print("----End----")
+        for line in self._params_diff_lines():
+            print(line)
 
     def print_layers_diff(self) -> None:
         """
         This method prints out the difference in the layers between G1 and G2
         """
-        print("----Layer differences----")
-
-        for i in range(len(self._graph1_layer_diff_list)):
-            print(
-                f"G1: {self._graph1_layer_diff_list[i]}, G2: {self._graph2_layer_diff_list[i]}"
-            )
-
-        print("----End----")
+        for line in self._layers_diff_lines():
+            print(line)
 
     def print_port_diff(self) -> None:
         """
         This method prints out the difference in the ports between G1 and G2
         """
-        print("----Port differences----")
-
-        for i in range(len(self._graph1_port_diff_list)):
-            print(
-                f"G1: {self._graph1_port_diff_list[i]}, G2: {self._graph2_port_diff_list[i]}"
-            )
-
-        print("----End----")
+        for line in self._port_diff_lines():
+            print(line)
 
     def print_in_edges_diff(self) -> None:
         """
         This method prints out the difference in the in edges between G1 and G2
         """
-        print("----In edges differences----")
-
-        for i in range(0, len(self._graph1_in_edges_diff_list), 2):
-            print(
-                f"G1: {self._graph1_in_edges_diff_list[i]} -port: {self._graph1_in_edges_diff_list[i+1]}"
-            )
-
-            print(
-                f"G2: {self._graph2_in_edges_diff_list[i]} -port: {self._graph2_in_edges_diff_list[i+1]}"
-            )
-
-        print("----End----")
+        for line in self._in_edges_diff_lines():
+            print(line)
 
     def print_out_edges_diff(self) -> None:
         """
         This method prints out the difference in the out edges between G1 and G2
         """
-        print("----Out edges differences----")
-
-        for i in range(0, len(self._graph1_out_edges_diff_list), 2):
-            print(
-                f"G1: {self._graph1_out_edges_diff_list[i]} -port: {self._graph1_out_edges_diff_list[i+1]}"
-            )
-
-            print(
-                f"G2: {self._graph2_out_edges_diff_list[i]} -port: {self._graph2_out_edges_diff_list[i+1]}",
-            )
-
-        print("----End----")
+        for line in self._out_edges_diff_lines():
+            print(line)
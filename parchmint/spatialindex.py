@@ -0,0 +1,489 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from parchmint.component import Component
+    from parchmint.connection import Connection
+    from parchmint.device import Device
+
+Point = Tuple[float, float]
+BoundingBox = Tuple[float, float, float, float]
+
+COMPONENT = "component"
+SEGMENT = "segment"
+
+
+class SpatialItem(NamedTuple):
+    """A primitive stored in the spatial index, either the bounding box of a
+    component or a single straight segment of a connection path"""
+
+    kind: str
+    """COMPONENT or SEGMENT"""
+
+    ref: Union[Component, Connection]
+    """Component or connection the primitive belongs to"""
+
+    layers: Tuple[str, ...]
+    """IDs of the layers the primitive is on"""
+
+    bbox: BoundingBox
+    """Bounding box as (xmin, ymin, xmax, ymax)"""
+
+    segment: Optional[Tuple[Point, Point]] = None
+    """End points of the segment, None for components"""
+
+    @property
+    def ID(self) -> str:
+        """Returns the ID of the component or connection"""
+        return self.ref.ID
+
+
+def component_bbox(component: Component) -> BoundingBox:
+    """Returns the bounding box of a placed component, unset spans count as 0
+
+    Args:
+        component (Component): component
+
+    Returns:
+        BoundingBox: bounding box as (xmin, ymin, xmax, ymax)
+    """
+    xmin, ymin = component.xpos, component.ypos
+    return (
+        xmin,
+        ymin,
+        xmin + max(component.xspan, 0),
+        ymin + max(component.yspan, 0),
+    )
+
+
+def segment_bbox(start: Point, end: Point) -> BoundingBox:
+    """Returns the bounding box of a segment"""
+    return (
+        min(start[0], end[0]),
+        min(start[1], end[1]),
+        max(start[0], end[0]),
+        max(start[1], end[1]),
+    )
+
+
+def segment_intersects_box(start: Point, end: Point, bbox: BoundingBox) -> bool:
+    """Checks if a segment touches a box (Liang-Barsky clipping)
+
+    Args:
+        start (Point): start of the segment
+        end (Point): end of the segment
+        bbox (BoundingBox): box as (xmin, ymin, xmax, ymax)
+
+    Returns:
+        bool: true if any point of the segment lies in the box
+    """
+    t_enter, t_exit = 0.0, 1.0
+    delta_x = end[0] - start[0]
+    delta_y = end[1] - start[1]
+    for direction, distance in (
+        (-delta_x, start[0] - bbox[0]),
+        (delta_x, bbox[2] - start[0]),
+        (-delta_y, start[1] - bbox[1]),
+        (delta_y, bbox[3] - start[1]),
+    ):
+        if direction == 0:
+            if distance < 0:
+                return False
+            continue
+        ratio = distance / direction
+        if direction < 0:
+            t_enter = max(t_enter, ratio)
+        else:
+            t_exit = min(t_exit, ratio)
+        if t_enter > t_exit:
+            return False
+    return True
+
+
+def _point_box_distance(x: float, y: float, bbox: BoundingBox) -> float:
+    delta_x = max(bbox[0] - x, 0, x - bbox[2])
+    delta_y = max(bbox[1] - y, 0, y - bbox[3])
+    return math.hypot(delta_x, delta_y)
+
+
+def _point_segment_distance(x: float, y: float, start: Point, end: Point) -> float:
+    delta_x = end[0] - start[0]
+    delta_y = end[1] - start[1]
+    length_squared = delta_x * delta_x + delta_y * delta_y
+    if length_squared == 0:
+        return math.hypot(x - start[0], y - start[1])
+    ratio = ((x - start[0]) * delta_x + (y - start[1]) * delta_y) / length_squared
+    ratio = min(1.0, max(0.0, ratio))
+    return math.hypot(x - start[0] - ratio * delta_x, y - start[1] - ratio * delta_y)
+
+
+class SpatialIndex:
+    """Uniform grid over the component bounding boxes and the connection path
+    segments of a device.
+
+    Every primitive is registered in each grid cell its bounding box overlaps,
+    so window, point and nearest neighbour queries only look at the primitives
+    in the cells around the query instead of the whole device.
+    """
+
+    def __init__(
+        self, items: Iterable[SpatialItem], cell_size: Optional[float] = None
+    ) -> None:
+        """Creates a new index over the given primitives
+
+        Args:
+            items (Iterable[SpatialItem]): primitives to index
+            cell_size (Optional[float], optional): edge length of the grid cells, derived from the mean primitive size when None. Defaults to None.
+        """
+        self._items: List[SpatialItem] = list(items)
+        self._bboxes = np.array(
+            [item.bbox for item in self._items], dtype=np.float64
+        ).reshape(-1, 4)
+
+        if cell_size is None:
+            extents = np.maximum(
+                self._bboxes[:, 2] - self._bboxes[:, 0],
+                self._bboxes[:, 3] - self._bboxes[:, 1],
+            )
+            cell_size = float(extents.mean()) if len(extents) > 0 else 1.0
+        self._cell_size: float = max(cell_size, 1.0)
+
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._layers: Dict[str, List[int]] = {}
+        for index, item in enumerate(self._items):
+            xmin, ymin, xmax, ymax = self._cell_range(item.bbox)
+            for cell_x in range(xmin, xmax + 1):
+                for cell_y in range(ymin, ymax + 1):
+                    self._cells.setdefault((cell_x, cell_y), []).append(index)
+            for layer_id in item.layers:
+                self._layers.setdefault(layer_id, []).append(index)
+
+    @staticmethod
+    def from_device(device: Device, cell_size: Optional[float] = None) -> SpatialIndex:
+        """Builds the index over the placed components and the routed connections
+        of the device
+
+        Args:
+            device (Device): device to index
+            cell_size (Optional[float], optional): edge length of the grid cells. Defaults to None.
+
+        Returns:
+            SpatialIndex: spatial index of the device
+        """
+        items: List[SpatialItem] = []
+        for component in device.components:
+            if not component.params.exists("position"):
+                continue
+            items.append(
+                SpatialItem(
+                    COMPONENT,
+                    component,
+                    tuple(layer.ID for layer in component.layers),
+                    component_bbox(component),
+                )
+            )
+        for connection in device.connections:
+            layers = (connection.layer.ID,) if connection.layer is not None else ()
+            for path in connection.paths:
+                waypoints = path.waypoints_array.tolist()
+                for start, end in zip(waypoints, waypoints[1:]):
+                    start, end = tuple(start), tuple(end)
+                    items.append(
+                        SpatialItem(
+                            SEGMENT,
+                            connection,
+                            layers,
+                            segment_bbox(start, end),
+                            (start, end),
+                        )
+                    )
+        return SpatialIndex(items, cell_size)
+
+    @property
+    def cell_size(self) -> float:
+        """Returns the edge length of the grid cells"""
+        return self._cell_size
+
+    @property
+    def items(self) -> List[SpatialItem]:
+        """Returns all the primitives in the index"""
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _cell_range(self, bbox: BoundingBox) -> Tuple[int, int, int, int]:
+        size = self._cell_size
+        return (
+            math.floor(bbox[0] / size),
+            math.floor(bbox[1] / size),
+            math.floor(bbox[2] / size),
+            math.floor(bbox[3] / size),
+        )
+
+    def _candidates(self, bbox: BoundingBox) -> Set[int]:
+        """Returns the indices of the primitives registered in the cells the box
+        overlaps"""
+        xmin, ymin, xmax, ymax = self._cell_range(bbox)
+        candidates: Set[int] = set()
+        if (xmax - xmin + 1) * (ymax - ymin + 1) > len(self._cells):
+            # Large windows are cheaper to answer by walking the occupied cells
+            for (cell_x, cell_y), indices in self._cells.items():
+                if xmin <= cell_x <= xmax and ymin <= cell_y <= ymax:
+                    candidates.update(indices)
+            return candidates
+        for cell_x in range(xmin, xmax + 1):
+            for cell_y in range(ymin, ymax + 1):
+                indices = self._cells.get((cell_x, cell_y))
+                if indices is not None:
+                    candidates.update(indices)
+        return candidates
+
+    @staticmethod
+    def _matches(
+        item: SpatialItem, layer_id: Optional[str], kind: Optional[str]
+    ) -> bool:
+        if kind is not None and item.kind != kind:
+            return False
+        return layer_id is None or layer_id in item.layers
+
+    def query_window(
+        self,
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        layer_id: Optional[str] = None,
+        kind: Optional[str] = None,
+    ) -> List[SpatialItem]:
+        """Returns the primitives that touch the window
+
+        Args:
+            xmin (float): left edge of the window
+            ymin (float): top edge of the window
+            xmax (float): right edge of the window
+            ymax (float): bottom edge of the window
+            layer_id (Optional[str], optional): only return primitives on this layer. Defaults to None.
+            kind (Optional[str], optional): only return COMPONENT or SEGMENT primitives. Defaults to None.
+
+        Returns:
+            List[SpatialItem]: primitives in the window, in insertion order
+        """
+        window = (xmin, ymin, xmax, ymax)
+        candidates = np.fromiter(self._candidates(window), dtype=np.intp)
+        if len(candidates) == 0:
+            return []
+        candidates.sort()
+        bboxes = self._bboxes[candidates]
+        overlapping = candidates[
+            (bboxes[:, 0] <= xmax)
+            & (bboxes[:, 2] >= xmin)
+            & (bboxes[:, 1] <= ymax)
+            & (bboxes[:, 3] >= ymin)
+        ]
+        ret = []
+        for index in overlapping.tolist():
+            item = self._items[index]
+            if not self._matches(item, layer_id, kind):
+                continue
+            if item.segment is not None and not segment_intersects_box(
+                item.segment[0], item.segment[1], window
+            ):
+                continue
+            ret.append(item)
+        return ret
+
+    def candidate_pairs(
+        self,
+        margin: float = 0.0,
+        kind: Optional[str] = None,
+        margins: Optional[Sequence[float]] = None,
+    ) -> List[Tuple[int, int]]:
+        """Returns the pairs of primitives whose bounding boxes are within margin
+        of each other. Only the primitives in the grid cells around each one are
+        compared, not every pair.
+
+        Args:
+            margin (float, optional): maximum gap between the bounding boxes. Defaults to 0.0.
+            kind (Optional[str], optional): only pair up COMPONENT or SEGMENT primitives. Defaults to None.
+            margins (Optional[Sequence[float]], optional): margin of each primitive, in items order, used instead of margin. A pair is returned when the gap is within the larger of the two margins. Defaults to None.
+
+        Returns:
+            List[Tuple[int, int]]: (i, j) positions in items with i < j
+        """
+        pairs: List[Tuple[int, int]] = []
+        for index, item in enumerate(self._items):
+            if kind is not None and item.kind != kind:
+                continue
+            item_margin = margin if margins is None else margins[index]
+            xmin, ymin, xmax, ymax = item.bbox
+            window = (
+                xmin - item_margin,
+                ymin - item_margin,
+                xmax + item_margin,
+                ymax + item_margin,
+            )
+            # With per primitive margins a pair can be within the margin of
+            # either primitive, so both directions are looked at
+            candidates = np.fromiter(
+                (
+                    other
+                    for other in self._candidates(window)
+                    if other > index or (margins is not None and other != index)
+                ),
+                dtype=np.intp,
+            )
+            if len(candidates) == 0:
+                continue
+            candidates.sort()
+            bboxes = self._bboxes[candidates]
+            close = candidates[
+                (bboxes[:, 0] <= window[2])
+                & (bboxes[:, 2] >= window[0])
+                & (bboxes[:, 1] <= window[3])
+                & (bboxes[:, 3] >= window[1])
+            ]
+            for other in close.tolist():
+                if kind is None or self._items[other].kind == kind:
+                    pairs.append((min(index, other), max(index, other)))
+        if margins is not None:
+            return sorted(set(pairs))
+        return pairs
+
+    def query_point(
+        self,
+        x: float,
+        y: float,
+        layer_id: Optional[str] = None,
+        kind: Optional[str] = None,
+    ) -> List[SpatialItem]:
+        """Returns the primitives under the point (hit-testing)
+
+        Args:
+            x (float): x coordinate
+            y (float): y coordinate
+            layer_id (Optional[str], optional): only return primitives on this layer. Defaults to None.
+            kind (Optional[str], optional): only return COMPONENT or SEGMENT primitives. Defaults to None.
+
+        Returns:
+            List[SpatialItem]: primitives under the point
+        """
+        return self.query_window(x, y, x, y, layer_id, kind)
+
+    def query_layer(
+        self, layer_id: str, kind: Optional[str] = None
+    ) -> List[SpatialItem]:
+        """Returns all the primitives on a layer
+
+        Args:
+            layer_id (str): ID of the layer
+            kind (Optional[str], optional): only return COMPONENT or SEGMENT primitives. Defaults to None.
+
+        Returns:
+            List[SpatialItem]: primitives on the layer
+        """
+        return [
+            self._items[index]
+            for index in self._layers.get(layer_id, [])
+            if kind is None or self._items[index].kind == kind
+        ]
+
+    def distance(self, item: SpatialItem, x: float, y: float) -> float:
+        """Returns the distance from the point to the primitive
+
+        Args:
+            item (SpatialItem): primitive
+            x (float): x coordinate
+            y (float): y coordinate
+
+        Returns:
+            float: euclidean distance, 0 if the point lies on the primitive
+        """
+        if item.segment is not None:
+            return _point_segment_distance(x, y, item.segment[0], item.segment[1])
+        return _point_box_distance(x, y, item.bbox)
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        count: int = 1,
+        layer_id: Optional[str] = None,
+        kind: Optional[str] = None,
+    ) -> List[Tuple[float, SpatialItem]]:
+        """Returns the primitives closest to the point. The grid is searched in
+        rings of cells around the point until no closer primitive can be found.
+
+        Args:
+            x (float): x coordinate
+            y (float): y coordinate
+            count (int, optional): number of primitives to return. Defaults to 1.
+            layer_id (Optional[str], optional): only consider primitives on this layer. Defaults to None.
+            kind (Optional[str], optional): only consider COMPONENT or SEGMENT primitives. Defaults to None.
+
+        Returns:
+            List[Tuple[float, SpatialItem]]: (distance, primitive) pairs, closest first
+        """
+        if not self._cells or count <= 0:
+            return []
+        size = self._cell_size
+        center_x, center_y = math.floor(x / size), math.floor(y / size)
+        occupied = np.array(list(self._cells.keys()))
+        max_ring = int(
+            np.max(np.abs(occupied - (center_x, center_y)))
+        )  # beyond this ring there are no more cells to visit
+
+        seen: Set[int] = set()
+        best: List[Tuple[float, int]] = []  # max-heap of (-distance, index)
+        for ring in range(max_ring + 1):
+            # Every primitive outside the visited rings is at least this far away
+            if len(best) == count and -best[0][0] < (ring - 1) * size:
+                break
+            for cell in self._ring_cells(center_x, center_y, ring):
+                for index in self._cells.get(cell, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    item = self._items[index]
+                    if not self._matches(item, layer_id, kind):
+                        continue
+                    distance = self.distance(item, x, y)
+                    if len(best) < count:
+                        heapq.heappush(best, (-distance, index))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, index))
+
+        return [
+            (-negative_distance, self._items[index])
+            for negative_distance, index in sorted(best, reverse=True)
+        ]
+
+    @staticmethod
+    def _ring_cells(
+        center_x: int, center_y: int, ring: int
+    ) -> Iterable[Tuple[int, int]]:
+        if ring == 0:
+            yield (center_x, center_y)
+            return
+        for offset in range(-ring, ring + 1):
+            yield (center_x + offset, center_y - ring)
+            yield (center_x + offset, center_y + ring)
+        for offset in range(-ring + 1, ring):
+            yield (center_x - ring, center_y + offset)
+            yield (center_x + ring, center_y + offset)
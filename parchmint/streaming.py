@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import re
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from parchmint import diagnostics, jsonbackend
+from parchmint.component import Component
+from parchmint.connection import Connection
+from parchmint.feature import Feature
+from parchmint.layer import Layer
+
+if TYPE_CHECKING:
+    from parchmint.device import Device
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Top level arrays that are parsed item by item instead of being decoded at once
+STREAMED_KEYS = frozenset(["layers", "features", "components", "connections", "valves"])
+
+
+class JSONObjectReader:
+    """Incremental reader for a JSON document whose top level value is an object.
+
+    Only a bounded window of the text is held in memory. Members of the top level
+    object are decoded one at a time, and the members that are arrays can be
+    walked item by item so that a large array is never decoded in one piece.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Creates a new reader
+
+        Args:
+            file (TextIO): text file object positioned at the start of the document
+            chunk_size (int, optional): number of characters read at a time. Defaults to 64k.
+        """
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._eof: bool = False
+
+    def _fill(self) -> bool:
+        """Reads the next chunk of the file into the buffer, dropping the consumed text
+
+        Returns:
+            bool: false if the end of the file was reached
+        """
+        if self._eof:
+            return False
+        # Read at least as much as is still pending so that values spanning many
+        # chunks are re-scanned a logarithmic number of times
+        chunk = self._file.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skips the whitespace and returns the next character without consuming it
+
+        Raises:
+            ValueError: if the document ends unexpectedly
+
+        Returns:
+            str: next non-whitespace character
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def _expect(self, char: str) -> None:
+        """Consumes the next character, which has to be the given one
+
+        Args:
+            char (str): expected character
+
+        Raises:
+            ValueError: if a different character is found
+        """
+        found = self._peek()
+        if found != char:
+            raise ValueError(
+                f"Expected '{char}' at position {self._pos} of the JSON buffer, found '{found}'"
+            )
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """Decodes the next complete JSON value
+
+        Returns:
+            Any: decoded value
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number that ends exactly at the buffer boundary might continue in
+            # the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _array_items(self) -> Iterator[Any]:
+        """Iterates over the items of the array that starts at the current position
+
+        Yields:
+            Any: decoded array items
+        """
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            char = self._peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, found '{char}'")
+
+    def members(self, streamed_keys=STREAMED_KEYS) -> Iterator[Tuple[str, Any]]:
+        """Iterates over the members of the top level object
+
+        Members listed in streamed_keys that hold arrays are yielded as iterators
+        over their items, every other member is yielded fully decoded. Items that
+        the caller does not consume are skipped when iteration resumes.
+
+        Args:
+            streamed_keys (Set[str], optional): keys of the members to stream. Defaults to STREAMED_KEYS.
+
+        Yields:
+            Tuple[str, Any]: key and value (or item iterator) of each member
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key, found: {key}")
+            self._expect(":")
+            if key in streamed_keys and self._peek() == "[":
+                items = self._array_items()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, self._decode_value()
+            char = self._peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON object, found '{char}'")
+
+
+class _StreamingDeviceLoader:
+    """Builds a device from a ParchMint file while it is being read.
+
+    The sections of the file are loaded in the order they appear in. A section
+    whose dependencies (e.g. the layers for the components) come later in the
+    file is skipped and picked up by a further pass over the file, so the raw
+    records of a section are never kept around.
+    """
+
+    # pylint: disable=protected-access
+
+    def __init__(
+        self, device_ref: Device, path, chunk_size: int, array_waypoints: bool
+    ) -> None:
+        self._device = device_ref
+        self._path = path
+        self._chunk_size = chunk_size
+        self._array_waypoints = array_waypoints
+        self._version: Optional[str] = None
+        self._pending: Set[str] = set(STREAMED_KEYS)
+        self._params: Optional[Dict] = None
+        self._valve_map: Optional[Tuple[Dict, Dict]] = None
+
+    def _is_ready(self, key: str) -> bool:
+        if key == "layers":
+            return True
+        if key in ("features", "components"):
+            return "layers" not in self._pending
+        if key == "connections":
+            return self._version is not None and not (
+                {"layers", "features", "components"} & self._pending
+            )
+        # Valves reference both components and connections
+        return not {"components", "connections"} & self._pending
+
+    def _load_section(self, key: str, items: Iterator[Dict]) -> None:
+        device_ref = self._device
+        if key == "layers":
+            for layer_json in items:
+                device_ref.add_layer(Layer(json_data=layer_json))
+        elif key == "features":
+            for feature_json in items:
+                device_ref.add_feature(
+                    Feature.from_parchmint_v1_2(feature_json, device_ref)
+                )
+        elif key == "components":
+            for component_json in items:
+                device_ref.add_component(
+                    Component.from_parchmint_v1_2(component_json, device_ref)
+                )
+        elif key == "connections":
+            for connection_json in items:
+                if self._version == "1.0":
+                    connection = Connection.from_parchmint_v1(
+                        connection_json, device_ref
+                    )
+                else:
+                    connection = Connection.from_parchmint_v1_2(
+                        connection_json, device_ref, self._array_waypoints
+                    )
+                device_ref.add_connection(connection)
+        elif key == "valves":
+            for valve_object in items:
+                device_ref._load_valve_v1_2(device_ref, valve_object)
+
+    def _load_member(self, key: str, value: Any) -> None:
+        device_ref = self._device
+        if key == "name":
+            device_ref.name = value
+        elif key == "version":
+            if value not in ("1.0", "1.1", "1.2"):
+                raise ValueError(f"Unsupported ParchMint version: {value}")
+            self._version = value
+        elif key == "params":
+            # The params are loaded once the version is known
+            self._params = value
+        elif key in ("valveMap", "valveTypeMap"):
+            valve_map, valve_type_map = self._valve_map or ({}, {})
+            if key == "valveMap":
+                valve_map = value
+            else:
+                valve_type_map = value
+            self._valve_map = (valve_map, valve_type_map)
+
+    def load(self) -> Device:
+        """Runs the passes over the file until every section is loaded
+
+        Returns:
+            Device: the loaded device
+        """
+        first_pass = True
+        while True:
+            progress = False
+            with open(self._path, "r", encoding="utf-8") as data_file:
+                reader = JSONObjectReader(data_file, self._chunk_size)
+                found_keys = set()
+                for key, value in reader.members():
+                    found_keys.add(key)
+                    if key in STREAMED_KEYS:
+                        if key in self._pending and self._is_ready(key):
+                            self._load_section(key, value)
+                            self._pending.discard(key)
+                            progress = True
+                    elif first_pass:
+                        self._load_member(key, value)
+
+            if first_pass:
+                for key in self._pending - found_keys:
+                    if key in ("layers", "components", "connections"):
+                        diagnostics.report_missing_section(
+                            logger, key, device=self._device
+                        )
+                self._pending &= found_keys
+                first_pass = False
+                if self._version is None:
+                    raise KeyError("version")
+
+            if not self._pending:
+                break
+            if not progress:
+                raise ValueError(
+                    f"Could not resolve the sections {sorted(self._pending)} of {self._path}"
+                )
+
+        device_ref = self._device
+        if self._params is None:
+            logger.debug("no params found")
+        elif self._version == "1.0":
+            device_ref._load_params_v1(device_ref, self._params)
+        else:
+            device_ref._load_params_v1_2(device_ref, self._params)
+
+        if self._version == "1.0" and self._valve_map is not None:
+            device_ref._load_valve_map_v1(device_ref, *self._valve_map)
+
+        return device_ref
+
+
+def load_device(
+    device_ref: Device,
+    path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    array_waypoints: bool = False,
+) -> Device:
+    """Loads a ParchMint file into the given (empty) device without decoding the
+    whole document at once
+
+    Args:
+        device_ref (Device): empty device to load the file into
+        path (str | Path): path of the ParchMint JSON file
+        chunk_size (int, optional): number of characters read at a time. Defaults to 64k.
+        array_waypoints (bool, optional): store the waypoints of the paths as arrays, for ParchMint 1.1 and 1.2 files. Defaults to False.
+
+    Returns:
+        Device: the loaded device
+    """
+    return _StreamingDeviceLoader(device_ref, path, chunk_size, array_waypoints).load()
+
+
+def _json_array(items: Iterable[Any]) -> Iterator[bytes]:
+    yield b"["
+    separator = b""
+    for item in items:
+        yield separator
+        yield jsonbackend.dumps_bytes(item)
+        separator = b","
+    yield b"]"
+
+
+def _device_pieces(device_ref: Device, version: str) -> Iterator[bytes]:
+    """Serializes the device member by member and item by item, in the key
+    order of to_parchmint_v1() and to_parchmint_v1_2()"""
+    # pylint: disable=protected-access
+    members: List[Tuple[str, Any]]
+    if version in ("1", "1.0"):
+        members = [
+            ("name", device_ref.name),
+            ("version", 1),
+            ("params", device_ref.params.to_parchmint_v1()),
+        ]
+        sections = [
+            ("layers", (layer.to_parchmint_v1() for layer in device_ref.layers)),
+            ("components", (c.to_parchmint_v1() for c in device_ref.components)),
+            ("connections", (c.to_parchmint_v1() for c in device_ref.connections)),
+        ]
+    elif version == "1.2":
+        device_ref.params.set_param("x-span", device_ref.xspan)
+        device_ref.params.set_param("y-span", device_ref.yspan)
+        # Fail before anything is written rather than halfway through the file
+        device_ref._check_valve_types()
+        members = [
+            ("name", device_ref.name),
+            ("version", "1.2"),
+            ("params", device_ref.params.to_parchmint_v1()),
+        ]
+        sections = [
+            ("layers", (layer.to_parchmint_v1() for layer in device_ref.layers)),
+            (
+                "features",
+                (feature.to_parchmint_v1_2() for feature in device_ref.features),
+            ),
+            ("components", (c.to_parchmint_v1() for c in device_ref.components)),
+            ("connections", (c.to_parchmint_v1_2() for c in device_ref.connections)),
+            ("valves", device_ref._valve_objects_v1_2()),
+        ]
+    else:
+        raise ValueError(f"Unsupported ParchMint version: {version}")
+
+    separator = b"{"
+    for key, value in members:
+        yield separator
+        yield jsonbackend.dumps_bytes(key)
+        yield b":"
+        yield jsonbackend.dumps_bytes(value)
+        separator = b","
+    for key, items in sections:
+        yield separator
+        yield jsonbackend.dumps_bytes(key)
+        yield b":"
+        yield from _json_array(items)
+    yield b"}"
+
+
+def iter_device_chunks(
+    device_ref: Device, version: str = "1.2", chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Serializes a device to ParchMint JSON chunk by chunk
+
+    Every component, connection, feature and valve is encoded on its own and
+    dropped once it is in the output buffer, so the memory used is bounded by
+    the chunk size plus the largest single item. Joined together, the chunks
+    are byte for byte the text of Device.to_json().
+
+    Args:
+        device_ref (Device): device to serialize
+        version (str, optional): ParchMint version, "1" or "1.2". Defaults to "1.2".
+        chunk_size (int, optional): minimum number of bytes in each chunk but the last. Defaults to 64k.
+
+    Raises:
+        ValueError: if the version is not supported
+
+    Yields:
+        bytes: UTF-8 encoded chunks of the document
+    """
+    buffer = bytearray()
+    for piece in _device_pieces(device_ref, version):
+        buffer += piece
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def dump_device(
+    device_ref: Device,
+    file: IO,
+    version: str = "1.2",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Writes a device to a file object as ParchMint JSON without building the
+    dictionary of the whole device
+
+    Chunks are only cut between items, so text files never see a partial
+    UTF-8 sequence. For a socket, pass socket.makefile("wb") or send the chunks
+    of iter_device_chunks() directly.
+
+    Args:
+        device_ref (Device): device to write
+        file (IO): binary or text file object opened for writing
+        version (str, optional): ParchMint version, "1" or "1.2". Defaults to "1.2".
+        chunk_size (int, optional): number of bytes written at a time. Defaults to 64k.
+
+    Returns:
+        int: number of bytes written
+    """
+    is_text = isinstance(file, io.TextIOBase)
+    ret = 0
+    for chunk in iter_device_chunks(device_ref, version, chunk_size):
+        file.write(chunk.decode("utf-8") if is_text else chunk)
+        ret += len(chunk)
+    return ret
@@ -1,9 +1,13 @@
 from typing import Dict, Optional
 
+from parchmint import hashing
+
 
 class Target:
     """Target for Connection Object"""
 
+    __slots__ = ("_component", "_port")
+
     def __init__(
         self,
         component_id: Optional[str] = None,
@@ -16,7 +20,7 @@ class Target:
             json (dict, optional): json dict from json.loads(). Defaults to None.
         """
         self._component = component_id
-        self._port: Optional[str] = port
+        self._port: Optional[str] = hashing.intern_string(port)
 
         if json_data:
             self.parse_from_json(json_data)
@@ -28,7 +32,7 @@ class Target:
             json ([type]): json dict from json.loads()
         """
         self._component = json["component"]
-        self._port = json["port"]
+        self._port = hashing.intern_string(json["port"])
 
     @property
     def component(self) -> str:
@@ -69,10 +73,10 @@ class Target:
         self._port = value
 
     def __str__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def to_parchmint_v1(self) -> dict:
         """Returns the json dict
@@ -92,4 +96,13 @@ class Target:
             return False
 
     def __hash__(self) -> int:
-        return hash(repr(self))
+        return hash((self._component, self._port))
+
+    def content_digest(self) -> str:
+        """Returns a digest of the full contents of the target (unlike the hash,
+        which only covers the component and port)
+
+        Returns:
+            str: hex digest
+        """
+        return hashing.content_digest(self.to_parchmint_v1())
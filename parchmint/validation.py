@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import pathlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+import jsonschema
+
+from parchmint import jsonbackend, profiling
+
+SCHEMA_DIR = pathlib.Path(__file__).parent.parent.absolute().joinpath("schemas")
+
+# Schema file for each of the schema versions
+SCHEMA_FILES: Dict[str, str] = {
+    "1": "parchmint_v1.json",
+    "1.2": "parchmint_v1_2.json",
+}
+
+# Values of the "version" key of a ParchMint file and the schema they validate against
+SCHEMA_VERSIONS: Dict[Any, str] = {
+    1: "1",
+    "1": "1",
+    "1.0": "1",
+    "1.1": "1.2",
+    "1.2": "1.2",
+}
+
+
+class ValidationIssue(NamedTuple):
+    """A single schema violation found in a ParchMint document"""
+
+    path: str
+    """JSON path of the offending value, e.g. $.components[3].params"""
+
+    message: str
+    """Human readable description of the violation"""
+
+    validator: str
+    """Schema keyword that failed, e.g. required or type"""
+
+    schema_path: str
+    """Path of the failing keyword inside the schema"""
+
+
+def _format_path(path: Iterable[Union[str, int]]) -> str:
+    """Formats the path of a validation error as a JSON path
+
+    Args:
+        path (Iterable[Union[str, int]]): keys and indices leading to the value
+
+    Returns:
+        str: JSON path
+    """
+    ret = "$"
+    for element in path:
+        if isinstance(element, int):
+            ret += f"[{element}]"
+        else:
+            ret += f".{element}"
+    return ret
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_version: str) -> jsonschema.Draft7Validator:
+    """Returns the validator for the given schema version. The schema is loaded
+    and compiled the first time it is requested and reused afterwards.
+
+    Args:
+        schema_version (str): schema version, "1" or "1.2"
+
+    Raises:
+        ValueError: if there is no schema for the version
+
+    Returns:
+        jsonschema.Draft7Validator: validator for the schema
+    """
+    if schema_version not in SCHEMA_FILES:
+        raise ValueError(f"No schema available for ParchMint version: {schema_version}")
+    schema_path = SCHEMA_DIR.joinpath(SCHEMA_FILES[schema_version])
+    with open(schema_path, encoding="utf-8") as json_file:
+        schema = json.load(json_file)
+    jsonschema.Draft7Validator.check_schema(schema)
+    return jsonschema.Draft7Validator(schema)
+
+
+def detect_schema_version(json_data: Dict) -> str:
+    """Returns the schema version to validate a document against, based on its
+    "version" key
+
+    Args:
+        json_data (Dict): decoded ParchMint document
+
+    Raises:
+        ValueError: if the version is missing or unsupported
+
+    Returns:
+        str: schema version, "1" or "1.2"
+    """
+    version = json_data.get("version") if isinstance(json_data, dict) else None
+    if version not in SCHEMA_VERSIONS:
+        raise ValueError(f"Unsupported ParchMint version: {version}")
+    return SCHEMA_VERSIONS[version]
+
+
+def iter_validation_errors(
+    json_data: Dict, schema_version: Optional[str] = None
+) -> Iterable[jsonschema.ValidationError]:
+    """Iterates over the raw jsonschema errors of a decoded document
+
+    Args:
+        json_data (Dict): decoded ParchMint document
+        schema_version (Optional[str], optional): schema version, detected from the document when None. Defaults to None.
+
+    Returns:
+        Iterable[jsonschema.ValidationError]: validation errors
+    """
+    if schema_version is None:
+        schema_version = detect_schema_version(json_data)
+    return get_validator(schema_version).iter_errors(json_data)
+
+
+def validate_json_data(
+    json_data: Dict, schema_version: Optional[str] = None
+) -> List[ValidationIssue]:
+    """Validates a decoded ParchMint document against the schema
+
+    Args:
+        json_data (Dict): decoded ParchMint document
+        schema_version (Optional[str], optional): schema version, detected from the document when None. Defaults to None.
+
+    Returns:
+        List[ValidationIssue]: violations found, empty if the document is valid
+    """
+    with profiling.phase("validate.schema"):
+        return [
+            ValidationIssue(
+                path=_format_path(error.absolute_path),
+                message=error.message,
+                validator=str(error.validator),
+                schema_path=_format_path(error.absolute_schema_path),
+            )
+            for error in iter_validation_errors(json_data, schema_version)
+        ]
+
+
+def validate_json(
+    json_str: Union[str, bytes], schema_version: Optional[str] = None
+) -> List[ValidationIssue]:
+    """Validates a ParchMint JSON string against the schema
+
+    Args:
+        json_str (Union[str, bytes]): json string
+        schema_version (Optional[str], optional): schema version, detected from the document when None. Defaults to None.
+
+    Returns:
+        List[ValidationIssue]: violations found, empty if the document is valid
+    """
+    with profiling.phase("validate"):
+        with profiling.phase("validate.decode"):
+            json_data = jsonbackend.loads(json_str)
+        return validate_json_data(json_data, schema_version)
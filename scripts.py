@@ -1,4 +1,5 @@
 import glob
+import os
 import subprocess
 import sys
 from pathlib import Path
@@ -14,6 +15,36 @@ def test():
     subprocess.run(["pytest", "-vv"])
 
 
+def benchmark():
+    """
+    Run the benchmark suite in tests/benchmarks. The first run, or a run with
+    `--save`, is saved as the baseline, later runs are compared against the
+    last saved run and fail when a median regresses by more than
+    PARCHMINT_BENCHMARK_THRESHOLD (20% by default). The results of every run
+    are written to .benchmarks/latest.json.
+    The baseline is machine specific and .benchmarks/ is not committed, so the
+    comparison only works locally: on a fresh checkout or in CI the first run
+    records a baseline and compares nothing.
+    `poetry run benchmark [--save]`
+    """
+    storage = Path(".benchmarks")
+    storage.mkdir(exist_ok=True)
+    args = [
+        "pytest",
+        "tests/benchmarks",
+        "-m",
+        "benchmark",
+        "--benchmark-only",
+        f"--benchmark-json={storage / 'latest.json'}",
+    ]
+    if "--save" in sys.argv[1:] or not any(storage.glob("*/*.json")):
+        args.append("--benchmark-autosave")
+    else:
+        threshold = os.environ.get("PARCHMINT_BENCHMARK_THRESHOLD", "20%")
+        args += ["--benchmark-compare", f"--benchmark-compare-fail=median:{threshold}"]
+    sys.exit(subprocess.run(args).returncode)
+
+
 def validate_dir_V1():
     # glob through all the files in the argv directory with .json extension
     files = glob.glob("{}/**/*.json".format(sys.argv[1]), recursive=True)
@@ -31,4 +62,4 @@ def validate_dir_V1_2():
         print(file)
         file_path = Path(file).resolve()
         with open(file_path) as data_file:
-            Device.validate_v1(data_file.read())
+            Device.validate_v1_2(data_file.read())
@@ -0,0 +1,49 @@
+import os
+from typing import Dict, List
+
+import pytest
+
+from parchmint.device import Device
+from parchmint.generator import generate_device
+
+# Component counts of the generated devices, for example
+# PARCHMINT_BENCHMARK_SIZES=1000,10000,100000 for a full run
+SIZES_VARIABLE = "PARCHMINT_BENCHMARK_SIZES"
+DEFAULT_SIZES = "100,500"
+
+# Number of timed runs of each benchmark
+ROUNDS = int(os.environ.get("PARCHMINT_BENCHMARK_ROUNDS", "3"))
+
+# VF2 matching grows much faster than the other operations, the compare
+# benchmarks skip the sizes above this one
+COMPARE_LIMIT = int(os.environ.get("PARCHMINT_BENCHMARK_COMPARE_LIMIT", "2000"))
+
+
+def benchmark_sizes() -> List[int]:
+    return [
+        int(size) for size in os.environ.get(SIZES_VARIABLE, DEFAULT_SIZES).split(",")
+    ]
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", benchmark_sizes())
+
+
+@pytest.fixture(scope="session")
+def device_cache() -> Dict[int, Device]:
+    return {}
+
+
+@pytest.fixture
+def synthetic_device(size, device_cache) -> Device:
+    # Shared between the benchmarks, the ones that edit the device build their
+    # own with generate_device()
+    if size not in device_cache:
+        device_cache[size] = generate_device(size, feature_count=size // 10, seed=0)
+    return device_cache[size]
+
+
+@pytest.fixture
+def synthetic_json(synthetic_device) -> str:
+    return synthetic_device.to_json()
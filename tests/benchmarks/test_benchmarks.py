@@ -0,0 +1,93 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# pylint: disable=wrong-import-position
+from parchmint import Device, jsonbackend
+from parchmint.generator import generate_device
+from parchmint.geometry import rotate_components
+from parchmint.similaritymatcher import SimilarityMatcher
+
+from .conftest import COMPARE_LIMIT, ROUNDS
+
+
+def run(benchmark, function, *args, setup=None):
+    if setup is not None:
+        return benchmark.pedantic(function, setup=setup, rounds=ROUNDS)
+    return benchmark.pedantic(function, args=args, rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="load")
+def test_from_json(benchmark, synthetic_json, size):
+    device = run(benchmark, Device.from_json, synthetic_json)
+    assert len(device.components) == size
+
+
+@pytest.mark.benchmark(group="save")
+def test_to_parchmint_v1_2_dump(benchmark, synthetic_device):
+    data = run(
+        benchmark,
+        lambda: jsonbackend.dumps_bytes(synthetic_device.to_parchmint_v1_2()),
+    )
+    assert data
+
+
+@pytest.mark.benchmark(group="validate")
+def test_validate_v1_2(benchmark, synthetic_json):
+    assert run(benchmark, Device.validate, synthetic_json, "1.2") == []
+
+
+@pytest.mark.benchmark(group="compare")
+def test_compare(benchmark, synthetic_device, synthetic_json, size):
+    if size > COMPARE_LIMIT:
+        pytest.skip(f"compare is only timed up to {COMPARE_LIMIT} components")
+    expected = Device.from_json(synthetic_json)
+    assert run(benchmark, synthetic_device.compare, expected)
+
+
+@pytest.mark.benchmark(group="compare")
+def test_similarity_matcher(benchmark, synthetic_device, synthetic_json, size):
+    if size > COMPARE_LIMIT:
+        pytest.skip(f"matching is only timed up to {COMPARE_LIMIT} components")
+    expected = Device.from_json(synthetic_json)
+    assert run(
+        benchmark,
+        lambda: SimilarityMatcher(synthetic_device, expected).is_isomorphic(),
+    )
+
+
+@pytest.mark.benchmark(group="merge")
+def test_merge_netlist(benchmark, size):
+    # merge_netlist moves the components of the netlist, every round gets a
+    # fresh pair
+    def setup():
+        return (Device("merged"), generate_device(size, seed=1)), {}
+
+    def merge(device, netlist):
+        device.merge_netlist(netlist)
+        return device
+
+    merged = run(benchmark, merge, setup=setup)
+    assert len(merged.components) == size
+
+
+@pytest.mark.benchmark(group="geometry")
+def test_rotate_components(benchmark, size):
+    device = generate_device(size, seed=2)
+    run(benchmark, rotate_components, device.components, 90)
+    assert len(device.components) == size
+
+
+@pytest.mark.benchmark(group="lookup")
+def test_lookups(benchmark, synthetic_device, size):
+    component_ids = [component.ID for component in synthetic_device.components]
+    connection_ids = [connection.ID for connection in synthetic_device.connections]
+
+    def lookups():
+        for component_id in component_ids:
+            synthetic_device.get_component(component_id)
+        for connection_id in connection_ids:
+            synthetic_device.get_connection(connection_id)
+
+    run(benchmark, lookups)
+    assert len(component_ids) == size
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+import pytest
+
+from parchmint import Device
+from parchmint.benchmarking import (
+    CHARACTERIZATION_COLUMNS,
+    characterize_device,
+    characterize_devices,
+    characterize_files,
+    write_characteristics,
+)
+
+FILE_PATHS = ["tests/data/dx1_ref.json", "tests/data/dx2_ref.json"]
+
+
+def test_characterize_device(device_dict):
+    row = characterize_device(Device.from_parchmint_v1_2(device_dict))
+    assert row.name == "dev1"
+    assert row.components == len(device_dict["components"])
+    assert row.connections == len(device_dict["connections"])
+    assert row.valves == 2
+    assert row.layers == 1
+    assert row.control is False
+    assert row.max_connectivity == len(device_dict["connections"][0]["sinks"]) + 1
+
+
+def test_characterize_empty_device():
+    row = characterize_device(Device("empty"))
+    assert row.components == 0
+    assert row.max_connectivity == 0
+    assert row.area_mean is None and row.largest_xspan is None
+
+
+def test_characterize_devices_one_row_each():
+    devices = [Device.from_file(file_path) for file_path in FILE_PATHS]
+    rows = characterize_devices(devices)
+    assert [row.name for row in rows] == [device.name for device in devices]
+    component = max(devices[0].components, key=lambda c: c.xspan * c.yspan)
+    assert (rows[0].largest_xspan, rows[0].largest_yspan) == (
+        component.xspan / 1000,
+        component.yspan / 1000,
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_characterize_files(jobs):
+    expected = characterize_devices(Device.from_file(path) for path in FILE_PATHS)
+    assert list(characterize_files(FILE_PATHS, jobs=jobs, chunksize=1)) == expected
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_characterize_files_skips_broken_files(jobs, tmp_path, caplog):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{", encoding="utf-8")
+    file_paths = [FILE_PATHS[0], str(broken), FILE_PATHS[1]]
+    expected = characterize_devices(Device.from_file(path) for path in FILE_PATHS)
+    with caplog.at_level("WARNING", logger="parchmint.benchmarking"):
+        rows = list(characterize_files(file_paths, jobs=jobs, chunksize=1))
+    assert rows == expected
+    assert [record.args[0] for record in caplog.records] == [str(broken)]
+
+
+@pytest.mark.parametrize("output_format", ["tsv", "csv"])
+def test_write_characteristics_table(output_format):
+    rows = characterize_devices(Device.from_file(path) for path in FILE_PATHS)
+    output = io.StringIO()
+    assert write_characteristics(rows, output, output_format) == 2
+    delimiter = "\t" if output_format == "tsv" else ","
+    table = list(csv.reader(io.StringIO(output.getvalue()), delimiter=delimiter))
+    assert table[0] == CHARACTERIZATION_COLUMNS
+    assert [line[0] for line in table[1:]] == [row.name for row in rows]
+
+
+def test_write_characteristics_json():
+    rows = characterize_devices(Device.from_file(path) for path in FILE_PATHS)
+    output = io.StringIO()
+    write_characteristics(rows, output, "json")
+    records = json.loads(output.getvalue())
+    assert records == [row._asdict() for row in rows]
+    with pytest.raises(ValueError):
+        write_characteristics(rows, output, "latex")
@@ -0,0 +1,111 @@
+import json
+
+import numpy as np
+import pytest
+
+from parchmint import (
+    Component,
+    Connection,
+    ConnectionPath,
+    Device,
+    Layer,
+    Params,
+    Port,
+    Target,
+    binary,
+)
+from parchmint.benchmarking import binary_benchmark
+from parchmint.cmdline import convert
+
+
+def edges(device):
+    return sorted(
+        (source, sink, data["connection_id"])
+        for source, sink, data in device.graph.edges(data=True)
+    )
+
+
+@pytest.mark.parametrize("file_name", ["dx1_ref", "dx2_ref"])
+@pytest.mark.parametrize("array_waypoints", [False, True])
+def test_round_trip(file_name, array_waypoints):
+    device = Device.from_file(f"tests/data/{file_name}.json")
+    loaded = binary.loads(binary.dumps(device), array_waypoints=array_waypoints)
+    assert loaded.to_json() == device.to_json()
+    assert edges(loaded) == edges(device)
+    assert loaded.valves == device.valves
+    if array_waypoints and loaded.connections[0].paths:
+        assert isinstance(loaded.connections[0].paths[0].waypoints_array, np.ndarray)
+
+
+def test_round_trip_values(device_dict):
+    device = Device.from_json(json.dumps(device_dict))
+    flow = device.layers[0]
+    unlabeled = Port(x=1, y=2)
+    unlabeled.label = None
+    component = Component(
+        name="µ-mixer",
+        ID="mixer",
+        entity="MIXER",
+        layers=[flow],
+        params=Params({"flag": True, "big": 2**70}),
+        ports_list=[Port("1", "FLOW", 0.5, 3), unlabeled],
+        xspan=100.5,
+        yspan=200,
+    )
+    component.xpos = 1500
+    component.ypos = -20
+    device.add_component(component)
+    source = Target("mixer", "1")
+    sink = Target(device.components[0].ID, "1")
+    device.add_connection(
+        Connection(
+            name="n",
+            ID="n",
+            entity="CHANNEL",
+            layer=flow,
+            params=Params(),
+            source=source,
+            sinks=[sink],
+            paths=[ConnectionPath(source, sink, [(0, 0), (0.5, 10)])],
+        )
+    )
+
+    loaded = binary.loads(binary.dumps(device))
+    assert loaded.to_json() == device.to_json()
+    mixer = loaded.get_component("mixer")
+    assert (mixer.xpos, mixer.ypos) == (1500, -20)
+    assert mixer.ports[1].label is None
+    assert mixer.params.get_param("big") == 2**70
+
+
+def test_not_binary():
+    assert not binary.is_binary(b'{"name": "device"}')
+    with pytest.raises(ValueError):
+        binary.loads(b'{"name": "device"}')
+    data = binary.dumps(Device.from_file("tests/data/dx1_ref.json"))
+    for size in (len(binary.MAGIC) + 2, len(data) // 2, len(data) - 1):
+        with pytest.raises(ValueError):
+            binary.loads(data[:size])
+
+
+def test_convert(tmp_path, monkeypatch):
+    binary_path = tmp_path / "device.pmb"
+    json_path = tmp_path / "device.json"
+    monkeypatch.setattr(
+        "sys.argv", ["parchmint-convert", "tests/data/dx2_ref.json", str(binary_path)]
+    )
+    convert()
+    assert binary.is_binary(binary_path.read_bytes())
+
+    monkeypatch.setattr(
+        "sys.argv", ["parchmint-convert", str(binary_path), str(json_path)]
+    )
+    convert()
+    expected = Device.from_file("tests/data/dx2_ref.json").to_json()
+    assert json_path.read_text(encoding="utf-8") == expected
+
+
+def test_binary_benchmark():
+    result = binary_benchmark(component_count=50, repeats=1)
+    assert result["binary_bytes"] < result["json_bytes"]
+    assert result["load_speedup"] > 0
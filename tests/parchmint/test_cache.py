@@ -0,0 +1,145 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from parchmint import Device, binary, cache
+from parchmint.cache import DeviceCache
+
+
+@pytest.fixture
+def device_file(tmp_path, device_dict):
+    file_path = tmp_path / "device.json"
+    file_path.write_text(json.dumps(device_dict), encoding="utf-8")
+    return file_path
+
+
+@pytest.fixture
+def device_cache(tmp_path):
+    return DeviceCache(tmp_path / "cache")
+
+
+def test_from_file_hits_cache(device_file, device_cache, monkeypatch):
+    expected = Device.from_file(device_file)
+    assert Device.from_file(device_file, cache=device_cache).to_json() == (
+        expected.to_json()
+    )
+    assert len(list(device_cache.directory.glob("*.pmb"))) == 1
+
+    def fail(_):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(Device, "from_json", staticmethod(fail))
+    first = Device.from_file(device_file, cache=device_cache)
+    second = Device.from_file(device_file, cache=device_cache)
+    assert first.to_json() == expected.to_json()
+    assert first is not second
+
+
+def test_changed_contents_miss(device_file, device_cache, device_dict):
+    device_cache.load(device_file)
+    device_dict["name"] = "renamed"
+    device_file.write_text(json.dumps(device_dict), encoding="utf-8")
+    assert device_cache.load(device_file).name == "renamed"
+    assert len(list(device_cache.directory.glob("*.pmb"))) == 2
+
+
+def test_damaged_entry_is_rebuilt(device_file, device_cache):
+    device_cache.load(device_file)
+    (entry,) = device_cache.directory.glob("*.pmb")
+    entry.write_bytes(b"damaged")
+    assert device_cache.load(device_file).name == "dev1"
+    assert entry.read_bytes() != b"damaged"
+
+
+@pytest.mark.parametrize("size", [10, 16, -1])
+def test_truncated_entry_is_rebuilt(device_file, device_cache, size):
+    device_cache.load(device_file)
+    (entry,) = device_cache.directory.glob("*.pmb")
+    entry.write_bytes(entry.read_bytes()[:size])
+    assert device_cache.load(device_file).name == "dev1"
+    assert binary.is_binary(entry.read_bytes())
+    assert device_cache.get(device_file.read_bytes()).name == "dev1"
+
+
+def test_validation_issues(device_file, device_cache, device_dict, monkeypatch):
+    del device_dict["components"][0]["id"]
+    device_file.write_text(json.dumps(device_dict), encoding="utf-8")
+    issues = device_cache.validation_issues(device_file)
+    assert issues[0].path == "$.components[0]"
+
+    monkeypatch.setattr(cache, "validate_json_data", None)
+    assert device_cache.validation_issues(device_file) == issues
+
+
+def test_evicts_least_recently_used(tmp_path, device_dict):
+    device_cache = DeviceCache(tmp_path / "cache")
+    paths = []
+    for index in range(3):
+        device_dict["name"] = f"device{index}"
+        file_path = tmp_path / f"device{index}.json"
+        file_path.write_text(json.dumps(device_dict), encoding="utf-8")
+        device_cache.load(file_path)
+        paths.append(file_path)
+    entries = {
+        path: device_cache.directory.joinpath(
+            device_cache.key(path.read_bytes()) + ".pmb"
+        )
+        for path in paths
+    }
+    for age, path in zip([300, 200, 100], paths):
+        os.utime(entries[path], (1000 - age, 1000 - age))
+    # Reading the oldest entry makes it the most recently used
+    device_cache.load(paths[0])
+
+    entry_size = entries[paths[0]].stat().st_size
+    assert device_cache.evict(2 * entry_size) == 1
+    assert not entries[paths[1]].exists()
+    assert entries[paths[0]].exists() and entries[paths[2]].exists()
+
+    device_cache.clear()
+    assert device_cache.size() == 0
+
+
+def test_concurrent_loads(device_file, device_cache):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        names = list(
+            executor.map(lambda _: device_cache.load(device_file).name, range(8))
+        )
+    assert names == ["dev1"] * 8
+    assert not list(device_cache.directory.glob(".*.tmp"))
+
+
+def test_evicts_only_beyond_max_bytes(tmp_path, device_dict, monkeypatch):
+    device_cache = DeviceCache(tmp_path / "cache")
+    evictions = []
+    evict = device_cache.evict
+    monkeypatch.setattr(
+        device_cache, "evict", lambda *args: evictions.append(args) or evict(*args)
+    )
+    for index in range(5):
+        device_dict["name"] = f"device{index}"
+        file_path = tmp_path / f"device{index}.json"
+        file_path.write_text(json.dumps(device_dict), encoding="utf-8")
+        device_cache.load(file_path)
+    assert evictions == []
+
+    entry_size = device_cache.size() // 5
+    device_cache.max_bytes = 5 * entry_size
+    device_dict["name"] = "device5"
+    file_path = tmp_path / "device5.json"
+    file_path.write_text(json.dumps(device_dict), encoding="utf-8")
+    device_cache.load(file_path)
+    assert len(evictions) == 1
+    assert device_cache.size() <= device_cache.max_bytes
+
+
+def test_read_entry_evicted_after_reading(device_file, device_cache, monkeypatch):
+    device_cache.load(device_file)
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(cache.os, "utime", evicted)
+    assert device_cache.get(device_file.read_bytes()).name == "dev1"
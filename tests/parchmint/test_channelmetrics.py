@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from parchmint import Connection, ConnectionPath, Device, Target
+from parchmint.cache import DeviceCache
+from parchmint.generator import generate_file
+
+
+@pytest.fixture
+def routed_connections():
+    source, sink = Target("c1", "1"), Target("c2", "1")
+    return [
+        # L shaped, one bend
+        Connection(
+            ID="n1",
+            paths=[ConnectionPath(source, sink, [(0, 0), (100, 0), (100, 50)])],
+        ),
+        # Diagonal segment and a repeated waypoint, two paths
+        Connection(
+            ID="n2",
+            paths=[
+                ConnectionPath(source, sink, np.array([[0, 0], [30, 40], [30, 40]])),
+                ConnectionPath(source, sink, [(10, 10), (10, 20), (10, 30)]),
+            ],
+        ),
+        # No routing information
+        Connection(ID="n3"),
+    ]
+
+
+def test_channel_metrics(routed_connections):
+    device = Device("metrics")
+    device.connections.extend(routed_connections)
+    metrics = device.channel_metrics()
+    assert metrics.connection_ids == ["n1", "n2", "n3"]
+    assert metrics.lengths.tolist() == [150, 70, 0]
+    assert metrics.total_length == 220
+    assert metrics.bends.tolist() == [1, 0, 0]
+    assert metrics.manhattan_ratio.tolist() == pytest.approx([1, 20 / 70, 1])
+    assert metrics.is_manhattan.tolist() == [True, False, True]
+    assert metrics.bboxes[:2].tolist() == [[0, 0, 100, 50], [0, 0, 30, 40]]
+    assert np.all(np.isnan(metrics.bboxes[2]))
+    assert metrics.for_connection("n1")["bends"] == 1
+
+
+def test_channel_metrics_without_segments(routed_connections):
+    for connections in ([], routed_connections[2:]):
+        device = Device("metrics")
+        device.connections.extend(connections)
+        metrics = device.channel_metrics()
+        assert metrics.lengths.dtype == np.float64
+        assert metrics.manhattan_lengths.dtype == np.float64
+        assert metrics.lengths.tolist() == [0] * len(connections)
+
+
+def test_waypoints_array_round_trip():
+    source, sink = Target("c1", "1"), Target("c2", "1")
+    path = ConnectionPath(source, sink, [(0, 0), (10, 5)])
+    assert path.waypoints_array.dtype == np.int64
+    assert path.waypoints_array.tolist() == [[0, 0], [10, 5]]
+
+    path.waypoints_array = [[1, 2], [3, 4]]
+    with pytest.raises(ValueError):
+        path.waypoints_array[0, 0] = 7
+    assert path.to_parchmint_v1_2()["wayPoints"] == [[1, 2], [3, 4]]
+
+    # Accessing the list converts the waypoints back to tuples
+    path.add_waypoint(5, 6)
+    assert path.waypoints == [(1, 2), (3, 4), (5, 6)]
+    assert path.waypoints_array.tolist() == [[1, 2], [3, 4], [5, 6]]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_from_file_array_waypoints(streaming, tmp_path):
+    file_path = tmp_path / "routed.json"
+    generate_file(file_path, component_count=30, seed=4)
+    expected = Device.from_file(file_path)
+    cache_directory = tmp_path / "cache"
+    for cache in (None, DeviceCache(cache_directory), DeviceCache(cache_directory)):
+        device = Device.from_file(
+            file_path, streaming=streaming, cache=cache, array_waypoints=True
+        )
+        paths = [path for connection in device.connections for path in connection.paths]
+        assert paths
+        # Array backed paths hand out the stored array instead of a new one
+        assert all(path.waypoints_array is path.waypoints_array for path in paths)
+        assert device.to_json() == expected.to_json()
+        assert device.channel_metrics().lengths.tolist() == (
+            expected.channel_metrics().lengths.tolist()
+        )
@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+from parchmint.cmdline import validate_dir, validate_files, write_records
+
+
+@pytest.fixture
+def corpus(tmp_path, device_dict):
+    valid = json.loads(json.dumps(device_dict))
+    invalid = json.loads(json.dumps(device_dict))
+    del invalid["components"][0]["id"]
+    (tmp_path / "nested").mkdir()
+    paths = [
+        tmp_path / "a_valid.json",
+        tmp_path / "nested" / "b_invalid.json",
+        tmp_path / "c_broken.json",
+    ]
+    paths[0].write_text(json.dumps(valid), encoding="utf-8")
+    paths[1].write_text(json.dumps(invalid), encoding="utf-8")
+    paths[2].write_text("{", encoding="utf-8")
+    return [str(path) for path in paths]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_validate_files(corpus, jobs):
+    records = list(validate_files(corpus, jobs=jobs, chunksize=1))
+    assert [record["path"] for record in records] == corpus
+    assert [record["valid"] for record in records] == [True, False, False]
+    assert records[0]["version"] == "1.2"
+    assert records[1]["errors"][0]["path"] == "$.components[0]"
+    assert all(record["seconds"] >= 0 for record in records)
+
+
+def test_write_records_tsv(corpus):
+    output = io.StringIO()
+    invalid_count = write_records(validate_files(corpus), output, "tsv")
+    assert invalid_count == 2
+    lines = output.getvalue().splitlines()
+    assert lines[0].split("\t") == [
+        "path",
+        "version",
+        "valid",
+        "errors",
+        "seconds",
+        "first_error",
+    ]
+    assert [line.split("\t")[2] for line in lines[1:]] == ["True", "False", "False"]
+
+
+def test_validate_dir(corpus, tmp_path, monkeypatch):
+    summary_path = tmp_path / "summary.jsonl"
+    monkeypatch.setattr(
+        "sys.argv",
+        ["parchmint-validate-dir", str(tmp_path), "-j", "1", "-o", str(summary_path)],
+    )
+    with pytest.raises(SystemExit) as exit_info:
+        validate_dir()
+    assert exit_info.value.code == 1
+    records = [json.loads(line) for line in summary_path.read_text().splitlines()]
+    assert sorted(record["path"] for record in records) == sorted(corpus)
+
+
+def test_validate_files_non_object(tmp_path):
+    file_path = tmp_path / "list.json"
+    file_path.write_text("[1, 2]", encoding="utf-8")
+    (record,) = validate_files([str(file_path)])
+    assert record["valid"] is False
+    assert record["version"] is None
+    assert record["errors"][0]["path"] == "$"
@@ -207,8 +207,8 @@ def test_rotate_component(component_for_rotation, component2_for_rotation):
     assert component2_for_rotation.ypos + component2_for_rotation.yspan / 2 == old_ypos
     assert component2_for_rotation.xspan == 15000
     assert component2_for_rotation.yspan == 1000
-    assert component2_for_rotation.xpos == -14000
-    assert component2_for_rotation.ypos == 14000
+    assert component2_for_rotation.xpos == -5000
+    assert component2_for_rotation.ypos == 9000
     port = component2_for_rotation.get_port("top")
     assert (port.x, port.y) == (15000, 500)
 
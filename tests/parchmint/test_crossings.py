@@ -0,0 +1,152 @@
+import random
+from itertools import combinations
+
+from parchmint import Connection, ConnectionPath, Layer, Target
+from parchmint.crossings import OVERLAP, POINT, crossing_pairs, find_crossings
+
+FLOW = Layer("FLOW_1", "flow", "FLOW")
+CONTROL = Layer("CONTROL_1", "control", "CONTROL")
+
+
+def _orientation(first, second, third):
+    cross = (second[0] - first[0]) * (third[1] - first[1]) - (second[1] - first[1]) * (
+        third[0] - first[0]
+    )
+    return (cross > 0) - (cross < 0)
+
+
+def _on_segment(start, end, point):
+    return min(start[0], end[0]) <= point[0] <= max(start[0], end[0]) and min(
+        start[1], end[1]
+    ) <= point[1] <= max(start[1], end[1])
+
+
+def segments_intersect(first, second):
+    """Reference check of two segments sharing at least one point, for the brute
+    force comparisons"""
+    (p1, p2), (q1, q2) = first, second
+    o1, o2 = _orientation(p1, p2, q1), _orientation(p1, p2, q2)
+    o3, o4 = _orientation(q1, q2, p1), _orientation(q1, q2, p2)
+    if o1 != o2 and o3 != o4:
+        return True
+    return (
+        (o1 == 0 and _on_segment(p1, p2, q1))
+        or (o2 == 0 and _on_segment(p1, p2, q2))
+        or (o3 == 0 and _on_segment(q1, q2, p1))
+        or (o4 == 0 and _on_segment(q1, q2, p2))
+    )
+
+
+def _connection(connection_id, waypoints, layer=FLOW, targets=("c1", "c2")):
+    source, sink = Target(targets[0], "1"), Target(targets[1], "1")
+    return Connection(
+        ID=connection_id,
+        source=source,
+        sinks=[sink],
+        layer=layer,
+        paths=[ConnectionPath(source, sink, waypoints)],
+    )
+
+
+def test_segments_intersect():
+    assert segments_intersect(((0, 0), (10, 10)), ((0, 10), (10, 0)))
+    assert segments_intersect(((0, 0), (10, 0)), ((5, 0), (20, 0)))
+    assert segments_intersect(((0, 0), (10, 0)), ((10, 0), (10, 5)))
+    assert not segments_intersect(((0, 0), (10, 0)), ((11, 0), (20, 0)))
+    assert not segments_intersect(((0, 0), (10, 10)), ((0, 1), (10, 11)))
+
+
+def test_find_crossings():
+    connections = [
+        _connection("a", [(0, 50), (100, 50)]),
+        # Crosses a in the middle
+        _connection("b", [(50, 0), (50, 100)]),
+        # Runs along a for 20 units
+        _connection("c", [(80, 50), (120, 50)]),
+        # Starts where a starts, not a crossing
+        _connection("d", [(0, 50), (0, 100)]),
+        # Ends on the middle of b (T junction)
+        _connection("e", [(20, 80), (50, 80)]),
+        # Would cross a, but on another layer
+        _connection("f", [(10, 0), (10, 100)], CONTROL),
+    ]
+    crossings = {
+        (crossing.first_id, crossing.second_id, crossing.kind): (
+            crossing.start,
+            crossing.end,
+        )
+        for crossing in find_crossings(connections)
+    }
+    assert crossings == {
+        ("a", "b", POINT): ((50, 50), (50, 50)),
+        ("a", "c", OVERLAP): ((80, 50), (100, 50)),
+        ("b", "e", POINT): ((50, 80), (50, 80)),
+    }
+    assert crossing_pairs(find_crossings(connections)) == [
+        ("a", "b"),
+        ("b", "e"),
+        ("a", "c"),
+    ]
+
+
+def test_find_crossings_at_waypoints():
+    connections = [
+        # Cross in an X through a bend point of both
+        _connection("a", [(0, 0), (50, 50), (100, 100)], targets=("c1", "c2")),
+        _connection("b", [(0, 100), (50, 50), (100, 0)], targets=("c3", "c4")),
+        # Same end point as a, on another component
+        _connection("c", [(0, 0), (-50, 0)], targets=("c5", "c6")),
+        # Same end point as a, leaving the same port
+        _connection("d", [(0, 0), (0, -50)], targets=("c1", "c7")),
+        # Passes through a bend point of d, leaving the same port
+        _connection("e", [(0, 0), (-10, -50), (10, -50)], targets=("c1", "c8")),
+    ]
+    crossings = [
+        (crossing.first_id, crossing.second_id, crossing.start)
+        for crossing in find_crossings(connections)
+    ]
+    assert sorted(crossings) == [
+        ("a", "b", (50, 50)),
+        ("a", "c", (0, 0)),
+        ("c", "d", (0, 0)),
+        ("c", "e", (0, 0)),
+        ("d", "e", (0, -50)),
+    ]
+
+
+def test_find_crossings_without_layer():
+    connections = [
+        _connection("a", [(0, 50), (100, 50)]),
+        _connection("b", [(50, 0), (50, 100)], CONTROL),
+        # Checked against every layer, but not against each other
+        _connection("c", [(20, 0), (20, 100)], None),
+        _connection("d", [(0, 60), (100, 60)], None),
+    ]
+    crossings = {
+        (crossing.layer_id, crossing.first_id, crossing.second_id)
+        for crossing in find_crossings(connections)
+    }
+    assert crossings == {
+        ("FLOW_1", "a", "c"),
+        ("CONTROL_1", "b", "d"),
+    }
+
+
+def test_find_crossings_matches_brute_force():
+    random.seed(3)
+    connections = [
+        _connection(
+            f"n{index}",
+            [(random.randint(0, 5000), random.randint(0, 5000)) for _ in range(4)],
+        )
+        for index in range(60)
+    ]
+    expected = set()
+    for first, second in combinations(connections, 2):
+        first_points = first.paths[0].waypoints
+        second_points = second.paths[0].waypoints
+        for segment1 in zip(first_points, first_points[1:]):
+            for segment2 in zip(second_points, second_points[1:]):
+                if segments_intersect(segment1, segment2):
+                    expected.add(tuple(sorted((first.ID, second.ID))))
+    assert set(crossing_pairs(find_crossings(connections))) == expected
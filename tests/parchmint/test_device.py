@@ -6,6 +6,8 @@ from parchmint.connection import Connection
 from parchmint.device import ValveType
 from parchmint.feature import Feature
 from parchmint.layer import Layer
+from parchmint.params import Params
+from parchmint.port import Port
 from parchmint.target import Target
 
 
@@ -105,6 +107,26 @@ def test_add_connection(
     assert temp_device.graph.has_edge(component1.ID, component2.ID)
 
 
+def test_add_components_and_connections_in_bulk(device_dict):
+    expected = Device.from_parchmint_v1_2(device_dict)
+    device = Device()
+    for layer in expected.layers:
+        device.add_layer(layer)
+
+    with pytest.raises(KeyError):
+        device.add_connections(expected.connections)
+    assert device.connections == []
+
+    device.add_components(expected.components)
+    device.add_connections(expected.connections)
+    assert device.components == expected.components
+    assert device.connections == expected.connections
+    assert device.get_component("c1") is expected.get_component("c1")
+    assert sorted(device.graph.edges(data="connection_id")) == sorted(
+        expected.graph.edges(data="connection_id")
+    )
+
+
 def test_remove_connection(temp_device, layer_dict, component_dict):
     temp_device.add_layer(Layer(json_data=layer_dict))
     component1 = Component.from_parchmint_v1_2(
@@ -222,3 +244,80 @@ def test_to_parchmint_v1_2(
 def test_from_parchmint_v1_2(device_dict):
     device = Device.from_parchmint_v1_2(json_data=device_dict)
     assert device.to_parchmint_v1_2() == device_dict
+
+
+def test_lookups_follow_direct_list_mutation(temp_device, layer_dict, component_dict):
+    layer = Layer(json_data=layer_dict)
+    temp_device.layers.append(layer)
+    assert temp_device.get_layer(layer.ID) is layer
+
+    component1 = Component.from_parchmint_v1_2(
+        json_data=component_dict, device_ref=temp_device
+    )
+    temp_device.add_component(component1)
+    assert temp_device.component_exists("c1")
+    assert temp_device.get_name_from_id("c1") == "c1"
+
+    component2 = Component.from_parchmint_v1_2(
+        json_data=component_dict, device_ref=temp_device
+    )
+    component2.ID = "c2"
+    temp_device.components = [component2]
+    assert temp_device.component_exists("c1") is False
+    assert temp_device.get_component("c2") is component2
+
+
+def test_lookups_with_duplicate_ids(temp_device, layer_dict, component_dict):
+    temp_device.add_layer(Layer(json_data=layer_dict))
+    component1 = Component.from_parchmint_v1_2(
+        json_data=component_dict, device_ref=temp_device
+    )
+    component2 = Component.from_parchmint_v1_2(
+        json_data=component_dict, device_ref=temp_device
+    )
+    temp_device.add_component(component1)
+    temp_device.add_component(component2)
+    assert temp_device.get_component("c1") is component1
+
+    temp_device.remove_component("c1")
+    assert temp_device.get_component("c1") is component2
+
+
+def test_apply_rotations(temp_device):
+    expected = []
+    for index, rotation in enumerate([0, 90, 180, 360, 270]):
+        for copy_index in range(2):
+            component = Component(
+                ID=f"c{index}_{copy_index}",
+                params=Params({"position": [100 * index, 50], "rotation": rotation}),
+                xspan=1000,
+                yspan=3000,
+            )
+            component.add_component_port(Port("1", "FLOW", 500, 0))
+            temp_device.add_component(component)
+
+            reference = Component(
+                ID=component.ID,
+                params=Params({"position": [100 * index, 50], "rotation": rotation}),
+                xspan=1000,
+                yspan=3000,
+            )
+            reference.add_component_port(Port("1", "FLOW", 500, 0))
+            reference.rotate_component()
+            expected.append(reference)
+
+    assert temp_device.apply_rotations() == 6
+
+    for component, reference in zip(temp_device.components, expected):
+        assert component.rotation == 0
+        assert (component.xpos, component.ypos) == (reference.xpos, reference.ypos)
+        assert (component.xspan, component.yspan) == (
+            reference.xspan,
+            reference.yspan,
+        )
+        port = component.get_port("1")
+        reference_port = reference.get_port("1")
+        assert (port.x, port.y) == (reference_port.x, reference_port.y)
+
+    # Everything has been normalized, nothing is left to rotate
+    assert temp_device.apply_rotations() == 0
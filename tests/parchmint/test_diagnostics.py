@@ -0,0 +1,82 @@
+import json
+import logging
+
+import pytest
+
+from parchmint import Component, Device, diagnostics
+
+
+@pytest.fixture(autouse=True)
+def clean_counts():
+    diagnostics.reset_warning_counts()
+    yield
+    diagnostics.reset_warning_counts()
+
+
+def test_duplicate_components_are_collected(device_dict, caplog, capsys):
+    device = Device.from_parchmint_v1_2(device_dict)
+    component = device.components[0]
+    with caplog.at_level(logging.WARNING, logger="parchmint"):
+        device.add_component(component)
+        device.add_components([component])
+    assert capsys.readouterr().out == ""
+    assert [warning.code for warning in device.warnings] == [
+        diagnostics.DUPLICATE_COMPONENT
+    ] * 2
+    assert device.warnings[0].entity == component.ID
+    assert device.warnings[0].message == (
+        f"Component {component.name} already present in device, "
+        "adding it as a duplicate"
+    )
+    assert device.components.count(component) == 3
+    assert len(caplog.records) == 2
+    assert diagnostics.warning_counts() == {diagnostics.DUPLICATE_COMPONENT: 2}
+
+
+def test_missing_sections(device_dict):
+    del device_dict["connections"]
+    del device_dict["valves"]
+    device = Device.from_json(json.dumps(device_dict))
+    assert [(w.code, w.message) for w in device.warnings] == [
+        (diagnostics.MISSING_SECTION, "no connections found")
+    ]
+
+
+def test_missing_sections_streaming(tmp_path, device_dict):
+    del device_dict["connections"]
+    del device_dict["valves"]
+    file_path = tmp_path / "device.json"
+    file_path.write_text(json.dumps(device_dict), encoding="utf-8")
+    device = Device.from_file(file_path, streaming=True)
+    assert [(w.code, w.message) for w in device.warnings] == [
+        (diagnostics.MISSING_SECTION, "no connections found")
+    ]
+
+
+def test_no_connections_for_edge(device_dict):
+    device = Device.from_parchmint_v1_2(device_dict)
+    source, sink = device.components[1], device.components[0]
+    assert device.get_connections_for_edge(source, sink) == []
+    assert diagnostics.warning_counts()[diagnostics.NO_CONNECTIONS] == 1
+    assert device.warnings == []
+
+
+def test_rotate_component_logs_ports(component_dict, device, caplog, capsys):
+    component = Component.from_parchmint_v1_2(component_dict, device)
+    component.rotate_component()
+    assert capsys.readouterr().out == ""
+    assert caplog.records == []
+    with caplog.at_level(logging.DEBUG, logger="parchmint"):
+        component.rotate_component()
+    assert len(caplog.records) == len(component.ports)
+
+
+def test_compare_logs_result(device_dict, caplog, capsys):
+    device = Device.from_parchmint_v1_2(device_dict)
+    expected = Device.from_parchmint_v1_2(device_dict)
+    assert device.compare(expected)
+    assert capsys.readouterr().out == ""
+    with caplog.at_level(logging.INFO, logger="parchmint"):
+        assert device.compare(expected)
+    assert caplog.records[-1].getMessage() == "Devices dev1 and dev1 match"
+    assert "----Param differences----" in caplog.messages
@@ -0,0 +1,139 @@
+import pytest
+
+from parchmint import (
+    Component,
+    Connection,
+    ConnectionPath,
+    Device,
+    Layer,
+    Params,
+    Target,
+)
+from parchmint.drc import (
+    CHANNEL_COMPONENT_CROSSING,
+    CHANNEL_CROSSING,
+    COMPONENT_OVERLAP,
+    COMPONENT_SPACING,
+    check_device,
+)
+from parchmint.spatialindex import SpatialIndex
+
+
+@pytest.fixture
+def drc_device():
+    device = Device("drc")
+    flow = Layer("FLOW_1", "flow", "FLOW")
+    control = Layer("CONTROL_1", "control", "CONTROL")
+    device.add_layer(flow)
+    device.add_layer(control)
+
+    def place(component_id, layer, x, y, spacing=0):
+        component = Component(
+            ID=component_id, layers=[layer], params=Params(), xspan=100, yspan=100
+        )
+        component.xpos = x
+        component.ypos = y
+        component.component_spacing = spacing
+        device.add_component(component)
+
+    def route(connection_id, source, sink, waypoints):
+        source, sink = Target(source, "1"), Target(sink, "1")
+        device.add_connection(
+            Connection(
+                ID=connection_id,
+                source=source,
+                sinks=[sink],
+                layer=flow,
+                paths=[ConnectionPath(source, sink, waypoints)],
+            )
+        )
+
+    place("a", flow, 0, 0)
+    place("b", flow, 50, 50)  # overlaps a
+    place("c", control, 50, 50)  # same place as b, different layer
+    place("d", flow, 1000, 0, spacing=200)
+    place("e", flow, 1150, 0)  # 50 away from d
+    place("f", flow, 2000, 0, spacing=50)
+    place("g", flow, 2150, 0)  # 50 away from f, just enough
+    place("h", flow, 500, 500)
+
+    # Runs straight through h
+    route("n1", "a", "d", [(100, 550), (1000, 550)])
+    # Crosses n1, shares no end point with it
+    route("n2", "f", "g", [(700, 300), (700, 800)])
+    # Leaves from the same point as n1
+    route("n3", "a", "f", [(100, 550), (100, 900)])
+    return device
+
+
+def test_run_drc(drc_device):
+    violations = {
+        (violation.rule, violation.first_id, violation.second_id)
+        for violation in drc_device.run_drc()
+    }
+    assert violations == {
+        (COMPONENT_OVERLAP, "a", "b"),
+        (COMPONENT_SPACING, "d", "e"),
+        (CHANNEL_COMPONENT_CROSSING, "n1", "h"),
+        (CHANNEL_CROSSING, "n1", "n2"),
+    }
+
+
+def test_run_drc_reports_gap_and_layer(drc_device):
+    spacing = [
+        violation
+        for violation in drc_device.run_drc()
+        if violation.rule == COMPONENT_SPACING
+    ]
+    assert len(spacing) == 1
+    assert spacing[0].value == 50
+    assert spacing[0].layer_id == "FLOW_1"
+    assert spacing[0].location == (1100, 0, 1150, 100)
+
+
+def test_run_drc_clean_device(drc_device):
+    for component_id in ("b", "e", "h"):
+        drc_device.remove_component(component_id)
+    drc_device.remove_connection("n2")
+    assert drc_device.run_drc() == []
+
+
+def test_run_drc_uses_the_spacing_of_each_component(drc_device):
+    # Only the component placed second asks for the spacing
+    for component_id, x, spacing in (("i", 3000, 0), ("j", 3150, 200)):
+        component = Component(
+            ID=component_id, layers=[], params=Params(), xspan=100, yspan=100
+        )
+        component.xpos = x
+        component.ypos = 0
+        component.component_spacing = spacing
+        drc_device.add_component(component)
+    violations = {
+        (violation.rule, violation.first_id, violation.second_id)
+        for violation in drc_device.run_drc()
+    }
+    # The components have no layers so they share none
+    assert (COMPONENT_SPACING, "i", "j") not in violations
+
+    drc_device.get_component("i").layers = [drc_device.get_layer("FLOW_1")]
+    drc_device.invalidate_caches()
+    violations = {
+        (violation.rule, violation.first_id, violation.second_id)
+        for violation in drc_device.run_drc()
+    }
+    assert (COMPONENT_SPACING, "i", "j") in violations
+
+
+def test_check_device_with_spatial_index(drc_device):
+    # Only the primitives of the given index are checked
+    items = [
+        item for item in drc_device.spatial_index.items if item.ID not in ("b", "n2")
+    ]
+    violations = {
+        (violation.rule, violation.first_id, violation.second_id)
+        for violation in check_device(drc_device, SpatialIndex(items))
+    }
+    assert violations == {
+        (COMPONENT_SPACING, "d", "e"),
+        (CHANNEL_COMPONENT_CROSSING, "n1", "h"),
+    }
@@ -0,0 +1,51 @@
+import pytest
+
+from parchmint import Device
+from parchmint.generator import generate_device, generate_file
+
+
+def test_generated_device_is_valid():
+    device = generate_device(
+        200, fanout=3, layer_count=3, feature_count=20, valve_ratio=0.1, seed=1
+    )
+    assert Device.validate(device.to_json()) == []
+    assert len(device.components) == 200
+    assert len(device.valves) == 20
+    assert len(device.features) == 20
+    assert {layer.layer_type for layer in device.layers} == {"FLOW", "CONTROL"}
+    assert all(1 <= len(connection.sinks) <= 3 for connection in device.connections)
+    assert all(
+        len(path.waypoints) == 4
+        for connection in device.connections
+        for path in connection.paths
+    )
+
+
+def test_same_seed_same_device():
+    assert generate_device(100, seed=7).to_json() == (
+        generate_device(100, seed=7).to_json()
+    )
+    assert generate_device(100, seed=7).to_json() != (
+        generate_device(100, seed=8).to_json()
+    )
+
+
+def test_generate_file(tmp_path):
+    file_path = tmp_path / "synthetic.json"
+    device = generate_file(file_path, component_count=50, seed=2)
+    assert Device.validate(file_path.read_text(encoding="utf-8")) == []
+    loaded = Device.from_file(file_path)
+    assert [c.ID for c in loaded.components] == [c.ID for c in device.components]
+    assert len(loaded.connections) == len(device.connections)
+    assert len(loaded.valves) == len(device.valves)
+
+    file_path = tmp_path / "synthetic_v1.json"
+    generate_file(file_path, version="1", component_count=50, seed=2)
+    assert Device.validate(file_path.read_text(encoding="utf-8"), "1") == []
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        generate_device(10, valve_ratio=2)
+    with pytest.raises(ValueError):
+        generate_device(10, layer_count=0)
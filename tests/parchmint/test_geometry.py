@@ -0,0 +1,66 @@
+import copy
+
+import numpy as np
+import pytest
+
+from parchmint import Component, Params, Port, geometry
+
+
+def make_component(ID, xspan, yspan, xpos, ypos, rotation):
+    component = Component(
+        ID=ID,
+        params=Params({"position": [xpos, ypos], "rotation": rotation}),
+        xspan=xspan,
+        yspan=yspan,
+    )
+    component.add_component_port(Port("top", "FLOW", xspan // 2, 0))
+    component.add_component_port(Port("bottom", "FLOW", xspan // 2, yspan))
+    component.add_component_port(Port("left", "FLOW", 0, yspan // 3))
+    return component
+
+
+def test_rotation_terms_are_exact_for_quarter_turns():
+    cos, sin = geometry.rotation_terms([0, 90, 180, 270, -90, 450])
+    assert cos.tolist() == [1, 0, -1, 0, 0, 0]
+    assert sin.tolist() == [0, 1, 0, -1, -1, 1]
+
+
+def test_rotation_matrix_is_cached():
+    assert geometry.rotation_matrix(90) is geometry.rotation_matrix(90)
+    with pytest.raises(ValueError):
+        geometry.rotation_matrix(90)[0, 0] = 5
+
+
+def test_rotate_points_matches_rotate_point():
+    component = make_component("c1", 1000, 15000, 0, 0, 0)
+    points = [(port.x, port.y) for port in component.ports]
+    for angle in (90, 180, 270, 25):
+        rotated = component.rotate_points(points, angle)
+        assert rotated.dtype == np.int64
+        assert [tuple(point) for point in rotated.tolist()] == [
+            component.rotate_point(x, y, angle) for x, y in points
+        ]
+
+
+@pytest.mark.parametrize("angle", [0, 90, 180, 270, 30])
+def test_rotate_components_matches_rotate_component(angle):
+    components = [
+        make_component("c1", 1000, 15000, 0, 0, angle),
+        make_component("c2", 3000, 2000, 2000, -500, angle),
+        make_component("c3", 7, 9, 11, 13, angle),
+    ]
+    expected = copy.deepcopy(components)
+    for component in expected:
+        component.rotate_component()
+
+    geometry.rotate_components(components)
+
+    for component, reference in zip(components, expected):
+        assert (component.xpos, component.ypos) == (reference.xpos, reference.ypos)
+        assert (component.xspan, component.yspan) == (
+            reference.xspan,
+            reference.yspan,
+        )
+        assert [(port.x, port.y) for port in component.ports] == [
+            (port.x, port.y) for port in reference.ports
+        ]
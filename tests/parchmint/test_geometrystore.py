@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from parchmint import Component, Device, Layer, Params, Port
+
+
+def _component(component_id, xpos, ypos, xspan=100, yspan=50, rotation=0):
+    component = Component(
+        ID=component_id,
+        params=Params({"position": [xpos, ypos], "rotation": rotation}),
+        ports_list=[Port("1", "FLOW", 0, 0), Port("2", "FLOW", xspan, yspan)],
+        xspan=xspan,
+        yspan=yspan,
+    )
+    component.xpos = xpos
+    component.ypos = ypos
+    return component
+
+
+@pytest.fixture
+def geometry_device():
+    device = Device("geometry")
+    device.add_layer(Layer("FLOW_1", "flow", "FLOW"))
+    for index in range(40):
+        device.add_component(_component(f"c{index}", index * 200, index * 10))
+    return device
+
+
+def test_bboxes_and_areas(geometry_device):
+    store = geometry_device.geometry
+    assert len(store) == 40
+    row = store.row("c3")
+    assert store.bboxes[row].tolist() == [600, 30, 700, 80]
+    assert np.all(store.areas() == 5000)
+    assert store.extent() == (0, 0, 7900, 440)
+    with pytest.raises(ValueError):
+        store.bboxes[0, 0] = 1
+
+
+def test_port_coordinates(geometry_device):
+    store = geometry_device.geometry
+    coordinates, owners = store.port_coordinates()
+    assert coordinates.shape == (80, 2)
+    row = store.row("c5")
+    assert coordinates[owners == row].tolist() == [[1000, 50], [1100, 100]]
+    assert store.component_port_coordinates("c5").tolist() == [[1000, 50], [1100, 100]]
+
+
+def test_incremental_updates(geometry_device):
+    store = geometry_device.geometry
+    geometry_device.remove_component("c0")
+    geometry_device.add_component(_component("new", -500, -500))
+    assert store is geometry_device.geometry
+    assert "c0" not in store
+    assert store.bboxes[store.row("new")].tolist() == [-500, -500, -400, -450]
+    assert sorted(store.ids) == sorted(c.ID for c in geometry_device.components)
+    for component_id in store.ids:
+        component = geometry_device.get_component(component_id)
+        assert store.positions[store.row(component_id)].tolist() == [
+            component.xpos,
+            component.ypos,
+        ]
+    coordinates, owners = store.port_coordinates()
+    assert len(coordinates) == 80
+    assert coordinates[owners == store.row("new")].tolist() == [
+        [-500, -500],
+        [-400, -450],
+    ]
+
+
+def test_apply_rotations_refreshes_store(geometry_device):
+    component = geometry_device.get_component("c1")
+    component.rotation = 90
+    store = geometry_device.geometry
+    assert store.rotations[store.row("c1")] == 90
+    geometry_device.apply_rotations()
+    assert store.rotations[store.row("c1")] == 0
+    assert store.spans[store.row("c1")].tolist() == [50, 100]
+
+
+def test_set_positions_writes_back(geometry_device):
+    store = geometry_device.geometry
+    store.set_positions(["c2", "c4"], [(5, 6), (7, 8)])
+    assert geometry_device.get_component("c2").xpos == 5
+    assert geometry_device.get_component("c4").ypos == 8
+    assert store.bboxes[store.row("c4")].tolist() == [7, 8, 107, 58]
+
+
+def test_set_positions_invalidates_spatial_index(geometry_device):
+    assert geometry_device.spatial_index.query_window(50000, 50000, 50001, 50001) == []
+    fingerprint = geometry_device.fingerprint
+    geometry_device.geometry.set_positions(["c5"], [(50000, 50000)])
+    items = geometry_device.spatial_index.query_window(50000, 50000, 50001, 50001)
+    assert [item.ID for item in items] == ["c5"]
+    assert geometry_device.fingerprint == fingerprint
+
+
+def test_unplaced_component():
+    device = Device("unplaced")
+    component = Component(ID="floating", params=Params(), xspan=10, yspan=20)
+    component.params = Params()
+    device.add_component(component)
+    store = device.geometry
+    assert store.placed.tolist() == [False]
+    assert store.extent() is None
+    store.set_positions(["floating"], [(1, 2)])
+    assert store.placed.tolist() == [True]
+    assert store.bboxes[0].tolist() == [1, 2, 11, 22]
+    assert component.params.get_param("position") == [1, 2]
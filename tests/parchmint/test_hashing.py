@@ -0,0 +1,15 @@
+from parchmint.hashing import canonical_json, content_digest, freeze
+
+
+def test_freeze_ignores_key_order():
+    value1 = {"b": [1, {"y": 2, "x": 1}], "a": 1}
+    value2 = {"a": 1, "b": [1, {"x": 1, "y": 2}]}
+    assert freeze(value1) == freeze(value2)
+    assert hash(freeze(value1)) == hash(freeze(value2))
+    assert freeze({"a": [1, 2]}) != freeze({"a": [2, 1]})
+
+
+def test_content_digest():
+    assert canonical_json({"b": 1, "a": [1, 2]}) == '{"a":[1,2],"b":1}'
+    assert content_digest({"b": 1, "a": 2}) == content_digest({"a": 2, "b": 1})
+    assert content_digest({"a": 1}) != content_digest({"a": 2})
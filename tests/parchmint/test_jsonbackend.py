@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+import pytest
+
+from parchmint import Device, jsonbackend
+
+
+@pytest.fixture
+def backend():
+    previous = jsonbackend.get_backend()
+    yield
+    jsonbackend.set_backend(previous)
+
+
+SAMPLE = {
+    "name": "dévice µ",
+    "ints": [0, -1, 2**40],
+    "floats": [0.5, -1.25, 1e16, 1e-05, 123.456],
+    "nested": {"b": [True, False, None], "a": "x/y"},
+    "numpy": np.int64(7),
+}
+
+
+@pytest.mark.parametrize("name", jsonbackend.available_backends())
+def test_dumps_canonical(backend, name):
+    jsonbackend.set_backend(name)
+    expected = json.dumps(
+        SAMPLE, separators=(",", ":"), ensure_ascii=False, default=int
+    )
+    assert jsonbackend.dumps(SAMPLE) == expected
+    assert jsonbackend.dumps_bytes(SAMPLE) == expected.encode("utf-8")
+
+
+@pytest.mark.parametrize("name", jsonbackend.available_backends())
+def test_dumps_non_finite_floats(backend, name):
+    jsonbackend.set_backend(name)
+    value = {
+        "a": float("nan"),
+        "b": [float("inf"), None],
+        "c": np.array([-float("inf")]),
+    }
+    assert jsonbackend.dumps(value) == '{"a":NaN,"b":[Infinity,null],"c":[-Infinity]}'
+
+
+@pytest.mark.parametrize("name", jsonbackend.available_backends())
+def test_loads(backend, name):
+    jsonbackend.set_backend(name)
+    text = json.dumps({"a": [1, 2.5, "é"]})
+    assert jsonbackend.loads(text) == {"a": [1, 2.5, "é"]}
+    assert jsonbackend.loads(text.encode("utf-8")) == {"a": [1, 2.5, "é"]}
+
+
+def test_unknown_backend(backend):
+    with pytest.raises(ValueError):
+        jsonbackend.set_backend("yaml")
+
+
+@pytest.mark.parametrize("name", jsonbackend.available_backends())
+def test_device_to_file(backend, name, tmp_path):
+    jsonbackend.set_backend(name)
+    device = Device.from_file("tests/data/dx1_ref.json")
+    file_path = tmp_path / "device.json"
+    device.to_file(file_path)
+
+    text = file_path.read_text(encoding="utf-8")
+    assert text == device.to_json()
+    assert text == json.dumps(
+        device.to_parchmint_v1_2(), separators=(",", ":"), ensure_ascii=False
+    )
+    assert Device.from_file(file_path).to_json() == text
+
+
+def test_device_to_json_version(device_dict):
+    device = Device.from_json(json.dumps(device_dict))
+    assert json.loads(device.to_json(version="1")) == device.to_parchmint_v1()
+    with pytest.raises(ValueError):
+        device.to_json(version="2")
+
+
+@pytest.mark.parametrize("name", jsonbackend.available_backends())
+def test_loads_large_integers(backend, name):
+    jsonbackend.set_backend(name)
+    values = [2**70 + 1, -(2**64) - 1, 2**63 - 1, -(2**63) - 1, 0.5]
+    assert jsonbackend.loads(json.dumps(values)) == values
+    assert jsonbackend.loads(json.dumps(values).encode("utf-8")) == values
+
+
+@pytest.mark.parametrize("name", jsonbackend.available_backends())
+def test_device_non_finite_round_trip(backend, name, device_dict):
+    jsonbackend.set_backend(name)
+    device_dict["params"]["gap"] = float("nan")
+    device_dict["params"]["depth"] = float("inf")
+    device = Device.from_json(json.dumps(device_dict))
+    text = device.to_json()
+    assert "NaN" in text and "Infinity" in text
+    assert Device.from_json(text).to_json() == text
@@ -13,3 +13,13 @@ def test_to_parchmint_v1(params_dict, layer_dict):
     # Test to see if the loading from dictionary is working correctly
     layer = Layer(json_data=layer_dict)
     assert layer.to_parchmint_v1() == layer_dict
+
+
+def test_layer_hash_is_stable_under_mutation(layer_dict):
+    layer = Layer(json_data=layer_dict)
+    layer_mapping = {layer: "mapped"}
+    digest = layer.content_digest()
+    layer.params.set_param("channelWidth", 10)
+    assert layer_mapping[Layer(json_data=layer_dict)] == "mapped"
+    assert layer_mapping[layer] == "mapped"
+    assert layer.content_digest() != digest
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from parchmint import Device
+from parchmint.lazydevice import LazyDevice
+
+
+@pytest.fixture
+def lazy_device(device_dict):
+    return LazyDevice.from_json(json.dumps(device_dict))
+
+
+def test_inspect_without_building(lazy_device, device_dict):
+    assert lazy_device.component_count == len(device_dict["components"])
+    assert lazy_device.connection_count == len(device_dict["connections"])
+    assert lazy_device.component_ids == [c["id"] for c in device_dict["components"]]
+    assert lazy_device.valve_ids == ["valve1", "valve2"]
+    assert lazy_device.component_exists("c1")
+    assert not lazy_device.connection_exists("missing")
+    assert [layer.ID for layer in lazy_device.layers] == ["FLOW_1"]
+    assert lazy_device.materialized_count == 0
+
+
+def test_graph_matches_device(lazy_device, device_dict):
+    device = Device.from_parchmint_v1_2(device_dict)
+    assert sorted(lazy_device.graph.nodes) == sorted(device.graph.nodes)
+    assert sorted(lazy_device.graph.edges(data="connection_id")) == sorted(
+        device.graph.edges(data="connection_id")
+    )
+    assert lazy_device.materialized_count == 0
+
+
+def test_graph_checks_end_points(device_dict):
+    device_dict["connections"][0]["source"] = None
+    with pytest.raises(ValueError):
+        LazyDevice.from_json(json.dumps(device_dict)).graph
+    device_dict["connections"][0]["source"] = {"component": "missing", "port": "1"}
+    with pytest.raises(KeyError):
+        LazyDevice.from_json(json.dumps(device_dict)).graph
+    with pytest.raises(KeyError):
+        Device.from_parchmint_v1_2(device_dict)
+
+
+def test_builds_on_access(lazy_device):
+    component = lazy_device.get_component("c1")
+    assert lazy_device.materialized_count == 1
+    assert lazy_device.get_component("c1") is component
+    with pytest.raises(KeyError):
+        lazy_device.get_component("missing")
+
+
+@pytest.mark.parametrize("file_name", ["dx1_ref", "dx2_ref"])
+def test_to_device(file_name):
+    file_path = f"tests/data/{file_name}.json"
+    lazy_device = LazyDevice.from_file(file_path)
+    component = lazy_device.components[0]
+    device = lazy_device.to_device()
+    assert device.components[0] is component
+    assert device.to_json() == Device.from_file(file_path).to_json()
@@ -12,3 +12,13 @@ def test_port_to_parchmint_v1_x_dict(port_dict):
     # Test to see if the loading from dictionary is working correctly
     port = Port(json_data=port_dict)
     assert port.to_parchmint_v1() == port_dict
+
+
+def test_port_hash_follows_eq(port_dict):
+    port1 = Port(json_data=port_dict)
+    port2 = Port(json_data=port_dict)
+    port2.x = 500
+    assert port1 == port2
+    assert hash(port1) == hash(port2)
+    assert port1.content_digest() != port2.content_digest()
+    assert len({port1, port2}) == 1
@@ -0,0 +1,117 @@
+import io
+import json
+import threading
+import tracemalloc
+
+from parchmint import Device, profiling
+
+
+def test_nothing_recorded_by_default(device_dict):
+    assert not profiling.is_active()
+    records = []
+    profiling.add_hook(records.append)
+    try:
+        Device.from_json(json.dumps(device_dict))
+    finally:
+        profiling.remove_hook(records.append)
+    assert records == []
+
+
+def test_from_json_phases(device_dict):
+    with profiling.profile() as report:
+        Device.from_json(json.dumps(device_dict))
+    assert not profiling.is_active()
+    records = {record.name: record for record in report.records}
+    assert records["from_json"].depth == 0
+    assert records["from_json.decode"].depth == 1
+    assert records["from_parchmint_v1_2.components"].count == len(
+        device_dict["components"]
+    )
+    assert records["from_parchmint_v1_2.graph"].count == len(device_dict["connections"])
+    assert records["from_parchmint_v1_2.valves"].count == 2
+    assert records["from_json"].peak_bytes is None
+    assert report.records[-1].name == "from_json"
+    assert records["from_json"].seconds >= records["from_json.decode"].seconds
+
+
+def test_validate_compare_and_serialize(device_dict):
+    json_str = json.dumps(device_dict)
+    device = Device.from_json(json_str)
+    seen = []
+    with profiling.profile(trace_memory=True, hooks=[seen.append]) as report:
+        Device.validate(json_str)
+        device.to_parchmint_v1_2()
+        device.compare(Device.from_parchmint_v1_2(device_dict))
+    names = [phase.name for phase in report.summary()]
+    for name in ["validate.schema", "to_parchmint_v1_2", "compare.match"]:
+        assert name in names
+    assert seen == report.records
+    assert all(record.peak_bytes is not None for record in report.records)
+    assert report.to_dict()["summary"][0]["name"] == names[0]
+
+    output = io.StringIO()
+    report.write(output)
+    assert "compare.match" in output.getvalue()
+
+
+def test_summary_adds_up_runs(device_dict):
+    json_str = json.dumps(device_dict)
+    with profiling.profile() as report:
+        Device.from_json(json_str)
+        Device.from_json(json_str)
+    summary = {phase.name: phase for phase in report.summary()}
+    assert summary["from_json"].calls == 2
+    assert summary["from_parchmint_v1_2.components"].count == 2 * len(
+        device_dict["components"]
+    )
+
+
+def test_failing_hook_is_logged(device_dict, caplog):
+    def fail(record):
+        raise RuntimeError("hook failed")
+
+    with caplog.at_level("ERROR", logger="parchmint.profiling"):
+        with profiling.profile(hooks=[fail]) as report:
+            Device.from_json(json.dumps(device_dict))
+    assert report.records
+    assert len(caplog.records) == len(report.records)
+    assert "hook failed" in caplog.text
+
+
+def test_profile_records_its_own_thread(device_dict):
+    json_str = json.dumps(device_dict)
+    started, stop = threading.Event(), threading.Event()
+    other_reports = []
+
+    def work():
+        with profiling.profile() as other_report:
+            other_reports.append(other_report)
+            started.set()
+            stop.wait()
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    started.wait()
+    try:
+        with profiling.profile() as report:
+            Device.from_json(json_str)
+    finally:
+        stop.set()
+        thread.join()
+    assert "from_json" in [record.name for record in report.records]
+    assert other_reports[0].records == []
+
+
+def test_outside_tracing_peak_is_kept(device_dict):
+    json_str = json.dumps(device_dict)
+    tracemalloc.start()
+    try:
+        block = bytearray(10_000_000)
+        del block
+        with profiling.profile(trace_memory=True) as report:
+            Device.from_json(json_str)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak >= 10_000_000
+    assert all(record.peak_bytes is not None for record in report.records)
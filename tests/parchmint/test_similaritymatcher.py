@@ -1,4 +1,5 @@
 from parchmint.device import Device
+from parchmint.similaritymatcher import PARAMS_MISMATCH, SimilarityMatcher
 
 
 def test_similarity_dx1_dx1():
@@ -149,3 +150,49 @@ def test_dx1_dx1_diff_ports():
 
 #     # Compare the two devices
 #     assert device1.compare(device=device2, compare_params=True) is False
+
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return Device.from_json(file.read())
+
+
+def test_fingerprint_matches_for_same_device():
+    device1 = _load("tests/data/dx1_ref.json")
+    device2 = _load("tests/data/dx1_ref.json")
+    assert device1.fingerprint == device2.fingerprint
+    assert device1.fingerprint.digest == device2.fingerprint.digest
+
+
+def test_fingerprint_ignores_params():
+    device1 = _load("tests/data/dx1_ref.json")
+    device2 = _load("tests/data/dx1__diff_params_ref.json")
+    assert device1.fingerprint == device2.fingerprint
+
+
+def test_fingerprint_rejects_different_devices():
+    device1 = _load("tests/data/dx1_ref.json")
+    for path in (
+        "tests/data/dx2_ref.json",
+        "tests/data/dx1__diff_entity_ref.json",
+        "tests/data/dx1__diff_ports_ref.json",
+    ):
+        assert device1.fingerprint != _load(path).fingerprint
+
+
+def test_fingerprint_is_invalidated():
+    device = _load("tests/data/dx1_ref.json")
+    fingerprint = device.fingerprint
+    device.remove_connection(device.connections[0].ID)
+    assert device.fingerprint != fingerprint
+
+
+def test_matcher_records_param_mismatches():
+    device1 = _load("tests/data/dx1_ref.json")
+    device2 = _load("tests/data/dx1__diff_params_ref.json")
+    matcher = SimilarityMatcher(device1, device2, compare_params=False)
+    assert matcher.is_isomorphic() is True
+    assert PARAMS_MISMATCH in {kind for kind, _, _ in matcher.mismatches}
+
+    matcher = SimilarityMatcher(device1, device2, compare_params=True)
+    assert matcher.is_isomorphic() is False
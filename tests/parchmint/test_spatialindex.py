@@ -0,0 +1,147 @@
+import random
+
+import pytest
+
+from parchmint import (
+    Component,
+    Connection,
+    ConnectionPath,
+    Device,
+    Layer,
+    Params,
+    Target,
+)
+from parchmint.spatialindex import COMPONENT, SEGMENT, SpatialIndex
+
+
+@pytest.fixture
+def placed_device():
+    random.seed(7)
+    device = Device("placed")
+    flow = Layer("FLOW_1", "flow", "FLOW")
+    control = Layer("CONTROL_1", "control", "CONTROL")
+    device.add_layer(flow)
+    device.add_layer(control)
+    for index in range(200):
+        component = Component(
+            ID=f"c{index}",
+            layers=[flow if index % 2 == 0 else control],
+            params=Params(),
+            xspan=random.randint(100, 3000),
+            yspan=random.randint(100, 3000),
+        )
+        component.xpos = random.randint(0, 100000)
+        component.ypos = random.randint(0, 100000)
+        device.add_component(component)
+    for index in range(0, 198, 2):
+        source = Target(f"c{index}", "1")
+        sink = Target(f"c{index + 2}", "1")
+        waypoints = [
+            (random.randint(0, 100000), random.randint(0, 100000)) for _ in range(4)
+        ]
+        device.add_connection(
+            Connection(
+                ID=f"n{index}",
+                source=source,
+                sinks=[sink],
+                layer=flow,
+                paths=[ConnectionPath(source, sink, waypoints)],
+            )
+        )
+    return device
+
+
+def test_query_window(placed_device):
+    index = placed_device.spatial_index
+    assert len(index) == 200 + 99 * 3
+    for _ in range(50):
+        x, y = random.randint(0, 100000), random.randint(0, 100000)
+        window = (x, y, x + 5000, y + 5000)
+        found = index.query_window(*window)
+        expected = [
+            item
+            for item in index.items
+            if item.kind == COMPONENT
+            and item.bbox[0] <= window[2]
+            and item.bbox[2] >= window[0]
+            and item.bbox[1] <= window[3]
+            and item.bbox[3] >= window[1]
+        ]
+        assert [item for item in found if item.kind == COMPONENT] == expected
+        # Every segment reported has to actually cross the window
+        for item in found:
+            if item.kind == SEGMENT:
+                assert index.distance(item, x + 2500, y + 2500) <= 2500 * 2**0.5
+
+
+def test_query_point_and_layer(placed_device):
+    index = placed_device.spatial_index
+    component = placed_device.get_component("c4")
+    hits = index.query_point(component.xpos + 1, component.ypos + 1, kind=COMPONENT)
+    assert component in [item.ref for item in hits]
+
+    flow_items = index.query_layer("FLOW_1", kind=COMPONENT)
+    assert len(flow_items) == 100
+    assert all("FLOW_1" in item.layers for item in flow_items)
+    assert len(index.query_layer("CONTROL_1", kind=SEGMENT)) == 0
+
+
+def test_nearest(placed_device):
+    index = placed_device.spatial_index
+    for _ in range(30):
+        x, y = random.uniform(-20000, 120000), random.uniform(-20000, 120000)
+        found = index.nearest(x, y, count=3, layer_id="FLOW_1")
+        expected = sorted(
+            index.distance(item, x, y)
+            for item in index.items
+            if "FLOW_1" in item.layers
+        )[:3]
+        assert [distance for distance, _ in found] == pytest.approx(expected)
+
+
+def test_spatial_index_is_invalidated(placed_device):
+    index = placed_device.spatial_index
+    assert placed_device.spatial_index is index
+
+    late = Component(ID="late", params=Params(), xspan=10, yspan=10)
+    late.xpos = -5000
+    late.ypos = -5000
+    placed_device.add_component(late)
+    assert placed_device.spatial_index is not index
+    assert [
+        item.ID for item in placed_device.spatial_index.query_point(-4995, -4995)
+    ] == ["late"]
+
+    placed_device.remove_component("late")
+    assert placed_device.spatial_index.query_point(-4995, -4995) == []
+
+
+def test_empty_index():
+    index = SpatialIndex([])
+    assert index.query_window(0, 0, 10, 10) == []
+    assert index.nearest(0, 0) == []
+
+
+def test_candidate_pairs_margins(placed_device):
+    index = placed_device.spatial_index
+    margins = [
+        random.randint(0, 2000) if item.kind == COMPONENT else 0 for item in index.items
+    ]
+
+    def gap(first, second):
+        return max(
+            first.bbox[0] - second.bbox[2],
+            second.bbox[0] - first.bbox[2],
+            first.bbox[1] - second.bbox[3],
+            second.bbox[1] - first.bbox[3],
+        )
+
+    expected = [
+        (i, j)
+        for i, first in enumerate(index.items)
+        for j, second in enumerate(index.items)
+        if i < j
+        and first.kind == second.kind == COMPONENT
+        and gap(first, second) <= max(margins[i], margins[j])
+    ]
+    assert index.candidate_pairs(kind=COMPONENT, margins=margins) == expected
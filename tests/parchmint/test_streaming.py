@@ -0,0 +1,87 @@
+import io
+import json
+
+import pytest
+
+from parchmint import Device
+from parchmint.streaming import JSONObjectReader, dump_device, iter_device_chunks
+
+
+@pytest.mark.parametrize("file_name", ["dx1_ref", "dx2_ref"])
+@pytest.mark.parametrize("chunk_size", [7, 1 << 16])
+def test_streaming_matches_from_json(file_name, chunk_size):
+    file_path = f"tests/data/{file_name}.json"
+    with open(file_path, "r", encoding="utf-8") as file:
+        expected = Device.from_json(file.read())
+
+    device = Device.from_file(file_path, streaming=True, chunk_size=chunk_size)
+    assert device.to_parchmint_v1_2() == expected.to_parchmint_v1_2()
+
+
+def test_streaming_device_dict(tmp_path, device_dict):
+    # Components are written ahead of the layers to force a second pass
+    reordered = {"components": device_dict["components"]}
+    reordered.update(device_dict)
+    text = json.dumps(reordered)
+    file_path = tmp_path / "device.json"
+    file_path.write_text(text, encoding="utf-8")
+
+    device = Device.from_file(file_path, streaming=True, chunk_size=5)
+    expected = Device.from_json(text)
+    assert device.to_parchmint_v1_2() == expected.to_parchmint_v1_2()
+    assert [valve.ID for valve in device.valves] == ["valve1", "valve2"]
+
+
+def test_json_object_reader(tmp_path):
+    file_path = tmp_path / "data.json"
+    file_path.write_text(
+        json.dumps(
+            {"a": 12345, "items": [1, {"b": [2, 3]}, "x"], "skip": [], "c": None}
+        ),
+        encoding="utf-8",
+    )
+    with open(file_path, "r", encoding="utf-8") as file:
+        members = []
+        for key, value in JSONObjectReader(file, chunk_size=3).members(
+            {"items", "skip"}
+        ):
+            if key == "items":
+                value = list(value)
+            elif key == "skip":
+                continue
+            members.append((key, value))
+    assert members == [("a", 12345), ("items", [1, {"b": [2, 3]}, "x"]), ("c", None)]
+
+
+@pytest.mark.parametrize("file_name", ["dx1_ref", "dx2_ref"])
+@pytest.mark.parametrize("version", ["1", "1.2"])
+def test_dump_device_matches_to_json(file_name, version):
+    device = Device.from_file(f"tests/data/{file_name}.json")
+    expected = device.to_json(version=version)
+
+    chunks = list(iter_device_chunks(device, version, chunk_size=256))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+    assert b"".join(chunks).decode("utf-8") == expected
+
+    text = io.StringIO()
+    assert dump_device(device, text, version) == len(expected.encode("utf-8"))
+    assert text.getvalue() == expected
+
+
+def test_streaming_to_file(tmp_path, device_dict):
+    device = Device.from_json(json.dumps(device_dict))
+    file_path = tmp_path / "device.json"
+    device.to_file(file_path, streaming=True, chunk_size=16)
+    assert file_path.read_text(encoding="utf-8") == device.to_json()
+
+    loaded = Device.from_file(file_path, streaming=True)
+    assert loaded.to_parchmint_v1_2() == device.to_parchmint_v1_2()
+
+
+def test_dump_device_unsupported_version(device_dict):
+    device = Device.from_json(json.dumps(device_dict))
+    output = io.BytesIO()
+    with pytest.raises(ValueError):
+        dump_device(device, output, "2")
+    assert output.getvalue() == b""
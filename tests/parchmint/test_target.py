@@ -10,3 +10,13 @@ def test_to_parchmint_v1(connection_target_dict):
     # Test with load from dict
     target = Target(json_data=connection_target_dict)
     assert target.to_parchmint_v1() == connection_target_dict
+
+
+def test_target_hash_follows_eq(connection_target_dict):
+    target1 = Target(json_data=connection_target_dict)
+    target2 = Target(json_data=connection_target_dict)
+    assert hash(target1) == hash(target2)
+    assert target1.content_digest() == target2.content_digest()
+    target2.port = "2"
+    assert target1 != target2
+    assert target1.content_digest() != target2.content_digest()
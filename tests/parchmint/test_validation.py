@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from parchmint import Device
+from parchmint.validation import (
+    detect_schema_version,
+    get_validator,
+    validate_json,
+    validate_json_data,
+)
+
+
+def test_validator_is_cached():
+    assert get_validator("1.2") is get_validator("1.2")
+    assert get_validator("1") is not get_validator("1.2")
+
+    with pytest.raises(ValueError):
+        get_validator("0.9")
+
+
+def test_detect_schema_version():
+    assert detect_schema_version({"version": 1}) == "1"
+    assert detect_schema_version({"version": "1.1"}) == "1.2"
+    assert detect_schema_version({"version": "1.2"}) == "1.2"
+
+    with pytest.raises(ValueError):
+        detect_schema_version({"name": "dev1"})
+
+
+def test_validate_json(device_dict):
+    text = json.dumps(device_dict)
+    assert validate_json(text) == []
+    assert Device.validate(text) == []
+
+    with open("tests/data/dx1_ref.json", "r", encoding="utf-8") as file:
+        issues = validate_json(file.read())
+    assert issues
+    assert issues[0].path == "$.connections[0].source.port"
+    assert issues[0].validator == "type"
+
+
+def test_validate_json_data_reports_paths(device_dict):
+    json_data = json.loads(json.dumps(device_dict))
+    del json_data["components"][1]["id"]
+    json_data["layers"][0]["name"] = 5
+
+    issues = validate_json_data(json_data, "1.2")
+    paths = sorted(issue.path for issue in issues)
+    assert paths == ["$.components[1]", "$.layers[0].name"]
+    validators = sorted(issue.validator for issue in issues)
+    assert validators == ["required", "type"]